@@ -0,0 +1,125 @@
+import argparse, statistics, time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from chat_engine import ChatEngine
+
+PROMPTS = [
+    "What is the capital of Uzbekistan?",
+    "Have you ever been there?",
+    "What would you like to see first?",
+    "Is the food any good?",
+    "What about the weather in spring?",
+    "Would you go back?",
+]
+
+
+def make_conversations(num_users: int, num_turns: int) -> list[list[str]]:
+    return [[PROMPTS[(user + turn) % len(PROMPTS)] for turn in range(num_turns)] for user in range(num_users)]
+
+
+def run_baseline(model, tokenizer, conversations: list[list[str]], max_new_tokens: int):
+    """chatbot.py's loop: every turn re-encodes the whole history with model.generate, one user at a time.
+    Returns per-turn lists: the latency of each user's turn and the tokens it generated."""
+    num_turns = len(conversations[0])
+    latencies, tokens = [[] for _ in range(num_turns)], [[] for _ in range(num_turns)]
+    max_prompt = model.config.n_positions - max_new_tokens  # Keeps generate within GPT-2's absolute positions
+    histories = [torch.tensor([[]], dtype=torch.long) for _ in conversations]
+    for turn in range(num_turns):
+        for user, conversation in enumerate(conversations):
+            start = time.perf_counter()
+            prompt_enc = tokenizer.encode(conversation[turn] + tokenizer.eos_token, return_tensors='pt')
+            prompt_enc = torch.cat([histories[user], prompt_enc], dim=-1)[:, -max_prompt:]
+            with torch.inference_mode():
+                histories[user] = model.generate(
+                    prompt_enc, max_new_tokens=max_new_tokens, pad_token_id=tokenizer.eos_token_id,
+                    attention_mask=torch.ones_like(prompt_enc), do_sample=False,
+                )
+            latencies[turn].append(time.perf_counter() - start)
+            tokens[turn].append(histories[user].shape[-1] - prompt_enc.shape[-1])
+    return latencies, tokens
+
+
+def run_engine(engine: ChatEngine, conversations: list[list[str]]):
+    """Each user is a client thread sending its turns one after another, all users at once.
+    Turn latency counts from submission, so it includes time queued behind other users.
+    Returns per-turn lists of latencies and generated tokens, and the mean history size after each turn."""
+    def converse(user):
+        return [engine.chat(f"user-{user}", text) for text in conversations[user]]
+    with ThreadPoolExecutor(max_workers=len(conversations)) as pool:
+        per_user = list(pool.map(converse, range(len(conversations))))
+    by_turn = list(zip(*per_user))
+    latencies = [[turn.latency_seconds for turn in turns] for turns in by_turn]
+    tokens = [[turn.generated_tokens for turn in turns] for turns in by_turn]
+    history = [statistics.mean(turn.history_tokens for turn in turns) for turns in by_turn]
+    return latencies, tokens, history
+
+
+def summary(mode: str, latencies: list[list[float]], tokens: list[list[int]], elapsed: float):
+    latencies = [latency for turn in latencies for latency in turn]
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    total = sum(sum(turn) for turn in tokens)
+    print(f"{mode:<36}{total / elapsed:>12.1f}{statistics.mean(latencies) * 1000:>16.1f}{p95 * 1000:>15.1f}{elapsed:>11.2f}")
+
+
+def per_turn_table(modes: dict, history: list[float]):
+    """Tokens/s (generated tokens over the time users waited for them) and mean latency of each turn number, per mode.
+    Full-history generate slows down as the conversation grows; with KV reuse a turn only encodes its new message,
+    until the window slides and the cache is rebuilt once."""
+    names = list(modes)
+    print("\nPer turn: tokens/s | mean latency (ms)")
+    print(f"{'turn':>4}" + "".join(f"{name:>36}" for name in names) + f"{'engine history (tokens)':>26}")
+    for turn in range(len(history)):
+        cells = []
+        for name in names:
+            latencies, tokens = modes[name]
+            cells.append(f"{sum(tokens[turn]) / sum(latencies[turn]):>22.1f} | {statistics.mean(latencies[turn]) * 1000:>9.1f}")
+        print(f"{turn + 1:>4}" + "".join(cells) + f"{history[turn]:>26.0f}")
+
+
+def benchmark(model, tokenizer, num_users: int, num_turns: int, max_new_tokens: int, max_batch_size: int, max_context_tokens: int, window_tokens: int):
+    conversations = make_conversations(num_users, num_turns)
+    print(f"{num_users} users x {num_turns} turns, up to {max_new_tokens} new tokens per reply, engine window {window_tokens}-{max_context_tokens} tokens, {torch.get_num_threads()} CPU threads")
+    print(f"{'mode':<36}{'tokens/s':>12}{'mean turn (ms)':>16}{'p95 turn (ms)':>15}{'total (s)':>11}")
+
+    modes = dict()
+    start = time.perf_counter()
+    modes["generate, full history"] = run_baseline(model, tokenizer, conversations, max_new_tokens)
+    summary("generate, full history", *modes["generate, full history"], time.perf_counter() - start)
+
+    for mode, batch_size in [("engine, KV reuse only", 1), (f"engine, KV reuse + batch {max_batch_size}", max_batch_size)]:
+        engine = ChatEngine(model, tokenizer, max_batch_size=batch_size, max_new_tokens=max_new_tokens, max_context_tokens=max_context_tokens, window_tokens=window_tokens)
+        engine.start()
+        start = time.perf_counter()
+        latencies, tokens, history = run_engine(engine, conversations)
+        elapsed = time.perf_counter() - start
+        engine.stop()
+        modes[mode] = (latencies, tokens)
+        summary(mode, latencies, tokens, elapsed)
+
+    per_turn_table(modes, history)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DialoGPT multi-user chat throughput and latency on CPU.")
+    parser.add_argument("--model", default="microsoft/DialoGPT-small", help="HuggingFace model id or local path.")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent chat sessions.")
+    parser.add_argument("--turns", type=int, default=12, help="Turns per session; the default is enough for the engine window to slide.")
+    parser.add_argument("--max-new-tokens", type=int, default=32, help="Reply length cap.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Engine max batch size.")
+    parser.add_argument("--max-context-tokens", type=int, default=256, help="Engine history size that makes the window slide.")
+    parser.add_argument("--window-tokens", type=int, default=128, help="Engine history size after the window slides.")
+    parser.add_argument("--threads", type=int, default=None, help="torch CPU threads (default: torch's choice).")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model).eval()
+    benchmark(model, tokenizer, args.users, args.turns, args.max_new_tokens, args.batch_size, args.max_context_tokens, args.window_tokens)
+
+
+if __name__ == "__main__":
+    main()
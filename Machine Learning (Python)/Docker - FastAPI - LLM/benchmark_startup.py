@@ -0,0 +1,73 @@
+import time
+START = time.perf_counter() # Before the heavy imports, which are part of cold start
+
+import argparse, json, os, resource, subprocess, sys
+
+# name: (load at startup, low_cpu_mem_usage, quantize)
+MODES = {
+    "eager": (True, False, False),
+    "low_cpu_mem": (True, True, False),
+    "low_cpu_mem+int8": (True, True, True),
+    "lazy": (False, True, False),
+}
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_mode(mode: str, model_src: str):
+    """Runs in a fresh process, so every mode starts cold. Prints its measurements as JSON."""
+    import torch
+    from chatbot import load_chat_model
+    eager, low_cpu_mem_usage, quantize = MODES[mode]
+
+    def load():
+        return load_chat_model(model_src, low_cpu_mem_usage=low_cpu_mem_usage, quantize=quantize)
+
+    loaded = load() if eager else None
+    ready = time.perf_counter() - START # The server could accept requests from here on
+    model, tokenizer = loaded or load()
+    prompt = tokenizer.encode("What is the capital of Uzbekistan?" + tokenizer.eos_token, return_tensors="pt")
+    with torch.inference_mode():
+        model.generate(prompt, max_new_tokens=16, pad_token_id=tokenizer.eos_token_id, attention_mask=torch.ones_like(prompt))
+    first_reply = time.perf_counter() - START
+    print(json.dumps({
+        "ready_s": ready,
+        "first_reply_s": first_reply,
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, # KB on Linux
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure chatbot cold start (time-to-ready, first reply, RSS) per loading mode. Linux only.")
+    parser.add_argument("--model", default="microsoft/DialoGPT-small", help="HuggingFace model id or local path, e.g. the cache baked into the Docker image.")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args.child, args.model)
+        return
+
+    print(f"Model: {args.model}")
+    print(f"{'mode':<20}{'ready (s)':>11}{'first reply (s)':>17}{'RSS (MB)':>10}{'peak RSS (MB)':>15}")
+    for mode in args.modes:
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode, "--model", args.model],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        if child.returncode != 0:
+            print(f"{mode:<20}failed: {child.stderr.strip().splitlines()[-1]}")
+            continue
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{mode:<20}{result['ready_s']:>11.2f}{result['first_reply_s']:>17.2f}{result['rss_mb']:>10.0f}{result['peak_rss_mb']:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import queue, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+
+class EngineBusyError(RuntimeError):
+    """Raised by submit() when max_pending requests are already waiting."""
+
+
+@dataclass
+class ChatTurn:
+    reply: str
+    new_prompt_tokens: int  # Tokens encoded by the prefill forward pass (only the unseen ones when the cache is reused)
+    generated_tokens: int
+    history_tokens: int  # Size of the conversation window after this turn
+    cache_reused: bool
+    latency_seconds: float
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    history_ids: list = field(default_factory=list)  # Token window of the conversation, turns separated by EOS
+    past: Optional[tuple] = None  # Per-layer (key, value) cache covering history_ids[:cached_len]
+    cached_len: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+    def drop_cache(self):
+        self.past = None
+        self.cached_len = 0
+
+
+@dataclass
+class _Request:
+    session_id: str
+    text: str
+    future: Future
+    on_text: Optional[Callable[[str], None]] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+def _legacy_cache(past) -> tuple:
+    """Newer transformers return Cache objects; the engine slices and pads the tuple form."""
+    return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else past
+
+
+class SessionStore:
+    """
+    Chat sessions by id. KV caches are the memory hog (DialoGPT-small: ~70 KB per token), so only
+    the max_cached_sessions most recently used sessions keep one; older sessions keep their token
+    history and re-encode it on their next turn. Sessions idle for longer than ttl_seconds are dropped.
+    """
+
+    def __init__(self, max_cached_sessions: int = 32, ttl_seconds: float = 1800):
+        self.max_cached_sessions = max_cached_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> ChatSession:
+        with self._lock:
+            self._expire()
+            session = self._sessions.pop(session_id, None) or ChatSession(session_id)
+            session.last_used = time.monotonic()
+            self._sessions[session_id] = session  # Most recently used last
+            cached = [s for s in self._sessions.values() if s.past is not None]
+            for stale in cached[:max(0, len(cached) - self.max_cached_sessions)]:
+                stale.drop_cache()
+            return session
+
+    def reset(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self):
+        now = time.monotonic()
+        for session_id in [sid for sid, s in self._sessions.items() if now - s.last_used > self.ttl_seconds]:
+            del self._sessions[session_id]
+
+
+class ChatEngine:
+    """
+    Multi-session DialoGPT serving engine, CPU only.
+    - Each session keeps the KV cache of its conversation, so a turn only encodes the new user
+      message instead of the whole history.
+    - Requests from different sessions arriving within max_wait_ms are decoded together as one
+      batch (at most max_batch_size), with left-padded caches and explicit position ids.
+    - History is a sliding window: when it would exceed max_context_tokens, the oldest whole turns
+      are dropped down to window_tokens and the cache is rebuilt once (GPT-2 position embeddings
+      are absolute, so a shifted cache cannot be reused).
+    All model work runs on one background thread; submit() is thread-safe and returns a Future.
+    At most max_pending requests may be queued or running, and a request whose Future was
+    cancelled before its batch started is skipped; cancel() also stops one that is decoding.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 8,
+        max_pending: int = 64,
+        max_wait_ms: float = 10,
+        max_new_tokens: int = 64,
+        max_context_tokens: int = 1000,
+        window_tokens: int = 512,
+        max_cached_sessions: int = 32,
+        session_ttl_seconds: float = 1800,
+        do_sample: bool = False,
+        top_k: int = 50,
+        temperature: float = 1.0,
+    ):
+        if window_tokens + max_new_tokens > max_context_tokens:
+            raise ValueError("window_tokens + max_new_tokens must not exceed max_context_tokens.")
+        self.model = model.to("cpu").eval()
+        self.tokenizer = tokenizer
+        self.eos_token_id = tokenizer.eos_token_id
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.max_new_tokens = max_new_tokens
+        self.max_context_tokens = max_context_tokens
+        self.window_tokens = window_tokens
+        self.do_sample = do_sample
+        self.top_k = top_k
+        self.temperature = temperature
+        self.sessions = SessionStore(max_cached_sessions, session_ttl_seconds)
+        self._requests: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._abandoned: set[Future] = set()  # Running requests whose caller is gone; see cancel()
+        self.batches_run = 0
+        self.tokens_generated = 0
+
+    @classmethod
+    def from_pretrained(cls, model_name: str = "microsoft/DialoGPT-small", **kwargs) -> "ChatEngine":
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForCausalLM.from_pretrained(model_name)
+        return cls(model, tokenizer, **kwargs)
+
+    # --- Public API --- #
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._serve, name="chat-engine", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, session_id: str, text: str, on_text: Optional[Callable[[str], None]] = None) -> Future:
+        """
+        Queues a user message; the Future resolves to a ChatTurn.
+        on_text, if given, is called from the engine thread with each new piece of reply text.
+        Raises EngineBusyError when max_pending requests are already waiting.
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise EngineBusyError(f"{self._pending} chat requests already pending.")
+            self._pending += 1
+        future = Future()
+        future.add_done_callback(self._release_slot)
+        self._requests.put(_Request(session_id, text, future, on_text))
+        return future
+
+    def cancel(self, future: Future):
+        """
+        Gives up on a submitted request. A queued one is skipped; a running one stops decoding after
+        the current step, and its turn ends with the reply generated so far.
+        """
+        if future.cancel():
+            return
+        with self._pending_lock:  # Also held by _release_slot, so a future finishing now is never left in the set
+            if not future.done():
+                self._abandoned.add(future)
+
+    def _release_slot(self, future: Future):
+        with self._pending_lock:
+            self._pending -= 1
+            self._abandoned.discard(future)
+
+    def chat(self, session_id: str, text: str, timeout: Optional[float] = None) -> ChatTurn:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(session_id, text).result(timeout)
+
+    def reset(self, session_id: str):
+        self.sessions.reset(session_id)
+
+    # --- Batching loop --- #
+    def _serve(self):
+        deferred: list[_Request] = []
+        while True:
+            batch, deferred = self._collect_batch(deferred)
+            if batch is None:
+                for request in deferred:
+                    request.future.set_exception(RuntimeError("Chat engine stopped."))
+                return
+            batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                turns = self._run_batch(batch)
+                for request, turn in zip(batch, turns):
+                    turn.latency_seconds = time.monotonic() - request.submitted_at
+                    request.future.set_result(turn)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+
+    def _collect_batch(self, deferred: list[_Request]):
+        """Waits for a request, then gathers more for up to max_wait_ms. A session appears at most
+        once per batch; its later messages are deferred to the next batch, keeping turn order."""
+        pending = list(deferred)
+        if not pending:
+            request = self._requests.get()
+            if request is None:
+                return None, []
+            pending.append(request)
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(pending) < self.max_batch_size * 2:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)  # Handle the stop after this batch
+                break
+            pending.append(request)
+        batch, rest, seen = [], [], set()
+        for request in pending:
+            if request.session_id in seen or len(batch) >= self.max_batch_size:
+                rest.append(request)
+            else:
+                seen.add(request.session_id)
+                batch.append(request)
+        return batch, rest
+
+    # --- Model work --- #
+    def _append_user_message(self, session: ChatSession, text: str):
+        session.history_ids.extend(self.tokenizer.encode(text + self.tokenizer.eos_token))
+        if len(session.history_ids) + self.max_new_tokens <= self.max_context_tokens:
+            return
+        # Drop the oldest whole turns (EOS-terminated) until the window fits.
+        history = session.history_ids
+        start = 0
+        while len(history) - start > self.window_tokens:
+            try:
+                start = history.index(self.eos_token_id, start) + 1
+            except ValueError:
+                break
+        session.history_ids = history[start:] if start < len(history) else history[-self.window_tokens:]
+        if len(session.history_ids) > self.window_tokens:  # A single message longer than the window
+            session.history_ids = session.history_ids[-self.window_tokens:]
+        session.drop_cache()
+
+    def _select_next_tokens(self, logits: torch.Tensor) -> torch.Tensor:
+        if not self.do_sample:
+            return logits.argmax(dim=-1)
+        logits = logits / self.temperature
+        top_values, top_indices = logits.topk(self.top_k, dim=-1)
+        choice = torch.multinomial(torch.softmax(top_values, dim=-1), num_samples=1)
+        return top_indices.gather(-1, choice).squeeze(-1)
+
+    def _stream_text(self, on_text: Callable[[str], None], reply_ids: list[int], streamed: str) -> str:
+        """Sends the text added by the latest token. BPE pieces may not decode on their own,
+        so the whole reply is decoded and only the new suffix is sent."""
+        text = self.tokenizer.decode(reply_ids, skip_special_tokens=True)
+        if len(text) > len(streamed) and not text.endswith("\ufffd"):  # Wait for incomplete UTF-8 bytes
+            on_text(text[len(streamed):])
+            return text
+        return streamed
+
+    @torch.inference_mode()
+    def _run_batch(self, batch: list[_Request]) -> list[ChatTurn]:
+        self.batches_run += 1
+        sessions, prefill_logits, pasts, new_prompt_tokens, reused = [], [], [], [], []
+
+        # Prefill each session separately: only the tokens its cache has not seen yet.
+        for request in batch:
+            session = self.sessions.get(request.session_id)
+            self._append_user_message(session, request.text)
+            reused.append(session.past is not None)
+            new_ids = session.history_ids[session.cached_len:]
+            output = self.model(input_ids=torch.tensor([new_ids]), past_key_values=session.past, use_cache=True)
+            sessions.append(session)
+            pasts.append(_legacy_cache(output.past_key_values))
+            prefill_logits.append(output.logits[0, -1])
+            new_prompt_tokens.append(len(new_ids))
+
+        # Decode all sessions together over left-padded caches.
+        lengths = [len(session.history_ids) for session in sessions]
+        max_len = max(lengths)
+        batch_size = len(sessions)
+        batch_past = tuple(
+            tuple(
+                torch.cat([torch.nn.functional.pad(past[layer][kv], (0, 0, max_len - length, 0)) for past, length in zip(pasts, lengths)])
+                for kv in range(2)
+            )
+            for layer in range(len(pasts[0]))
+        )
+        attention_mask = torch.tensor([[0] * (max_len - length) + [1] * length for length in lengths])
+        position_ids = torch.tensor(lengths).unsqueeze(-1)
+        logits = torch.stack(prefill_logits)
+
+        generated: list[list[int]] = [[] for _ in sessions]
+        fed = [0] * batch_size
+        finished = [False] * batch_size
+        streamed = [""] * batch_size
+        for step in range(self.max_new_tokens):
+            next_tokens = self._select_next_tokens(logits)
+            for row in range(batch_size):
+                if not finished[row] and batch[row].future in self._abandoned:
+                    finished[row] = True  # Nobody waits for this reply; its turn ends here
+                if finished[row]:
+                    next_tokens[row] = self.eos_token_id  # Filler; its outputs are discarded below
+                    continue
+                generated[row].append(int(next_tokens[row]))
+                finished[row] = int(next_tokens[row]) == self.eos_token_id
+                if batch[row].on_text is not None:
+                    streamed[row] = self._stream_text(batch[row].on_text, generated[row], streamed[row])
+            if all(finished) or step == self.max_new_tokens - 1:
+                break  # The last sampled tokens are never fed, so they stay out of the cache
+            for row in range(batch_size):
+                if not finished[row]:
+                    fed[row] += 1
+            attention_mask = torch.cat([attention_mask, torch.ones(batch_size, 1, dtype=attention_mask.dtype)], dim=-1)
+            output = self.model(
+                input_ids=next_tokens.unsqueeze(-1),
+                past_key_values=batch_past,
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                use_cache=True,
+            )
+            batch_past = _legacy_cache(output.past_key_values)
+            logits = output.logits[:, -1]
+            position_ids = position_ids + 1
+
+        # Split the batch cache back into per-session caches, without padding or post-EOS tokens.
+        turns = []
+        for row, session in enumerate(sessions):
+            pad = max_len - lengths[row]
+            cached_len = lengths[row] + fed[row]
+            session.past = tuple(
+                tuple(layer_kv[kv][row:row + 1, :, pad:pad + cached_len].clone() for kv in range(2))
+                for layer_kv in batch_past
+            )
+            session.cached_len = cached_len
+            reply_ids = generated[row]
+            session.history_ids.extend(reply_ids)
+            if not reply_ids or reply_ids[-1] != self.eos_token_id:
+                session.history_ids.append(self.eos_token_id)  # Close the turn
+            self.tokens_generated += len(reply_ids)
+            turns.append(ChatTurn(
+                reply=self.tokenizer.decode(reply_ids, skip_special_tokens=True),
+                new_prompt_tokens=new_prompt_tokens[row],
+                generated_tokens=len(reply_ids),
+                history_tokens=len(session.history_ids),
+                cache_reused=reused[row],
+                latency_seconds=0.0,
+            ))
+        return turns
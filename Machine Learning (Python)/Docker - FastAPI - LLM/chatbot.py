@@ -1,30 +1,84 @@
-#import torch
-#from transformers import AutoModelForCausalLM, AutoTokenizer
+import argparse
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers.pytorch_utils import Conv1D
 
 model_src = "microsoft/DialoGPT-large"
-model     = AutoModelForCausalLM.from_pretrained(model_src)
-tokenizer = AutoTokenizer.from_pretrained(model_src)
-
-n_steps = 5
-chat_enc = torch.tensor([]).long().to(model.device)
-first_prompt = "What is the capital of Uzbekistan?"
-for step in range(n_steps):
-    prompt = first_prompt if step == 0 else input(">> User: ") + tokenizer.eos_token
-    if step == 0:
-        print(f">> User: {prompt}")
-    prompt_enc = tokenizer.encode(prompt, return_tensors='pt').to(model.device)
-    prompt_enc = torch.cat([chat_enc, prompt_enc], dim=-1)
-
-    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
-    att_msk = (prompt_enc != tokenizer.pad_token_id).long()
-    chat_enc = model.generate(prompt_enc, max_length=1000, pad_token_id=tokenizer.eos_token_id, attention_mask=att_msk)
-    
-    answer_enc = chat_enc[:, prompt_enc.shape[-1]:][0]
-    answer = tokenizer.decode(answer_enc, skip_special_tokens=True)
-
-    print(f"Pad token ID: {pad_token_id}")
-    print(f"Tokenizer pad token ID: {tokenizer.pad_token_id}")
-    print(f"EOS token ID: {tokenizer.eos_token_id}")
-    print(f"EOS token: {tokenizer.eos_token}")
-    print(f"Answer ID: {answer_enc}")
-    print(f"{model_src}: {answer}")
\ No newline at end of file
+
+
+def conv1d_to_linear(model: torch.nn.Module) -> torch.nn.Module:
+    """GPT-2 blocks use transformers' Conv1D (a transposed Linear), which dynamic quantisation skips.
+    Swaps each one for an equivalent nn.Linear, in place."""
+    for parent in list(model.modules()):
+        for name, child in parent.named_children():
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight = torch.nn.Parameter(child.weight.detach().t(), requires_grad=False) # A view: no copy until quantised
+                linear.bias = torch.nn.Parameter(child.bias.detach(), requires_grad=False)
+                setattr(parent, name, linear)
+    return model
+
+
+def load_chat_model(model_src: str = model_src, low_cpu_mem_usage: bool = True, quantize: bool = False, local_files_only: bool = False):
+    """
+    Loads a causal LM and its tokenizer for CPU inference.
+    - low_cpu_mem_usage: builds the model without random init and, for safetensors checkpoints,
+      copies weights straight from the memory-mapped file, so peak RSS stays near the model size.
+    - quantize: dynamic int8 quantisation of every Linear layer (weights int8, activations quantised
+      on the fly). About 3x smaller Linear weights and faster matmuls on CPU, for a small quality cost.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_src, local_files_only=local_files_only)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_src, torch_dtype=torch.float32, low_cpu_mem_usage=low_cpu_mem_usage, local_files_only=local_files_only,
+    ).eval()
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(conv1d_to_linear(model), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model, tokenizer
+
+
+def save_model_cache(model_src: str, output_dir: str):
+    """Downloads a model once and stores it as safetensors, e.g. in its own Docker image layer,
+    so containers start without network access and load it memory-mapped."""
+    model, tokenizer = load_chat_model(model_src)
+    model.save_pretrained(output_dir, safe_serialization=True)
+    tokenizer.save_pretrained(output_dir)
+
+
+def chat(model, tokenizer, n_steps: int = 5):
+    chat_enc = torch.tensor([]).long().to(model.device)
+    first_prompt = "What is the capital of Uzbekistan?"
+    for step in range(n_steps):
+        prompt = first_prompt if step == 0 else input(">> User: ") + tokenizer.eos_token
+        if step == 0:
+            print(f">> User: {prompt}")
+        prompt_enc = tokenizer.encode(prompt, return_tensors='pt').to(model.device)
+        prompt_enc = torch.cat([chat_enc, prompt_enc], dim=-1)
+
+        pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        att_msk = (prompt_enc != tokenizer.pad_token_id).long()
+        chat_enc = model.generate(prompt_enc, max_length=1000, pad_token_id=tokenizer.eos_token_id, attention_mask=att_msk)
+
+        answer_enc = chat_enc[:, prompt_enc.shape[-1]:][0]
+        answer = tokenizer.decode(answer_enc, skip_special_tokens=True)
+
+        print(f"Pad token ID: {pad_token_id}")
+        print(f"Tokenizer pad token ID: {tokenizer.pad_token_id}")
+        print(f"EOS token ID: {tokenizer.eos_token_id}")
+        print(f"EOS token: {tokenizer.eos_token}")
+        print(f"Answer ID: {answer_enc}")
+        print(f"{model_src}: {answer}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat with a DialoGPT model, or save it as a local safetensors cache.")
+    parser.add_argument("--model", default=model_src, help="HuggingFace model id or local path.")
+    parser.add_argument("--quantize", action="store_true", help="Dynamic int8 quantisation for CPU inference.")
+    parser.add_argument("--save-cache", metavar="DIR", help="Save the model as safetensors to DIR and exit.")
+    args = parser.parse_args()
+
+    if args.save_cache:
+        save_model_cache(args.model, args.save_cache)
+    else:
+        model_src = args.model
+        chat(*load_chat_model(model_src, quantize=args.quantize))
@@ -0,0 +1,49 @@
+import argparse, asyncio, collections, statistics, time
+import httpx
+
+PROMPTS = ["Hello there!", "What is the capital of Uzbekistan?", "Have you ever been there?", "Would you go back?"]
+
+
+async def converse(client: httpx.AsyncClient, user: int, num_turns: int, stream: bool, latencies: list, statuses: collections.Counter):
+    for turn in range(num_turns):
+        body = {"session_id": f"load-{user}", "message": PROMPTS[(user + turn) % len(PROMPTS)], "stream": stream}
+        start = time.perf_counter()
+        try:
+            response = await client.post("/chat", json=body)
+            statuses[response.status_code] += 1
+        except httpx.TimeoutException:
+            statuses["client timeout"] += 1
+            continue
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+
+
+async def load_test(url: str, num_users: int, num_turns: int, stream: bool):
+    latencies, statuses = [], collections.Counter()
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[converse(client, user, num_turns, stream, latencies, statuses) for user in range(num_users)])
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/health")).json()
+    return latencies, statuses, elapsed, health
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /chat endpoint with concurrent chat sessions.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=32, help="Concurrent chat sessions.")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per session.")
+    parser.add_argument("--stream", action="store_true", help="Request streamed (SSE) replies.")
+    args = parser.parse_args()
+
+    latencies, statuses, elapsed, health = asyncio.run(load_test(args.url, args.users, args.turns, args.stream))
+    print(f"{args.users} users x {args.turns} turns in {elapsed:.2f} s ({sum(statuses.values()) / elapsed:.1f} requests/s)")
+    print(f"Status codes: {dict(statuses)}")
+    if latencies:
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"Latency of successful requests: mean {statistics.mean(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    print(f"Server: {health}")
+
+
+if __name__ == "__main__":
+    main()
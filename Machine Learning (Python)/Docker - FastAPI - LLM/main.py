@@ -1,18 +1,144 @@
+import asyncio, json, os
+from contextlib import asynccontextmanager
 import fastapi, pydantic, uvicorn
+from fastapi.responses import StreamingResponse
+
+from chat_engine import ChatEngine, ChatTurn, EngineBusyError
+from chatbot import load_chat_model
+
+# Settings, overridable through environment variables (e.g. `docker run -e CHAT_MODEL=...`)
+CHAT_MODEL = os.environ.get("CHAT_MODEL", "microsoft/DialoGPT-small") # HuggingFace id or local path
+CHAT_MAX_BATCH_SIZE = int(os.environ.get("CHAT_MAX_BATCH_SIZE", 8))
+CHAT_MAX_PENDING = int(os.environ.get("CHAT_MAX_PENDING", 64)) # Beyond this, /chat answers 503
+CHAT_MAX_NEW_TOKENS = int(os.environ.get("CHAT_MAX_NEW_TOKENS", 64))
+CHAT_TIMEOUT_SECONDS = float(os.environ.get("CHAT_TIMEOUT_SECONDS", 30)) # Beyond this, /chat answers 504
+CHAT_LAZY_LOAD = os.environ.get("CHAT_LAZY_LOAD", "0") == "1" # Load on the first /chat instead of at startup
+CHAT_LOW_CPU_MEM_USAGE = os.environ.get("CHAT_LOW_CPU_MEM_USAGE", "1") == "1" # Memory-mapped safetensors loading
+CHAT_QUANTIZE = os.environ.get("CHAT_QUANTIZE", "0") == "1" # Dynamic int8 quantisation
+
+
+class ChatRequest(pydantic.BaseModel):
+    session_id: str = pydantic.Field(min_length=1, max_length=128)
+    message: str = pydantic.Field(min_length=1, max_length=2000)
+    stream: bool = False # If True, the reply is sent as server-sent events, one per text piece
+
+
+class ChatResponse(pydantic.BaseModel):
+    session_id: str
+    reply: str
+    generated_tokens: int
+    latency_ms: float
+
+    @classmethod
+    def from_turn(cls, session_id: str, turn: ChatTurn) -> "ChatResponse":
+        return cls(session_id=session_id, reply=turn.reply, generated_tokens=turn.generated_tokens, latency_ms=turn.latency_seconds * 1000)
+
+
+def create_engine() -> ChatEngine:
+    model, tokenizer = load_chat_model(CHAT_MODEL, low_cpu_mem_usage=CHAT_LOW_CPU_MEM_USAGE, quantize=CHAT_QUANTIZE)
+    engine = ChatEngine(model, tokenizer, max_batch_size=CHAT_MAX_BATCH_SIZE, max_pending=CHAT_MAX_PENDING, max_new_tokens=CHAT_MAX_NEW_TOKENS)
+    engine.start()
+    return engine
+
+
+async def get_engine(app: fastapi.FastAPI) -> ChatEngine:
+    """The model loads once, off the event loop; generation runs on the engine's own thread."""
+    if app.state.engine is None:
+        async with app.state.engine_lock:
+            if app.state.engine is None:
+                app.state.engine = await asyncio.to_thread(create_engine)
+    return app.state.engine
+
+
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    app.state.engine = None
+    app.state.engine_lock = asyncio.Lock()
+    if not CHAT_LAZY_LOAD:
+        await get_engine(app)
+    yield
+    if app.state.engine is not None:
+        app.state.engine.stop()
+
+app = fastapi.FastAPI(lifespan=lifespan)
+
+
+def submit(engine: ChatEngine, request: ChatRequest, on_text=None):
+    try:
+        return engine.submit(request.session_id, request.message, on_text)
+    except EngineBusyError as e:
+        raise fastapi.HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
-app = fastapi.FastAPI()
-RES = ['A', 'B', 'C']
-idx = -1
 
 @app.get("/")
 def home():
     return {"message": "Hello world!"}
 
-@app.post("/chat")
-def chat(request: pydantic.BaseModel):
-    global idx
-    idx = (idx + 1) % 3
-    return RES[idx]
+
+@app.get("/health")
+def health(request: fastapi.Request):
+    engine: ChatEngine = request.app.state.engine
+    if engine is None:
+        return {"model": CHAT_MODEL, "loaded": False}
+    return {"model": CHAT_MODEL, "loaded": True, "pending": engine.pending, "sessions": len(engine.sessions), "batches_run": engine.batches_run, "tokens_generated": engine.tokens_generated}
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(body: ChatRequest, request: fastapi.Request):
+    engine = await get_engine(request.app)
+    if body.stream:
+        return stream_chat(engine, body)
+    future = submit(engine, body)
+    try:
+        turn = await asyncio.wait_for(asyncio.wrap_future(future), CHAT_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise fastapi.HTTPException(status_code=504, detail=f"No reply within {CHAT_TIMEOUT_SECONDS} seconds.")
+    return ChatResponse.from_turn(body.session_id, turn)
+
+
+def stream_chat(engine: ChatEngine, body: ChatRequest) -> StreamingResponse:
+    loop = asyncio.get_running_loop()
+    pieces: asyncio.Queue[str] = asyncio.Queue()
+    engine_future = submit(engine, body, on_text=lambda text: loop.call_soon_threadsafe(pieces.put_nowait, text))
+    future = asyncio.wrap_future(engine_future)
+
+    async def event_stream():
+        try:
+            deadline = loop.time() + CHAT_TIMEOUT_SECONDS
+            while not (future.done() and pieces.empty()):
+                get_piece = asyncio.ensure_future(pieces.get())
+                try:
+                    done, _ = await asyncio.wait({get_piece, future}, timeout=deadline - loop.time(), return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if not get_piece.done():
+                        get_piece.cancel()
+                if get_piece in done:
+                    yield f"event: token\ndata: {json.dumps({'text': get_piece.result()})}\n\n"
+                    continue
+                if not done:
+                    yield f"event: error\ndata: {json.dumps({'detail': f'No reply within {CHAT_TIMEOUT_SECONDS} seconds.'})}\n\n"
+                    return
+            if future.cancelled():
+                yield f"event: error\ndata: {json.dumps({'detail': 'The reply was cancelled.'})}\n\n"
+                return
+            if future.exception() is not None:
+                yield f"event: error\ndata: {json.dumps({'detail': str(future.exception())})}\n\n"
+                return
+            yield f"event: done\ndata: {ChatResponse.from_turn(body.session_id, future.result()).model_dump_json()}\n\n"
+        finally:
+            # Runs on timeout and when the client disconnects (the response closes the generator): stop decoding a reply nobody reads.
+            if not future.done():
+                future.cancel()
+                engine.cancel(engine_future)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.delete("/chat/{session_id}", status_code=204)
+def reset_chat(session_id: str, request: fastapi.Request):
+    if request.app.state.engine is not None:
+        request.app.state.engine.reset(session_id)
+
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,40 @@
+import argparse
+from tokenizers import ByteLevelBPETokenizer
+from transformers import GPT2Config, GPT2LMHeadModel, GPT2TokenizerFast
+
+EOS_TOKEN = "<|endoftext|>" # Same EOS as DialoGPT, so the chat code treats both alike
+CORPUS = [
+    "What is the capital of Uzbekistan?",
+    "Tashkent is the capital of Uzbekistan.",
+    "Have you ever been there? I would love to go.",
+    "Hello there, how are you doing today?",
+    "I am fine, thank you. And you?",
+]
+
+
+def make_tiny_model(output_dir: str, n_layer: int = 2, n_embd: int = 64, vocab_size: int = 512):
+    """
+    Saves a randomly initialised GPT-2 chat model and a byte-level BPE tokenizer, built offline in a
+    couple of seconds. Replies are gibberish, but it runs the exact code path of DialoGPT, so the API
+    can be load tested without downloading or serving a real model.
+    """
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(CORPUS, vocab_size=vocab_size, special_tokens=[EOS_TOKEN])
+    tokenizer = GPT2TokenizerFast(tokenizer_object=bpe, eos_token=EOS_TOKEN, bos_token=EOS_TOKEN, unk_token=EOS_TOKEN)
+    config = GPT2Config(
+        vocab_size=len(tokenizer), n_positions=1024, n_embd=n_embd, n_layer=n_layer, n_head=4,
+        bos_token_id=tokenizer.eos_token_id, eos_token_id=tokenizer.eos_token_id,
+        tie_word_embeddings=False, # A tied random head keeps predicting EOS right after the EOS ending each prompt
+    )
+    GPT2LMHeadModel(config).save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a tiny random chat model for load testing (CHAT_MODEL=<output_dir>).")
+    parser.add_argument("output_dir", nargs="?", default="tiny-chat-model")
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--hidden", type=int, default=64)
+    args = parser.parse_args()
+    make_tiny_model(args.output_dir, args.layers, args.hidden)
+    print(f"Saved tiny model to {args.output_dir}")
@@ -5,11 +5,24 @@ from google.adk.tools import google_search
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types
+try:
+    from .tool_execution import cached_tool
+except ImportError: # Run directly as a script instead of loaded as a package by ADK
+    from tool_execution import cached_tool
 
 #warnings.filterwarnings("ignore")
 #logging.basicConfig(level=logging.ERROR)
 
+WEATHER_CACHE_TTL_SECONDS = 600 # Repeated questions about a city within this window reuse the tool result
 
+
+# Cached per normalised city; error results are not cached. Runs off the event loop, so several
+# get_weather calls in one agent turn execute concurrently.
+@cached_tool(
+    ttl_seconds=WEATHER_CACHE_TTL_SECONDS,
+    key_fn=lambda city: city.lower().replace(" ", ""),
+    should_cache=lambda result: result.get("status") == "success",
+)
 def get_weather(city: str) -> dict:
     """Retrieves the current weather report for a specified city.
     Args:
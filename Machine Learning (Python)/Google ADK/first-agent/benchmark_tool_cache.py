@@ -0,0 +1,75 @@
+import argparse, asyncio, contextlib, io, random, statistics, time
+
+from tool_execution import cached_tool, run_tool_calls
+from agent import get_weather, WEATHER_CACHE_TTL_SECONDS
+
+CITIES = ["New York", "London", "Tokyo", "new york", "Paris"]
+
+
+def make_turns(num_turns: int, calls_per_turn: int, seed: int = 0) -> list[list[str]]:
+    """Each turn is a question about several cities, i.e. several get_weather calls in one agent turn."""
+    rng = random.Random(seed)
+    return [[rng.choice(CITIES) for _ in range(calls_per_turn)] for _ in range(num_turns)]
+
+
+def make_slow_weather(latency: float):
+    """The mock get_weather plus a fixed delay, standing in for a real weather API call."""
+    executions = []
+    def slow_get_weather(city: str) -> dict:
+        executions.append(city)
+        time.sleep(latency)
+        return get_weather.__wrapped__(city)
+    return slow_get_weather, executions
+
+
+async def time_turns(turns: list[list[str]], run_turn) -> list[float]:
+    latencies = []
+    for cities in turns:
+        start = time.perf_counter()
+        await run_turn(cities)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def benchmark(num_turns: int, calls_per_turn: int, latency: float):
+    turns = make_turns(num_turns, calls_per_turn)
+    results = {}
+
+    tool, executions = make_slow_weather(latency)
+    async def sequential_turn(cities):
+        for city in cities:
+            tool(city)
+    results["uncached, sequential"] = (await time_turns(turns, sequential_turn), executions)
+
+    tool, executions = make_slow_weather(latency)
+    async def concurrent_turn(cities):
+        await asyncio.gather(*[asyncio.to_thread(tool, city) for city in cities])
+    results["uncached, concurrent"] = (await time_turns(turns, concurrent_turn), executions)
+
+    tool, executions = make_slow_weather(latency)
+    cached = cached_tool(ttl_seconds=WEATHER_CACHE_TTL_SECONDS, key_fn=lambda city: city.lower().replace(" ", ""), should_cache=lambda result: result.get("status") == "success")(tool)
+    async def cached_turn(cities):
+        await run_tool_calls([(cached, {"city": city}) for city in cities])
+    results["cached, concurrent"] = (await time_turns(turns, cached_turn), executions)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent-turn tool latency with and without the get_weather result cache.")
+    parser.add_argument("--turns", type=int, default=30, help="Number of agent turns.")
+    parser.add_argument("--calls-per-turn", type=int, default=3, help="get_weather calls per turn.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per uncached weather lookup.")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()): # Silences the tool's own prints
+        results = asyncio.run(benchmark(args.turns, args.calls_per_turn, args.latency))
+
+    print(f"{args.turns} turns x {args.calls_per_turn} get_weather calls, {args.latency * 1000:.0f} ms per lookup")
+    print(f"{'mode':<22}{'mean turn (ms)':>16}{'p95 turn (ms)':>16}{'lookups':>10}")
+    for mode, (latencies, executions) in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        print(f"{mode:<22}{statistics.mean(latencies) * 1000:>16.1f}{p95 * 1000:>16.1f}{len(executions):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio, functools, inspect, json, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+
+class ToolResultCache:
+    """LRU cache of tool results whose entries expire ttl_seconds after being stored."""
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive.")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Returns (True, result) on a fresh hit, (False, None) otherwise."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if self._clock() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, result
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: str, result: Any):
+        self._entries[key] = (self._clock() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def cached_tool(
+    ttl_seconds: float = 300,
+    max_entries: int = 1024,
+    key_fn: Optional[Callable[..., Any]] = None,
+    should_cache: Callable[[Any], bool] = lambda result: True,
+):
+    """
+    Turns a sync or async ADK tool function into an async tool with a TTL result cache.
+    The cache key is the tool's bound arguments, or key_fn(*args, **kwargs) if given (e.g. to
+    normalise a city name). Sync tools run in a worker thread, so several tool calls in one agent
+    turn run concurrently, and identical calls in flight at the same time share one execution.
+    The wrapper keeps the tool's name, docstring and signature, which ADK uses to build its schema.
+    The undecorated function stays available as tool.__wrapped__, and the cache as tool.cache.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+        cache = ToolResultCache(ttl_seconds, max_entries)
+        signature = inspect.signature(func)
+        in_flight: dict[str, asyncio.Future] = {}
+
+        def make_key(args, kwargs) -> str:
+            if key_fn is not None:
+                return json.dumps(key_fn(*args, **kwargs), default=repr)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return json.dumps(bound.arguments, sort_keys=True, default=repr)
+
+        async def execute(args, kwargs):
+            if inspect.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            hit, result = cache.get(key)
+            if hit:
+                return result
+            pending = in_flight.get(key)
+            if pending is not None:
+                return await asyncio.shield(pending)
+            pending = asyncio.ensure_future(execute(args, kwargs))
+            in_flight[key] = pending
+            try:
+                result = await asyncio.shield(pending)
+            finally:
+                in_flight.pop(key, None)
+            if should_cache(result):
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+async def run_tool_calls(tool_calls: list[tuple[Callable[..., Any], dict]]) -> list[Any]:
+    """Runs the tool calls of one agent turn concurrently and returns their results in order."""
+    async def run(tool, arguments):
+        result = tool(**arguments)
+        return await result if inspect.isawaitable(result) else result
+    return await asyncio.gather(*[run(tool, arguments) for tool, arguments in tool_calls])
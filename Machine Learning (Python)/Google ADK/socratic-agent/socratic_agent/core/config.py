@@ -32,6 +32,13 @@ EMBEDDING_MODEL = "text-embedding-004" # Google's text-embedding-004 model
 # MCP Server Configuration
 MCP_SERVER_URL = "http://127.0.0.1:8001"
 
+# MCP Host Job Queue Configuration
+JOB_WORKER_COUNT = 4 # Concurrent /process_text pipelines run by the host
+JOB_QUEUE_MAX_PENDING = 100 # Submissions beyond this are rejected with HTTP 429
+JOB_DEFAULT_DEADLINE_SECONDS = 300 # Applied when a submission does not set its own deadline
+JOB_MAX_FINISHED_RETAINED = 500 # Finished jobs kept in memory for polling
+JOB_EVENTS_HEARTBEAT_SECONDS = 15 # Keep-alive interval for the SSE job stream
+
 # File Handling
 DEFAULT_FILE_ENCODING = "latin-1" # Default encoding for reading documents
 
@@ -45,4 +52,6 @@ if __name__ == '__main__':
     print(f"DEFAULT_FILE_ENCODING: {DEFAULT_FILE_ENCODING}")
     print(f"API_KEY is set: {bool(API_KEY)}")
     print(f"GENAI_MODEL: {GENAI_MODEL}")
-    print(f"MCP_SERVER_URL: {MCP_SERVER_URL}") 
\ No newline at end of file
+    print(f"MCP_SERVER_URL: {MCP_SERVER_URL}")
+    print(f"JOB_WORKER_COUNT: {JOB_WORKER_COUNT}")
+    print(f"JOB_QUEUE_MAX_PENDING: {JOB_QUEUE_MAX_PENDING}") 
\ No newline at end of file
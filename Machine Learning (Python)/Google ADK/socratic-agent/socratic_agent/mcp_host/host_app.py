@@ -1,17 +1,15 @@
+import asyncio
+from contextlib import asynccontextmanager
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
-from socratic_agent.core.config import API_KEY
+from socratic_agent.core.config import API_KEY, JOB_EVENTS_HEARTBEAT_SECONDS
 from socratic_agent.adk.prompt_templates import create_evaluation_prompt, create_summarization_prompt
 from socratic_agent.adk.llm_interaction import get_llm_response
 from socratic_agent.mcp_host.client import MCPClient, MCPClientError
-from socratic_agent.mcp_host.models import HostInput, HostOutput
-
-app = FastAPI(
-    title="Socratic Agent - MCP Host",
-    description="Orchestrates document retrieval via MCP Server and LLM interaction.",
-    version="0.1.0"
-)
+from socratic_agent.mcp_host.jobs import JobManager, JobNotFoundError, JobQueueFullError
+from socratic_agent.mcp_host.models import HostInput, HostOutput, JobInfo, JobSubmission
 
 HOST_URL = "http://127.0.0.1"
 PORT = 8002
@@ -19,12 +17,50 @@ EXPECTED_RETRIEVER_TOOL_NAME = "document_retriever"
 if not API_KEY:
     raise ValueError("MCP Host: GOOGLE_API_KEY not configured. Cannot call LLM.")
 
+# Global to be populated by the lifespan manager
+JOB_MANAGER: JobManager | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Handles startup and shutdown events for the FastAPI app.
+    Starts the job worker pool on startup and stops it on shutdown.
+    """
+    global JOB_MANAGER
+    print("MCP Host: Lifespan startup...")
+    JOB_MANAGER = JobManager(processor=process_host_input)
+    await JOB_MANAGER.start()
+
+    yield
+
+    print("MCP Host: Lifespan shutdown.")
+    await JOB_MANAGER.stop()
+    JOB_MANAGER = None
+
+
+app = FastAPI(
+    title="Socratic Agent - MCP Host",
+    description="Orchestrates document retrieval via MCP Server and LLM interaction.",
+    version="0.1.0",
+    lifespan=lifespan
+)
+
+
 @app.post("/process_text", response_model=HostOutput)
 async def process_text_endpoint(host_input: HostInput):
     """
     Receives target text, retrieves relevant documents via MCP Server, 
     constructs a prompt, calls an LLM, and returns the response.
     """
+    return await process_host_input(host_input)
+
+
+async def process_host_input(host_input: HostInput) -> HostOutput:
+    """
+    Runs the full retrieval + LLM pipeline for one input.
+    Shared by the blocking /process_text endpoint and the /jobs worker pool.
+    """
     print(f"MCP Host: Processing text: {host_input.target_text[:min(len(host_input.target_text), 100)]}...")
     
     mcp_client = MCPClient() 
@@ -122,10 +158,82 @@ async def process_text_endpoint(host_input: HostInput):
             model_name=None
         )
 
+def _get_job_manager() -> JobManager:
+    if JOB_MANAGER is None:
+        raise HTTPException(status_code=503, detail="Job worker pool is not running.")
+    return JOB_MANAGER
+
+
+def _get_job_or_404(job_id: str):
+    try:
+        return _get_job_manager().get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.post("/jobs", response_model=JobInfo, status_code=202)
+async def submit_job(submission: JobSubmission):
+    """Queues a /process_text request and immediately returns its job id."""
+    if submission.prompt_style not in ["evaluation", "summarization"]:
+        raise HTTPException(status_code=422, detail="MCP Host: Unsupported prompt style.")
+    try:
+        job = await _get_job_manager().submit(submission)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_info()
+
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """Returns the current status of a job, including its result once finished."""
+    return _get_job_or_404(job_id).to_info()
+
+
+@app.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """Cancels a queued or running job."""
+    try:
+        return _get_job_manager().cancel(job_id).to_info()
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Streams the job's state as Server-Sent Events: one event per status change,
+    named after the status, ending with the terminal state.
+    """
+    job = _get_job_or_404(job_id)
+
+    async def event_stream():
+        last_status = None
+        while True:
+            changed = job.changed
+            _get_job_manager().get(job_id)  # Applies deadline expiry to queued jobs.
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: {job.status.value}\ndata: {job.to_info().model_dump_json()}\n\n"
+                if job.status.is_terminal:
+                    return
+            if await request.is_disconnected():
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=JOB_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 if __name__ == "__main__":
     print(f"Attempting to run MCP Host with Uvicorn on {HOST_URL}:{PORT}")
     print("Endpoints available:")
     print("  POST /process_text")
+    print("  POST /jobs")
+    print("  GET  /jobs/{job_id}")
+    print("  GET  /jobs/{job_id}/events (SSE)")
+    print("  DELETE /jobs/{job_id}")
     print("  GET  /docs (Swagger UI)")
     print("  GET  /redoc (ReDoc UI)")
     uvicorn.run(app, host=HOST_URL, port=PORT) 
\ No newline at end of file
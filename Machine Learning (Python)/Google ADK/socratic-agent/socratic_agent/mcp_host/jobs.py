@@ -0,0 +1,267 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Optional
+
+from socratic_agent.core.config import (
+    JOB_WORKER_COUNT, JOB_QUEUE_MAX_PENDING,
+    JOB_DEFAULT_DEADLINE_SECONDS, JOB_MAX_FINISHED_RETAINED
+)
+from .models import HostInput, HostOutput, JobInfo, JobStatus, JobSubmission
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+    pass
+
+
+class JobNotFoundError(Exception):
+    """Raised when a job id is unknown (never submitted, or already pruned)."""
+    pass
+
+
+@dataclass(eq=False)
+class Job:
+    """A single queued /process_text request and its lifecycle state."""
+    job_id: str
+    user_id: str
+    host_input: HostInput
+    created_at: float
+    deadline_at: Optional[float] = None
+    status: JobStatus = JobStatus.QUEUED
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[HostOutput] = None
+    error_message: Optional[str] = None
+    cancel_requested: bool = False
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    # Replaced on every transition, so waiters hold the event of the state they last saw.
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def is_past_deadline(self) -> bool:
+        return self.deadline_at is not None and time.time() >= self.deadline_at
+
+    def transition(self, status: JobStatus, error_message: Optional[str] = None):
+        """Moves the job to a new status and wakes up anyone waiting on it."""
+        self.status = status
+        if status is JobStatus.RUNNING:
+            self.started_at = time.time()
+        elif status.is_terminal:
+            self.finished_at = time.time()
+        if error_message is not None:
+            self.error_message = error_message
+        previous, self.changed = self.changed, asyncio.Event()
+        previous.set()
+
+    def to_info(self) -> JobInfo:
+        return JobInfo(
+            job_id=self.job_id,
+            user_id=self.user_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            deadline_at=self.deadline_at,
+            result=self.result,
+            error_message=self.error_message
+        )
+
+
+class JobQueueBackend(ABC):
+    """
+    Storage for jobs waiting on a worker. Implementations decide the dequeue order;
+    the JobManager only relies on the methods below.
+    """
+
+    @abstractmethod
+    async def put(self, job: Job):
+        """Enqueues a job. Raises JobQueueFullError if the backend is at capacity."""
+
+    @abstractmethod
+    async def get(self) -> Job:
+        """Waits for and removes the next job to run."""
+
+    @abstractmethod
+    def discard(self, job: Job) -> bool:
+        """Removes a still-queued job. Returns False if it was not queued."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of jobs currently waiting."""
+
+
+class InMemoryFairJobQueue(JobQueueBackend):
+    """
+    In-process queue with one FIFO per user. Users are served round-robin, so a burst
+    from one user cannot starve the others.
+    """
+
+    def __init__(self, max_pending: int = JOB_QUEUE_MAX_PENDING):
+        if max_pending <= 0:
+            raise ValueError("max_pending must be a positive integer.")
+        self._max_pending = max_pending
+        self._queues: "OrderedDict[str, Deque[Job]]" = OrderedDict()
+        self._size = 0
+        self._not_empty = asyncio.Condition()
+
+    async def put(self, job: Job):
+        async with self._not_empty:
+            if self._size >= self._max_pending:
+                raise JobQueueFullError(f"Job queue is full ({self._max_pending} pending jobs).")
+            self._queues.setdefault(job.user_id, deque()).append(job)
+            self._size += 1
+            self._not_empty.notify()
+
+    async def get(self) -> Job:
+        async with self._not_empty:
+            await self._not_empty.wait_for(lambda: self._size > 0)
+            user_id, user_queue = next(iter(self._queues.items()))
+            job = user_queue.popleft()
+            self._size -= 1
+            if user_queue:
+                self._queues.move_to_end(user_id)  # Next turn goes to the other users first.
+            else:
+                del self._queues[user_id]
+            return job
+
+    def discard(self, job: Job) -> bool:
+        user_queue = self._queues.get(job.user_id)
+        if user_queue is None or job not in user_queue:
+            return False
+        user_queue.remove(job)
+        self._size -= 1
+        if not user_queue:
+            del self._queues[job.user_id]
+        return True
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class JobManager:
+    """
+    Runs queued jobs on a bounded pool of asyncio workers, enforcing deadlines and
+    supporting cancellation of both queued and running jobs.
+    """
+
+    def __init__(
+        self,
+        processor: Callable[[HostInput], Awaitable[HostOutput]],
+        backend: Optional[JobQueueBackend] = None,
+        num_workers: int = JOB_WORKER_COUNT,
+        default_deadline_seconds: Optional[float] = JOB_DEFAULT_DEADLINE_SECONDS,
+        max_finished_jobs: int = JOB_MAX_FINISHED_RETAINED
+    ):
+        if num_workers <= 0:
+            raise ValueError("num_workers must be a positive integer.")
+        self._processor = processor
+        self._backend = backend if backend is not None else InMemoryFairJobQueue()
+        self._num_workers = num_workers
+        self._default_deadline_seconds = default_deadline_seconds
+        self._max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self):
+        """Spawns the worker tasks. Must be called from within the running event loop."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self._num_workers)
+        ]
+        print(f"Job Manager: Started {self._num_workers} workers.")
+
+    async def stop(self):
+        """Cancels the workers (and with them any running jobs)."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        print("Job Manager: Workers stopped.")
+
+    async def submit(self, submission: JobSubmission) -> Job:
+        """Creates a job and enqueues it. Raises JobQueueFullError when at capacity."""
+        now = time.time()
+        deadline_seconds = submission.deadline_seconds or self._default_deadline_seconds
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            user_id=submission.user_id,
+            host_input=HostInput(target_text=submission.target_text, prompt_style=submission.prompt_style),
+            created_at=now,
+            deadline_at=now + deadline_seconds if deadline_seconds else None
+        )
+        await self._backend.put(job)
+        self._jobs[job.job_id] = job
+        print(f"Job Manager: Queued job {job.job_id} for user '{job.user_id}' ({len(self._backend)} pending).")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Returns a job by id. Queued jobs past their deadline are expired on access."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Job '{job_id}' not found.")
+        if job.status is JobStatus.QUEUED and job.is_past_deadline():
+            self._backend.discard(job)
+            job.transition(JobStatus.EXPIRED, error_message="Job deadline passed before a worker became available.")
+            self._prune()
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancels a queued or running job. Finished jobs are returned unchanged."""
+        job = self.get(job_id)
+        if job.status.is_terminal:
+            return job
+        job.cancel_requested = True
+        if job.status is JobStatus.QUEUED:
+            self._backend.discard(job)
+            job.transition(JobStatus.CANCELLED, error_message="Job cancelled while queued.")
+            self._prune()
+        elif job.task is not None:
+            job.task.cancel()  # The worker records the CANCELLED state.
+        return job
+
+    def pending_count(self) -> int:
+        return len(self._backend)
+
+    async def _worker(self):
+        while True:
+            job = await self._backend.get()
+            if job.status is not JobStatus.QUEUED:
+                continue
+            if job.is_past_deadline():
+                job.transition(JobStatus.EXPIRED, error_message="Job deadline passed before a worker became available.")
+                self._prune()
+                continue
+            await self._run(job)
+            self._prune()
+
+    async def _run(self, job: Job):
+        timeout = job.deadline_at - time.time() if job.deadline_at is not None else None
+        job.transition(JobStatus.RUNNING)
+        job.task = asyncio.create_task(asyncio.wait_for(self._processor(job.host_input), timeout=timeout))
+        try:
+            job.result = await job.task
+            if job.result.error_message:
+                job.transition(JobStatus.FAILED, error_message=job.result.error_message)
+            else:
+                job.transition(JobStatus.SUCCEEDED)
+        except asyncio.TimeoutError:
+            job.transition(JobStatus.EXPIRED, error_message="Job deadline passed while processing.")
+        except asyncio.CancelledError:
+            job.transition(JobStatus.CANCELLED, error_message="Job cancelled while running.")
+            if not job.cancel_requested:
+                raise  # The worker itself is being shut down.
+        except Exception as e:
+            job.transition(JobStatus.FAILED, error_message=f"Unexpected error while processing job: {e}")
+        finally:
+            job.task = None
+
+    def _prune(self):
+        """Forgets the oldest finished jobs beyond max_finished_jobs."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status.is_terminal]
+        for job_id in finished[:max(0, len(finished) - self._max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -1,3 +1,4 @@
+from enum import Enum
 from pydantic import BaseModel, Field
 from typing import Any, Dict, List, Optional
 
@@ -19,4 +20,32 @@ class MCPToolInfo(BaseModel):
     output_schema: Dict[str, Any] # JSON schema as dict
 
 class MCPToolRegistryInfo(BaseModel):
-    tools: List[MCPToolInfo] 
\ No newline at end of file
+    tools: List[MCPToolInfo]
+
+# --- Job API Models (asynchronous /jobs endpoints) ---
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
+
+    @property
+    def is_terminal(self) -> bool:
+        return self not in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+class JobSubmission(HostInput):
+    user_id: str = Field("anonymous", description="Identifies the submitter; the worker pool round-robins between users.")
+    deadline_seconds: Optional[float] = Field(None, gt=0, description="Seconds from submission after which the job is abandoned. Defaults to the host's configured deadline.")
+
+class JobInfo(BaseModel):
+    job_id: str = Field(..., description="Identifier to poll, stream or cancel the job with.")
+    user_id: str
+    status: JobStatus
+    created_at: float = Field(..., description="Submission time (UNIX epoch seconds).")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    deadline_at: Optional[float] = Field(None, description="Time (UNIX epoch seconds) after which the job is abandoned.")
+    result: Optional[HostOutput] = Field(None, description="The host's output once the job has succeeded.")
+    error_message: Optional[str] = None
@@ -1,10 +1,15 @@
+import time
+import uuid
 import httpx
 import streamlit as st
 
 # Macros
 BASE_URL = "http://127.0.0.1"
 HOST_PORT = "8002"
-ENDPOINT = f"{BASE_URL}:{HOST_PORT}/process_text"
+ENDPOINT = f"{BASE_URL}:{HOST_PORT}/jobs"
+POLL_INTERVAL_SECONDS = 1
+JOB_TIMEOUT_SECONDS = 120
+TERMINAL_JOB_STATUSES = {"succeeded", "failed", "cancelled", "expired"}
 
 # Page configuration
 st.set_page_config(page_title="Socratic Agent UI", page_icon="🧠", layout="centered")
@@ -29,6 +34,10 @@ if "doc_batches" not in st.session_state:
     # Each batch is a dict: {"prompt_excerpt": str, "docs": list[str]}
     st.session_state.doc_batches = []
 
+# Identifies this browser session to the host's job queue (used for per-user fairness)
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+
 # Track the latest user prompt (used for sidebar header)
 if "latest_prompt" not in st.session_state:
     st.session_state.latest_prompt = ""
@@ -73,43 +82,59 @@ if user_input:
     # Backend call
     # -------------------------------------------------------------------------
     try:
+        # Submit a job, then poll it until it reaches a terminal state
         response = httpx.post(
             ENDPOINT,
             json={
                 "target_text": user_input,
                 "prompt_style": st.session_state.prompt_style,
+                "user_id": st.session_state.user_id,
+                "deadline_seconds": JOB_TIMEOUT_SECONDS,
             },
-            timeout=120,
+            timeout=10,
         )
-
-        if response.status_code != 200:
-            assistant_content = f"❌ Error: {response.status_code} - {response.text}"
-        else:
-            data = response.json()
-
-            if data.get("error_message"):
-                # Show a more user-friendly error message
-                error_msg = data["error_message"]
-                if "LLM service is temporarily overloaded" in error_msg:
-                    assistant_content = "⚠️ The AI service is currently busy. Please try again in a few moments."
-                elif "Rate limit exceeded" in error_msg:
-                    assistant_content = "⚠️ We've hit our rate limit. Please wait a minute before trying again."
-                else:
-                    assistant_content = f"⚠️ {error_msg}"
+        response.raise_for_status()
+        job = response.json()
+        job_url = f"{ENDPOINT}/{job['job_id']}"
+
+        poll_deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+        while job["status"] not in TERMINAL_JOB_STATUSES:
+            if time.monotonic() > poll_deadline:
+                httpx.delete(job_url, timeout=10)
+                raise httpx.TimeoutException("Job did not finish in time.")
+            placeholder.markdown("⏳ Queued…" if job["status"] == "queued" else "⏳ Thinking…")
+            time.sleep(POLL_INTERVAL_SECONDS)
+            job_response = httpx.get(job_url, timeout=10)
+            job_response.raise_for_status()
+            job = job_response.json()
+
+        data = job.get("result") or {"error_message": job.get("error_message") or f"Job {job['status']}."}
+
+        if data.get("error_message"):
+            # Show a more user-friendly error message
+            error_msg = data["error_message"]
+            if "LLM service is temporarily overloaded" in error_msg:
+                assistant_content = "⚠️ The AI service is currently busy. Please try again in a few moments."
+            elif "Rate limit exceeded" in error_msg:
+                assistant_content = "⚠️ We've hit our rate limit. Please wait a minute before trying again."
             else:
-                model_name = data.get("model_name", "unknown-model")  # Fallback to "Assistant" if no model name
-                response_text = data.get("processed_text", "<no response>")
-                assistant_content = f"**{model_name}** says:\n\n{response_text}"
-
-            # Only add documents to sidebar if there was no error
-            if not data.get("error_message") and data.get("retrieved_documents"):
-                # Add a new batch for this query's results
-                batch_entry = {
-                    "prompt_excerpt": user_input[:30].strip(),
-                    "docs": data["retrieved_documents"],
-                }
-                st.session_state.doc_batches.append(batch_entry)
-
+                assistant_content = f"⚠️ {error_msg}"
+        else:
+            model_name = data.get("model_name", "unknown-model")  # Fallback to "Assistant" if no model name
+            response_text = data.get("processed_text", "<no response>")
+            assistant_content = f"**{model_name}** says:\n\n{response_text}"
+
+        # Only add documents to sidebar if there was no error
+        if not data.get("error_message") and data.get("retrieved_documents"):
+            # Add a new batch for this query's results
+            batch_entry = {
+                "prompt_excerpt": user_input[:30].strip(),
+                "docs": data["retrieved_documents"],
+            }
+            st.session_state.doc_batches.append(batch_entry)
+
+    except httpx.HTTPStatusError as e:
+        assistant_content = f"❌ Error: {e.response.status_code} - {e.response.text}"
     except httpx.TimeoutException:
         assistant_content = "❌ Request timed out. The server took too long to respond."
     except httpx.RequestError as e:
@@ -1,13 +1,36 @@
-import asyncio, logging
+import asyncio, logging, time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 from zoneinfo import ZoneInfo
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types
-import PyPDF2
 import os # Import os to handle paths
 from dotenv import load_dotenv # Import load_dotenv
+try:
+    from .rolling_context import RollingContext, TokenUsageTracker, estimate_tokens
+except ImportError: # Run directly as a script instead of loaded as a package by ADK
+    from rolling_context import RollingContext, TokenUsageTracker, estimate_tokens
+try:
+    from .pdf_extraction import PageCache, count_pdf_pages, file_sha256, stream_pdf_segments
+except ImportError: # Run directly as a script instead of loaded as a package by ADK
+    from pdf_extraction import PageCache, count_pdf_pages, file_sha256, stream_pdf_segments
+try:
+    from .agent_sessions import AgentSessionManager
+except ImportError: # Run directly as a script instead of loaded as a package by ADK
+    from agent_sessions import AgentSessionManager
+try:
+    from .checkpoints import (
+        CheckpointStore, PdfCheckpoints, run_step,
+        STEP_FIRST_PASS, STEP_SECOND_PASS, STEP_FACT_CHECK, STEP_ROLLING_CONTEXT
+    )
+except ImportError: # Run directly as a script instead of loaded as a package by ADK
+    from checkpoints import (
+        CheckpointStore, PdfCheckpoints, run_step,
+        STEP_FIRST_PASS, STEP_SECOND_PASS, STEP_FACT_CHECK, STEP_ROLLING_CONTEXT
+    )
 
 # --- Load Environment Variables --- #
 load_dotenv() # Load variables from .env file
@@ -40,61 +63,71 @@ USER_ID = "user123"
 SESSION_ID = "session123"
 MODEL_NAME = "gemini-2.0-flash-exp"
 #MODEL_NAME = "gemini-2.5-pro-exp-03-25"
+MAX_CONCURRENT_AGENT_CALLS = 5 # Upper bound on in-flight LLM calls in the parallel workflow
+USE_PARALLEL_WORKFLOW = True # main() runs run_parallel_workflow instead of run_interactive_workflow
+CALL_TOKEN_BUDGET = 12000 # Max estimated prompt tokens per agent call; previous-segment context is cut to fit
+CONTEXT_RECENT_WINDOW = 2 # Previous summaries passed verbatim; older ones live in the digest
+CONTEXT_DIGEST_MAX_TOKENS = 800 # Size cap of the digest of earlier segments
+SEGMENT_SIZE = 10 # Pages per segment
+PDF_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'pdf_cache') # Extracted page text, keyed by PDF hash
+page_cache = PageCache(PDF_CACHE_DIR)
+CHECKPOINT_DB_PATH = os.path.join(os.path.dirname(__file__), 'checkpoints.sqlite3') # Completed agent steps, for resuming workflows
+
+
+class AgentCallError(Exception):
+    """Raised by call_agent_async(raise_on_error=True) when an agent call yields no usable response."""
+    pass
+
 
+@dataclass
+class WorkflowStats:
+    """Counts agent calls and wall-clock time for one workflow run."""
+    llm_calls: int = 0
+    calls_per_agent: dict[str, int] = field(default_factory=dict)
+    wall_clock_seconds: float = 0.0
 
-def read_pdf(file_path: str) -> list[str]: # Return list of pages
-    """Reads text content from a PDF file, page by page."""
-    pages_text = []
+    def record_call(self, agent_name: str):
+        self.llm_calls += 1
+        self.calls_per_agent[agent_name] = self.calls_per_agent.get(agent_name, 0) + 1
+
+    def log_summary(self):
+        logging.info(f"Workflow Stats: {self.llm_calls} LLM calls in {self.wall_clock_seconds:.2f}s (per agent: {self.calls_per_agent})")
+
+
+def count_pdf_segments(file_path: str, segment_size: int = SEGMENT_SIZE) -> int:
+    """Returns the number of segments a PDF will be split into, or 0 if it cannot be read."""
     try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            logging.info(f"Reading PDF: {file_path} ({len(reader.pages)} pages)")
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    pages_text.append(page_text.strip())
-                else:
-                    logging.warning(f"No text could be extracted from page {i+1} of {file_path}.")
-                    pages_text.append("")
-        if not any(pages_text):
-             logging.warning(f"No text could be extracted from {file_path}. The PDF might be image-based or empty.")
-        return pages_text
+        return -(-count_pdf_pages(file_path) // segment_size)
     except FileNotFoundError:
         logging.error(f"PDF file not found at {file_path}")
-        return []
     except Exception as e:
         logging.error(f"Error reading PDF {file_path}: {e}")
-        return []
-
-# Function to segment PDF pages
-def segment_pdf_text(pages: list[str], segment_size: int = 10) -> list[str]:
-    """Segments a list of page texts into chunks of specified size."""
-    segments = []
-    for i in range(0, len(pages), segment_size):
-        min_, max_ = i, i + segment_size
-        max_ = min(max_, len(pages))
-        segment_pages = pages[min_:max_]
-        # Join pages within a segment, adding separators for clarity
-        segment_text = "\n\n--- Page Break ---\n\n".join(segment_pages)
-        segments.append(segment_text)
-    logging.info(f"PDF segmented into {len(segments)} segments of up to {segment_size} pages each.")
-    return segments
-
-async def call_agent_async(agent: Agent, query: str, session_service: InMemorySessionService, user_id: str, session_id: str) -> str:
-    """Sends a query to a specific agent and returns the final response text."""
+    return 0
+
+async def call_agent_async(agent: Agent, query: str, session_service: InMemorySessionService, user_id: str, session_id: str, runner_factory: Callable[..., Runner] = Runner, stats: Optional[WorkflowStats] = None, raise_on_error: bool = False, runner: Optional[Runner] = None) -> str:
+    """Sends a query to a specific agent and returns the final response text.
+    Pass a cached runner to reuse it; otherwise one is built with runner_factory, which lets
+    tests substitute a stub with Runner's constructor and run_async() signatures.
+    With raise_on_error, failures raise AgentCallError instead of returning an error text, so that
+    checkpointed workflows never store them as results.
+    """
     # logging.info(f"Calling Agent: {agent.name} with Query: {query[:100]}...") # Original line - commented out
     logging.info(f"Calling Agent: {agent.name}") # Modified: Log only agent name
-
-    # Create a runner for the specific agent
-    runner = Runner(
-        agent=agent,
-        app_name=APP_NAME, # Use the global APP_NAME
-        session_service=session_service, # Pass the session service
-    )
+    if stats is not None:
+        stats.record_call(agent.name)
+
+    # Create a runner for the specific agent, unless a cached one was passed
+    if runner is None:
+        runner = runner_factory(
+            agent=agent,
+            app_name=APP_NAME, # Use the global APP_NAME
+            session_service=session_service, # Pass the session service
+        )
 
     # Prepare the user's message in ADK format
     content = types.Content(role='user', parts=[types.Part(text=query)])
     final_response_text = f"Agent {agent.name} did not produce a final response." # Default
+    succeeded = False
 
     try:
         # Use the passed user_id and session_id
@@ -103,34 +136,87 @@ async def call_agent_async(agent: Agent, query: str, session_service: InMemorySe
             if event.is_final_response():
                 if event.content and event.content.parts:
                     final_response_text = event.content.parts[0].text
+                    succeeded = True
                 elif event.actions and event.actions.escalate:
                     final_response_text = f"Agent {agent.name} escalated: {event.error_message or 'No specific message.'}"
                 break
     except Exception as e:
         logging.error(f"Error during agent call ({agent.name}): {e}")
         final_response_text = f"Error occurred while calling agent {agent.name}."
+        if raise_on_error:
+            raise AgentCallError(final_response_text) from e
+
+    if raise_on_error and not succeeded:
+        raise AgentCallError(final_response_text)
 
     logging.info(f"Agent {agent.name} Response: {final_response_text[:100]}...")
     return final_response_text
 
+async def call_agent_scoped(sessions: AgentSessionManager, agent: Agent, query: str, scope: str, stats: Optional[WorkflowStats] = None, raise_on_error: bool = False) -> str:
+    """Calls an agent through its cached Runner, in a session that only lives for this call."""
+    async with sessions.scoped_session(f"{SESSION_ID}_{scope}") as session_id:
+        return await call_agent_async(agent, query, sessions.session_service, sessions.user_id, session_id, stats=stats, raise_on_error=raise_on_error, runner=sessions.runner_for(agent))
+
+# Prompt builders shared by the sequential and parallel workflows
+def build_first_pass_prompt(segment_text: str) -> str:
+    return f"Summarize the following text excerpt from a PDF segment:\n\n{segment_text}"
+
+def build_second_pass_prompt(segment_text: str, summary1: str, previous_context: str) -> str:
+    return f"Original Text Segment:\n{segment_text}\n\nFirst Summary of this Segment:\n{summary1}\n\nContext from Previous Segments (for context only):\n{previous_context or 'N/A - This is the first segment.'}"
+
+def build_fact_check_prompt(segment_text: str, summary2: str, previous_context: str) -> str:
+    return f"Original Text Segment:\n{segment_text}\n\nFinal Summary of this Segment:\n{summary2}\n\nContext from Previous Segments (for context only):\n{previous_context or 'N/A - This is the first segment.'}"
+
+def build_digest_prompt(digest: str, summary: str, max_tokens: int) -> str:
+    return f"Current Digest of Earlier Segments:\n{digest or 'N/A - The digest is empty.'}\n\nSegment Summary to Fold In:\n{summary}\n\nMaximum Length: about {max_tokens * 3 // 4} words."
+
+def render_previous_context(rolling_context: RollingContext, call_token_budget: int, *prompt_parts: str) -> str:
+    """Renders the rolling context within what is left of the call budget after the other prompt parts."""
+    budget = call_token_budget - sum(estimate_tokens(part) for part in prompt_parts)
+    if budget <= 0:
+        logging.warning(f"Prompt parts alone exceed the call budget of {call_token_budget} tokens; sending no previous context.")
+        return ""
+    return rolling_context.render(budget)
+
+async def advance_rolling_context(rolling_context: RollingContext, final_summary: str, segment_index: int, checkpoints: Optional[PdfCheckpoints] = None):
+    """Folds a segment's final summary into the rolling context, or restores the checkpointed result of doing so."""
+    snapshot = checkpoints.get(segment_index, STEP_ROLLING_CONTEXT) if checkpoints is not None else None
+    if snapshot is not None:
+        rolling_context.load_json(snapshot)
+        return
+    await rolling_context.add_summary(final_summary)
+    if checkpoints is not None:
+        checkpoints.put(segment_index, STEP_ROLLING_CONTEXT, rolling_context.to_json())
+
 # New function to process a single segment
-async def process_pdf_segment(segment_text: str, accumulated_previous_summaries: str, session_service: InMemorySessionService, user_id: str, session_id: str) -> tuple[str, str]:
-    """Runs the 3-agent pipeline for a single PDF segment and returns final summary and critique."""
+async def process_pdf_segment(segment_text: str, previous_context: RollingContext, sessions: AgentSessionManager, segment_index: int = 0, token_tracker: Optional[TokenUsageTracker] = None, call_token_budget: int = CALL_TOKEN_BUDGET, checkpoints: Optional[PdfCheckpoints] = None) -> tuple[str, str]:
+    """Runs the 3-agent pipeline for a single PDF segment and returns final summary and critique.
+    Agents 2 and 3 receive the rolling context, cut down to what fits in call_token_budget.
+    With checkpoints, steps already completed in an earlier run are reused instead of called again.
+    Each step runs in its own disposable session, so agents never see each other's history.
+    """
+    token_tracker = token_tracker or TokenUsageTracker()
+
+    async def call(agent: Agent, prompt: str, context: str = "") -> str:
+        token_tracker.record(segment_index, agent.name, prompt, context)
+        return await call_agent_scoped(sessions, agent, prompt, f"segment{segment_index}_{agent.name}", raise_on_error=checkpoints is not None)
 
     # --- Call Agent 1 (First Pass Summary) --- #
     logging.info("Segment Step 1: Calling First Pass Summarizer")
-    prompt_agent1 = f"Summarize the following text excerpt from a PDF segment:\n\n{segment_text}"
-    summary1 = await call_agent_async(agent_first_pass, prompt_agent1, session_service, user_id, session_id)
+    prompt_agent1 = build_first_pass_prompt(segment_text)
+    summary1 = await run_step(checkpoints, segment_index, STEP_FIRST_PASS, lambda: call(agent_first_pass, prompt_agent1))
 
     # --- Call Agent 2 (Second Pass Summary + Context) --- #
     logging.info("Segment Step 2: Calling Second Pass Summarizer")
-    prompt_agent2 = f"Original Text Segment:\n{segment_text}\n\nFirst Summary of this Segment:\n{summary1}\n\nSummaries of ALL Previous Segments (for context only):\n{accumulated_previous_summaries or 'N/A - This is the first segment.'}"
-    summary2 = await call_agent_async(agent_second_pass, prompt_agent2, session_service, user_id, session_id)
+    context_agent2 = render_previous_context(previous_context, call_token_budget, segment_text, summary1)
+    prompt_agent2 = build_second_pass_prompt(segment_text, summary1, context_agent2)
+    summary2 = await run_step(checkpoints, segment_index, STEP_SECOND_PASS, lambda: call(agent_second_pass, prompt_agent2, context_agent2))
 
     # --- Call Agent 3 (Fact Check + Context) --- #
     logging.info("Segment Step 3: Calling Fact Checker/Critic")
-    prompt_agent3 = f"Original Text Segment:\n{segment_text}\n\nFinal Summary of this Segment:\n{summary2}\n\nSummaries of ALL Previous Segments (for context only):\n{accumulated_previous_summaries or 'N/A - This is the first segment.'}"
-    critique = await call_agent_async(agent_fact_check, prompt_agent3, session_service, user_id, session_id)
+    context_agent3 = render_previous_context(previous_context, call_token_budget, segment_text, summary2)
+    prompt_agent3 = build_fact_check_prompt(segment_text, summary2, context_agent3)
+    critique = await run_step(checkpoints, segment_index, STEP_FACT_CHECK, lambda: call(agent_fact_check, prompt_agent3, context_agent3))
 
     return summary2, critique # Return final summary and critique for this segment
 
@@ -153,7 +239,7 @@ agent_second_pass = Agent(
         "Agent to refine the first pass summary of a PDF segment, using previous context."
     ),
     instruction=(
-        "I have sent you: (1) the original text from a 10-page PDF segment, (2) a first-pass summary of THIS segment, and (3) the CONCATENATED final summaries of ALL PREVIOUS segments (if any). "
+        "I have sent you: (1) the original text from a 10-page PDF segment, (2) a first-pass summary of THIS segment, and (3) context from PREVIOUS segments (if any): a digest of the earlier segments followed by the final summaries of the most recent ones. "
         "Compare the first-pass summary (2) to the original text segment (1). Does the summary leave anything important out from THIS segment? If so, add the missing information. Remove any unimportant or redundant information from the summary. "
         "Use the previous segments' summaries (3) only for context if needed to ensure flow or understand references, but focus primarily on accurately and concisely summarizing THIS current segment (1). "
         "Ensure the summary maintains the original's tone. Return only the final, revised summary text for THIS segment."
@@ -167,56 +253,89 @@ agent_fact_check = Agent(
         "Agent that acts as a critic of the second pass summary for a segment, using previous context."
     ),
     instruction=(
-        "I have sent you: (1) the original text from a 10-page PDF segment, (2) the final summary of THIS segment, and (3) the CONCATENATED final summaries of ALL PREVIOUS segments (if any). "
+        "I have sent you: (1) the original text from a 10-page PDF segment, (2) the final summary of THIS segment, and (3) context from PREVIOUS segments (if any): a digest of the earlier segments followed by the final summaries of the most recent ones. "
         "Fact check the final summary (2) against the original text segment (1). Rate its conciseness, accuracy, and completeness FOR THIS SEGMENT. "
         "You can refer to the previous segments' summaries (3) for context if necessary. Give the result in a table format. Do not return the summary itself, only the evaluation table for THIS segment."
     ),
 )
 
-session_service = InMemorySessionService()
-session = session_service.create_session(
-    app_name=APP_NAME,
-    user_id=USER_ID,
-    session_id=SESSION_ID
+agent_context_digest = Agent(
+    name="agent_context_digest",
+    model=MODEL_NAME,
+    description=(
+        "Agent that folds a segment summary into a fixed-size digest of the earlier segments of a PDF."
+    ),
+    instruction=(
+        "I have sent you: (1) the current digest of the earlier segments of a PDF (possibly empty), (2) the final summary of the next segment, and (3) a maximum length. "
+        "Merge (2) into (1) to produce a single updated digest no longer than the maximum length. Keep the main line of argument, key terms, names and definitions that later segments may refer to. "
+        "Compress older material more than newer material. Return only the updated digest text."
+    ),
 )
-logging.info(f"ADK Session created: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}'")
+
+def make_digest_compressor(sessions: AgentSessionManager, token_tracker: Optional[TokenUsageTracker] = None):
+    """Returns a RollingContext compressor backed by agent_context_digest."""
+    async def compress(digest: str, summary: str, max_tokens: int) -> str:
+        prompt = build_digest_prompt(digest, summary, max_tokens)
+        if token_tracker is not None:
+            token_tracker.record(-1, agent_context_digest.name, prompt)
+        return await call_agent_scoped(sessions, agent_context_digest, prompt, "digest", raise_on_error=True)
+    return compress
+
+session_service = InMemorySessionService() # Sessions are created per agent step by AgentSessionManager
 
 # New Interactive Workflow Function
-async def run_interactive_workflow(pdf_path: str):
+async def run_interactive_workflow(pdf_path: str, resume: bool = True):
     """Reads a PDF, segments it, and processes segments interactively.
+    Segments are streamed, so the first one is summarised while later pages are still being extracted.
+    Every completed step is checkpointed; with resume, a rerun on the same PDF skips them
+    (resume=False discards the PDF's checkpoints first).
     NOTE: This function is designed for testing the logic locally.
     It uses blocking input() and reads from a file path.
     Adaptation is needed for actual ADK chat integration.
     """
     logging.info(f"Starting Interactive PDF Summary Workflow for: {pdf_path}")
 
-    pdf_pages = read_pdf(pdf_path)
-    if not pdf_pages:
-        logging.error("Workflow aborted: Could not read PDF text.")
-        return
-
-    pdf_segments = segment_pdf_text(pdf_pages, segment_size=10)
-    if not pdf_segments:
+    num_segments = count_pdf_segments(pdf_path)
+    if not num_segments:
         logging.warning("Workflow aborted: No segments created.")
         return
 
-    # Store all summaries generated so far in a list
+    checkpoint_store = CheckpointStore(CHECKPOINT_DB_PATH)
+    try:
+        await _run_interactive_segments(pdf_path, num_segments, open_checkpoints(checkpoint_store, pdf_path, SEGMENT_SIZE, resume))
+    finally:
+        checkpoint_store.close()
+
+def open_checkpoints(checkpoint_store: CheckpointStore, pdf_path: str, segment_size: int, resume: bool) -> PdfCheckpoints:
+    pdf_hash = file_sha256(pdf_path)
+    if not resume:
+        checkpoint_store.clear(pdf_hash)
+    return PdfCheckpoints(checkpoint_store, pdf_hash, segment_size)
+
+async def _run_interactive_segments(pdf_path: str, num_segments: int, checkpoints: PdfCheckpoints):
+    # Store all summaries generated so far in a list; agents only see the bounded rolling context
     all_segment_summaries = [] 
+    token_tracker = TokenUsageTracker()
+    sessions = AgentSessionManager(APP_NAME, session_service, USER_ID)
+    rolling_context = RollingContext(
+        compressor=make_digest_compressor(sessions, token_tracker),
+        recent_window=CONTEXT_RECENT_WINDOW,
+        digest_max_tokens=CONTEXT_DIGEST_MAX_TOKENS
+    )
 
-    for i, segment in enumerate(pdf_segments):
-        logging.info(f"Processing Segment {i+1}/{len(pdf_segments)}")
-
-        # Prepare the accumulated context from previous summaries
-        # Join summaries with a clear separator
-        accumulated_context = "\n\n--- End of Previous Segment Summary ---\n\n".join(all_segment_summaries)
+    i = -1
+    async for segment in stream_pdf_segments(pdf_path, segment_size=SEGMENT_SIZE, cache=page_cache):
+        i += 1
+        logging.info(f"Processing Segment {i+1}/{num_segments}")
 
         # Process the current segment using the 3-agent pipeline
         final_summary, critique = await process_pdf_segment(
             segment_text=segment,
-            accumulated_previous_summaries=accumulated_context, # Pass accumulated context
-            session_service=session_service, 
-            user_id=USER_ID,                 
-            session_id=SESSION_ID             
+            previous_context=rolling_context, # Pass bounded context of previous summaries
+            sessions=sessions, # Cached runners and per-step sessions
+            segment_index=i,
+            token_tracker=token_tracker,
+            checkpoints=checkpoints
         )
 
         # --- Log Results for the Segment --- # 
@@ -227,14 +346,15 @@ async def run_interactive_workflow(pdf_path: str):
 
         # Store results 
         all_segment_summaries.append(final_summary) # Add current summary to the list
+        await advance_rolling_context(rolling_context, final_summary, i, checkpoints)
 
         # --- Ask User to Proceed (Simulation - ONLY works when run directly) --- #
-        if i < len(pdf_segments) - 1: # Don't ask after the last segment
+        if i < num_segments - 1: # Don't ask after the last segment
             logging.info("--- Interactive Prompt Simulation (will block if run directly) ---")
             while True:
                 # This input() part will NOT work correctly via adk web
                 try:
-                    #proceed = input(f"Proceed to next segment ({i+2}/{len(pdf_segments)})? (yes/no): ").lower().strip()
+                    #proceed = input(f"Proceed to next segment ({i+2}/{num_segments})? (yes/no): ").lower().strip()
                     proceed = 'yes'
                     if proceed == 'yes' or proceed == 'y':
                         break
@@ -254,12 +374,122 @@ async def run_interactive_workflow(pdf_path: str):
             logging.info("All segments processed. Workflow Complete.")
             # Log combined final results if needed
             logging.info("Final Combined Summary:\n" + "\n\n---\n\n".join(all_segment_summaries)) # Use the list here too
+            token_tracker.log_summary()
+
+# Parallel Workflow Function
+async def run_parallel_workflow(pdf_path: str, segment_size: int = SEGMENT_SIZE, max_concurrency: int = MAX_CONCURRENT_AGENT_CALLS, session_service: InMemorySessionService = session_service, runner_factory: Callable[..., Runner] = Runner, resume: bool = True, checkpoint_db_path: str = CHECKPOINT_DB_PATH) -> tuple[list[str], list[str], WorkflowStats]:
+    """Reads a PDF, segments it, and processes all segments non-interactively.
+    First-pass summaries have no cross-segment dependency, so each one starts as soon as its
+    segment's pages are extracted, concurrently with the others.
+    Second-pass summaries run in segment order, since each needs the previous final summaries;
+    each fact check is launched as soon as its segment's final summary exists, overlapping
+    with the next segment's second pass. At most max_concurrency agent calls are in flight.
+    Every call gets its own disposable session, so concurrent calls never share event history.
+    Agents 2 and 3 see the bounded rolling context, as in the sequential workflow.
+    Steps are checkpointed as in run_interactive_workflow, so a failed run can be resumed.
+    Returns (final summaries, critiques, stats).
+    """
+    logging.info(f"Starting Parallel PDF Summary Workflow for: {pdf_path}")
+    stats = WorkflowStats()
+    start_time = time.perf_counter()
+
+    num_segments = count_pdf_segments(pdf_path, segment_size)
+    if not num_segments:
+        logging.warning("Workflow aborted: No segments created.")
+        return [], [], stats
+
+    checkpoint_store = CheckpointStore(checkpoint_db_path)
+    try:
+        checkpoints = open_checkpoints(checkpoint_store, pdf_path, segment_size, resume)
+        return await _run_parallel_segments(pdf_path, num_segments, segment_size, max_concurrency, session_service, runner_factory, checkpoints, stats, start_time)
+    finally:
+        checkpoint_store.close()
+
+async def _run_parallel_segments(pdf_path: str, num_segments: int, segment_size: int, max_concurrency: int, session_service: InMemorySessionService, runner_factory: Callable[..., Runner], checkpoints: PdfCheckpoints, stats: WorkflowStats, start_time: float) -> tuple[list[str], list[str], WorkflowStats]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+    token_tracker = TokenUsageTracker()
+    sessions = AgentSessionManager(APP_NAME, session_service, USER_ID, runner_factory)
+
+    async def bounded_call(agent: Agent, prompt: str, segment_index: int, context: str = "", step: Optional[str] = None) -> str:
+        async def call() -> str:
+            token_tracker.record(segment_index, agent.name, prompt, context)
+            async with semaphore:
+                return await call_agent_scoped(sessions, agent, prompt, f"segment{segment_index}_{agent.name}", stats, raise_on_error=True)
+        return await run_step(checkpoints if step else None, segment_index, step, call)
+
+    # --- Stage 1: First pass for each segment as soon as it is extracted --- #
+    logging.info(f"Parallel Stage 1: First pass for {num_segments} segments")
+    segment_queue: asyncio.Queue = asyncio.Queue()
+
+    async def extract_and_first_pass():
+        try:
+            i = 0
+            async for segment in stream_pdf_segments(pdf_path, segment_size=segment_size, cache=page_cache):
+                first_pass_task = asyncio.create_task(bounded_call(agent_first_pass, build_first_pass_prompt(segment), i, step=STEP_FIRST_PASS))
+                first_pass_tasks.append(first_pass_task)
+                await segment_queue.put((segment, first_pass_task))
+                i += 1
+        finally:
+            await segment_queue.put(None) # Sentinel: no more segments
+
+    first_pass_tasks = []
+    producer = asyncio.create_task(extract_and_first_pass())
+
+    async def compress(digest: str, summary: str, max_tokens: int) -> str:
+        return await bounded_call(agent_context_digest, build_digest_prompt(digest, summary, max_tokens), -1)
+
+    rolling_context = RollingContext(compressor=compress, recent_window=CONTEXT_RECENT_WINDOW, digest_max_tokens=CONTEXT_DIGEST_MAX_TOKENS)
+
+    # --- Stage 2: Second pass in order; fact checks overlap with later segments --- #
+    logging.info("Parallel Stage 2: Second pass and fact check in dependency order")
+    all_segment_summaries = []
+    critique_tasks = []
+    try:
+        while (queued := await segment_queue.get()) is not None:
+            segment, first_pass_task = queued
+            i = len(all_segment_summaries)
+            summary1 = await first_pass_task
+            context_agent2 = render_previous_context(rolling_context, CALL_TOKEN_BUDGET, segment, summary1)
+            final_summary = await bounded_call(agent_second_pass, build_second_pass_prompt(segment, summary1, context_agent2), i, context_agent2, STEP_SECOND_PASS)
+            all_segment_summaries.append(final_summary)
+            # Rendered before this segment's summary is folded in, so it only covers previous segments.
+            context_agent3 = render_previous_context(rolling_context, CALL_TOKEN_BUDGET, segment, final_summary)
+            critique_tasks.append(asyncio.create_task(
+                bounded_call(agent_fact_check, build_fact_check_prompt(segment, final_summary, context_agent3), i, context_agent3, STEP_FACT_CHECK)
+            ))
+            await advance_rolling_context(rolling_context, final_summary, i, checkpoints)
+        await producer # Surfaces extraction errors
+        all_segment_critiques = await asyncio.gather(*critique_tasks)
+    finally:
+        # On an error, stop the extraction and every agent call still running, and retrieve their outcomes so none is left unawaited.
+        tasks = [producer, *first_pass_tasks, *critique_tasks]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    for i, (final_summary, critique) in enumerate(zip(all_segment_summaries, all_segment_critiques)):
+        logging.info(f"Results for Segment {i+1}")
+        logging.info(f"Final Summary (Agent 2) for Segment {i+1}:\n{final_summary}")
+        logging.info(f"Critique (Agent 3) for Segment {i+1}:\n{critique}")
+
+    stats.wall_clock_seconds = time.perf_counter() - start_time
+    logging.info("All segments processed. Workflow Complete.")
+    logging.info("Final Combined Summary:\n" + "\n\n---\n\n".join(all_segment_summaries))
+    stats.log_summary()
+    token_tracker.log_summary()
+    logging.info(f"Checkpoints: Reused {checkpoints.steps_reused} completed steps.")
+    return all_segment_summaries, list(all_segment_critiques), stats
 
 async def main():
     # Replace with the actual path to your PDF file for this script
     # In a real ADK app, the PDF content/path would come from the chat
     pdf_file_path = "Tese de Mestrado.pdf" # <<< IMPORTANT: UPDATE THIS PATH
-    await run_interactive_workflow(pdf_file_path)
+    if USE_PARALLEL_WORKFLOW:
+        _, _, stats = await run_parallel_workflow(pdf_file_path)
+        print(f"Processed with {stats.llm_calls} LLM calls in {stats.wall_clock_seconds:.2f}s.")
+    else:
+        await run_interactive_workflow(pdf_file_path)
 
 if __name__ == "__main__":
     # Basic asyncio setup to run the main async function
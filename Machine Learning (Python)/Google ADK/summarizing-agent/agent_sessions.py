@@ -0,0 +1,57 @@
+import inspect, itertools, logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+
+
+async def _maybe_await(result):
+    """Session service methods are sync in older ADK releases and async in newer ones."""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class AgentSessionManager:
+    """
+    Caches one Runner per agent and hands out disposable sessions.
+    Each agent step runs in its own session, deleted as soon as the step ends, so no call
+    replays the event history of earlier calls and the session service never grows.
+    """
+
+    def __init__(self, app_name: str, session_service: InMemorySessionService, user_id: str, runner_factory: Callable[..., Runner] = Runner):
+        self.app_name = app_name
+        self.session_service = session_service
+        self.user_id = user_id
+        self.runner_factory = runner_factory
+        self._runners: dict[str, Runner] = {}
+        self._session_counter = itertools.count()
+        self.active_sessions = 0
+        self.sessions_created = 0
+
+    def runner_for(self, agent: Agent) -> Runner:
+        """Returns the cached Runner for an agent, creating it on first use."""
+        runner = self._runners.get(agent.name)
+        if runner is None:
+            runner = self.runner_factory(
+                agent=agent,
+                app_name=self.app_name,
+                session_service=self.session_service,
+            )
+            self._runners[agent.name] = runner
+            logging.info(f"Session Manager: Created Runner for agent {agent.name}.")
+        return runner
+
+    @asynccontextmanager
+    async def scoped_session(self, scope: str) -> AsyncIterator[str]:
+        """Creates a session named after scope, yields its id, and deletes it on exit."""
+        session_id = f"{scope}_{next(self._session_counter)}"
+        await _maybe_await(self.session_service.create_session(app_name=self.app_name, user_id=self.user_id, session_id=session_id))
+        self.active_sessions += 1
+        self.sessions_created += 1
+        try:
+            yield session_id
+        finally:
+            self.active_sessions -= 1
+            await _maybe_await(self.session_service.delete_session(app_name=self.app_name, user_id=self.user_id, session_id=session_id))
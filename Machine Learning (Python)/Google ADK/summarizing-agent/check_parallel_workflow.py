@@ -0,0 +1,77 @@
+import asyncio, os, tempfile
+from types import SimpleNamespace
+from google.genai import types
+
+import agent
+from pdf_extraction import PageCache
+
+
+def write_text_pdf(path: str, pages: list[str]):
+    """Writes a minimal PDF with one line of text per page, enough for PyPDF2's text extraction."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+class StubRunner:
+    """Stands in for Runner: answers every message at once and counts the calls per agent, without any LLM."""
+    calls: dict[str, int] = {}
+
+    def __init__(self, agent, app_name, session_service):
+        self.agent = agent
+
+    async def run_async(self, user_id, session_id, new_message):
+        StubRunner.calls[self.agent.name] = StubRunner.calls.get(self.agent.name, 0) + 1
+        await asyncio.sleep(0) # Lets the other calls in flight interleave, as with a real model
+        text = f"{self.agent.name} on {new_message.parts[0].text[:40]!r}"
+        yield SimpleNamespace(is_final_response=lambda: True, content=types.Content(role="model", parts=[types.Part(text=text)]), actions=None)
+
+
+async def check(num_segments: int = 5, segment_size: int = 2):
+    """Runs run_parallel_workflow twice on the same PDF with StubRunner: the first run makes one call per agent step,
+    the rerun takes every step from the checkpoints and makes none."""
+    with tempfile.TemporaryDirectory() as directory:
+        pdf_path = os.path.join(directory, "document.pdf")
+        write_text_pdf(pdf_path, [f"Page {i + 1} of the document" for i in range(num_segments * segment_size)])
+        agent.page_cache = PageCache(os.path.join(directory, "pdf_cache"))
+        checkpoint_db_path = os.path.join(directory, "checkpoints.sqlite3")
+        expected = {
+            agent.agent_first_pass.name: num_segments,
+            agent.agent_second_pass.name: num_segments,
+            agent.agent_fact_check.name: num_segments,
+            agent.agent_context_digest.name: num_segments - agent.CONTEXT_RECENT_WINDOW, # One fold per summary leaving the recent window
+        }
+
+        StubRunner.calls = {}
+        summaries, critiques, stats = await agent.run_parallel_workflow(pdf_path, segment_size, runner_factory=StubRunner, checkpoint_db_path=checkpoint_db_path)
+        assert len(summaries) == len(critiques) == num_segments, (len(summaries), len(critiques))
+        assert StubRunner.calls == expected, StubRunner.calls
+        assert stats.calls_per_agent == expected and stats.llm_calls == sum(expected.values()), stats
+        print(f"First run: {stats.llm_calls} calls {StubRunner.calls}")
+
+        StubRunner.calls = {}
+        rerun_summaries, rerun_critiques, rerun_stats = await agent.run_parallel_workflow(pdf_path, segment_size, runner_factory=StubRunner, checkpoint_db_path=checkpoint_db_path)
+        assert StubRunner.calls == {} and rerun_stats.llm_calls == 0, StubRunner.calls
+        assert (rerun_summaries, rerun_critiques) == (summaries, critiques)
+        print("Rerun with checkpoints: 0 calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(check())
@@ -0,0 +1,99 @@
+import logging, os, sqlite3, time
+from typing import Awaitable, Callable, Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'checkpoints.sqlite3')
+
+# Step names used as checkpoint keys
+STEP_FIRST_PASS = "first_pass"
+STEP_SECOND_PASS = "second_pass"
+STEP_FACT_CHECK = "fact_check"
+STEP_ROLLING_CONTEXT = "rolling_context" # JSON snapshot of the RollingContext after folding in the segment
+
+
+class CheckpointStore:
+    """
+    Durable store of agent outputs in a local SQLite file, keyed by
+    (PDF hash, segment size, segment index, step). Every write is committed immediately,
+    so a crash loses at most the call that was in flight.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " pdf_hash TEXT NOT NULL,"
+            " segment_size INTEGER NOT NULL,"
+            " segment_index INTEGER NOT NULL,"
+            " step TEXT NOT NULL,"
+            " output TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (pdf_hash, segment_size, segment_index, step))"
+        )
+        self._connection.commit()
+
+    def get(self, pdf_hash: str, segment_size: int, segment_index: int, step: str) -> Optional[str]:
+        row = self._connection.execute(
+            "SELECT output FROM checkpoints WHERE pdf_hash = ? AND segment_size = ? AND segment_index = ? AND step = ?",
+            (pdf_hash, segment_size, segment_index, step)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, pdf_hash: str, segment_size: int, segment_index: int, step: str, output: str):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+            (pdf_hash, segment_size, segment_index, step, output, time.time())
+        )
+        self._connection.commit()
+
+    def count(self, pdf_hash: str, segment_size: int) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM checkpoints WHERE pdf_hash = ? AND segment_size = ?", (pdf_hash, segment_size)
+        ).fetchone()[0]
+
+    def clear(self, pdf_hash: str):
+        """Deletes every checkpoint of a PDF, forcing a full rerun."""
+        self._connection.execute("DELETE FROM checkpoints WHERE pdf_hash = ?", (pdf_hash,))
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+
+class PdfCheckpoints:
+    """Checkpoints of one workflow run over one PDF, with a given segment size."""
+
+    def __init__(self, store: CheckpointStore, pdf_hash: str, segment_size: int):
+        self.store = store
+        self.pdf_hash = pdf_hash
+        self.segment_size = segment_size
+        self.steps_reused = 0
+        existing = store.count(pdf_hash, segment_size)
+        if existing:
+            logging.info(f"Checkpoints: Resuming {pdf_hash[:12]} with {existing} completed steps.")
+
+    def get(self, segment_index: int, step: str) -> Optional[str]:
+        return self.store.get(self.pdf_hash, self.segment_size, segment_index, step)
+
+    def put(self, segment_index: int, step: str, output: str):
+        self.store.put(self.pdf_hash, self.segment_size, segment_index, step, output)
+
+    async def run(self, segment_index: int, step: str, call: Callable[[], Awaitable[str]]) -> str:
+        """Returns the checkpointed output of a step, or awaits call() and checkpoints its result.
+        call() must raise on failure, so that failed outputs are never stored."""
+        output = self.get(segment_index, step)
+        if output is not None:
+            self.steps_reused += 1
+            logging.info(f"Checkpoints: Reusing '{step}' for Segment {segment_index+1}.")
+            return output
+        output = await call()
+        self.put(segment_index, step, output)
+        return output
+
+
+async def run_step(checkpoints: Optional[PdfCheckpoints], segment_index: int, step: str, call: Callable[[], Awaitable[str]]) -> str:
+    """Runs a step through the checkpoints if there are any, else just awaits call()."""
+    if checkpoints is None:
+        return await call()
+    return await checkpoints.run(segment_index, step, call)
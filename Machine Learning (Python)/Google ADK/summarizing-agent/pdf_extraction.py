@@ -0,0 +1,145 @@
+import asyncio, hashlib, logging, os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Iterator, Optional
+import PyPDF2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'pdf_cache')
+PAGES_PER_TASK = 10 # Pages extracted per process-pool task
+PAGE_SEPARATOR = "\n\n--- Page Break ---\n\n"
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def count_pdf_pages(file_path: str) -> int:
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+class PageCache:
+    """On-disk cache of extracted page text, keyed by (file hash, page index)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, file_hash: str, page_index: int) -> str:
+        return os.path.join(self.cache_dir, file_hash, f"{page_index:05d}.txt")
+
+    def get(self, file_hash: str, page_index: int) -> Optional[str]:
+        try:
+            with open(self._path(file_hash, page_index), 'r', encoding='utf-8') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, file_hash: str, page_index: int, text: str):
+        path = self._path(file_hash, page_index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        os.replace(temp_path, path) # Atomic, so a crash never leaves a half-written page behind
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> list[str]:
+    """Extracts pages [start, stop) of a PDF. Runs in a worker process, so it opens its own reader."""
+    pages_text = []
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for i in range(start, stop):
+            page_text = reader.pages[i].extract_text()
+            if page_text:
+                pages_text.append(page_text.strip())
+            else:
+                logging.warning(f"No text could be extracted from page {i+1} of {file_path}.")
+                pages_text.append("")
+    return pages_text
+
+
+class _ExtractionPlan:
+    """Splits a PDF into page ranges and loads whatever the cache already holds."""
+
+    def __init__(self, file_path: str, cache: Optional[PageCache], pages_per_task: int):
+        if pages_per_task <= 0:
+            raise ValueError("pages_per_task must be a positive integer.")
+        self.file_path = file_path
+        self.cache = cache
+        self.file_hash = file_sha256(file_path)
+        self.num_pages = count_pdf_pages(file_path)
+        self.ranges = [(start, min(start + pages_per_task, self.num_pages)) for start in range(0, self.num_pages, pages_per_task)]
+        self.cached: dict[tuple[int, int], list[str]] = {}
+        if cache is not None:
+            for start, stop in self.ranges:
+                pages = [cache.get(self.file_hash, i) for i in range(start, stop)]
+                if all(page is not None for page in pages):
+                    self.cached[(start, stop)] = pages
+        logging.info(f"Reading PDF: {file_path} ({self.num_pages} pages, {sum(len(p) for p in self.cached.values())} cached)")
+
+    def missing_ranges(self) -> list[tuple[int, int]]:
+        return [page_range for page_range in self.ranges if page_range not in self.cached]
+
+    def store(self, start: int, pages: list[str]):
+        if self.cache is not None:
+            for offset, text in enumerate(pages):
+                self.cache.put(self.file_hash, start + offset, text)
+
+
+def iter_pdf_pages(file_path: str, pages_per_task: int = PAGES_PER_TASK, cache: Optional[PageCache] = None, executor: Optional[Executor] = None) -> Iterator[str]:
+    """
+    Yields the text of every page in order, as soon as its page range is extracted.
+    Uncached ranges are all submitted to a process pool up front; cached pages are read from disk.
+    """
+    plan = _ExtractionPlan(file_path, cache, pages_per_task)
+    own_executor = executor is None and bool(plan.missing_ranges())
+    if own_executor:
+        executor = ProcessPoolExecutor()
+    try:
+        futures = {page_range: executor.submit(_extract_page_range, file_path, *page_range) for page_range in plan.missing_ranges()}
+        for page_range in plan.ranges:
+            pages = plan.cached.get(page_range)
+            if pages is None:
+                pages = futures[page_range].result()
+                plan.store(page_range[0], pages)
+            yield from pages
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def stream_pdf_pages(file_path: str, pages_per_task: int = PAGES_PER_TASK, cache: Optional[PageCache] = None, executor: Optional[Executor] = None) -> AsyncIterator[str]:
+    """Async counterpart of iter_pdf_pages: waits on the process pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    plan = await loop.run_in_executor(None, _ExtractionPlan, file_path, cache, pages_per_task)
+    own_executor = executor is None and bool(plan.missing_ranges())
+    if own_executor:
+        executor = ProcessPoolExecutor()
+    try:
+        futures = {page_range: loop.run_in_executor(executor, _extract_page_range, file_path, *page_range) for page_range in plan.missing_ranges()}
+        for page_range in plan.ranges:
+            pages = plan.cached.get(page_range)
+            if pages is None:
+                pages = await futures[page_range]
+                plan.store(page_range[0], pages)
+            for page in pages:
+                yield page
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def stream_pdf_segments(file_path: str, segment_size: int = 10, cache: Optional[PageCache] = None, executor: Optional[Executor] = None) -> AsyncIterator[str]:
+    """Yields segments of segment_size pages, joined with PAGE_SEPARATOR, as soon as their pages are ready."""
+    segment_pages = []
+    async for page in stream_pdf_pages(file_path, pages_per_task=segment_size, cache=cache, executor=executor):
+        segment_pages.append(page)
+        if len(segment_pages) == segment_size:
+            yield PAGE_SEPARATOR.join(segment_pages)
+            segment_pages = []
+    if segment_pages:
+        yield PAGE_SEPARATOR.join(segment_pages)
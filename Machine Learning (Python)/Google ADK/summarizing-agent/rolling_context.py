@@ -0,0 +1,138 @@
+import json, logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+# Rough chars-per-token ratio for Gemini-style tokenizers on prose; used when no tokenizer is at hand.
+CHARS_PER_TOKEN = 4
+SUMMARY_SEPARATOR = "\n\n--- End of Previous Segment Summary ---\n\n"
+
+# (current digest, summary being folded in, max tokens) -> new digest
+Compressor = Callable[[str, str, int], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of a text from its length."""
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts a text down to roughly max_tokens, keeping its beginning."""
+    if max_tokens <= 0:
+        return ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " [...]"
+
+
+async def truncating_compressor(digest: str, summary: str, max_tokens: int) -> str:
+    """Fallback compressor without LLM calls: the old digest and the new summary each get half
+    the budget, so older material decays geometrically instead of being dropped outright."""
+    half = max_tokens // 2
+    return "\n\n".join(part for part in (truncate_to_tokens(digest, half), truncate_to_tokens(summary, half)) if part)
+
+
+class RollingContext:
+    """
+    Bounded context of previous segment summaries.
+    The most recent `recent_window` summaries are kept verbatim; older ones are folded, one at a
+    time, into a digest of at most `digest_max_tokens`. The rendered context therefore stays under
+    roughly digest_max_tokens + recent_window summaries, no matter how long the document is.
+    """
+
+    def __init__(self, compressor: Optional[Compressor] = None, recent_window: int = 2, digest_max_tokens: int = 800):
+        if recent_window < 0:
+            raise ValueError("recent_window cannot be negative.")
+        if digest_max_tokens <= 0:
+            raise ValueError("digest_max_tokens must be a positive integer.")
+        self.compressor = compressor or truncating_compressor
+        self.recent_window = recent_window
+        self.digest_max_tokens = digest_max_tokens
+        self.digest = ""
+        self.recent: deque[str] = deque()
+        self.summaries_seen = 0
+
+    async def add_summary(self, summary: str):
+        """Appends a segment's final summary, compressing the oldest recent ones into the digest."""
+        self.recent.append(summary)
+        self.summaries_seen += 1
+        while len(self.recent) > self.recent_window:
+            oldest = self.recent.popleft()
+            compressed = await self.compressor(self.digest, oldest, self.digest_max_tokens)
+            # Never trust the compressor with the budget.
+            self.digest = truncate_to_tokens(compressed, self.digest_max_tokens)
+            logging.info(f"Rolling Context: Folded a summary into the digest ({estimate_tokens(self.digest)} tokens).")
+
+    def to_json(self) -> str:
+        """Serialises the context state (not the compressor or limits) for checkpointing."""
+        return json.dumps({"digest": self.digest, "recent": list(self.recent), "summaries_seen": self.summaries_seen})
+
+    def load_json(self, snapshot: str):
+        """Restores a state saved by to_json."""
+        state = json.loads(snapshot)
+        self.digest = state["digest"]
+        self.recent = deque(state["recent"])
+        self.summaries_seen = state["summaries_seen"]
+
+    def render(self, max_tokens: Optional[int] = None) -> str:
+        """
+        Renders the digest followed by the recent summaries. With max_tokens, the oldest recent
+        summaries are dropped first, then the digest is truncated, until the text fits.
+        Returns an empty string if nothing fits or there is no context yet.
+        """
+        recent = list(self.recent)
+        digest = self.digest
+        text = self._join(digest, recent)
+        if max_tokens is None:
+            return text
+        while recent and estimate_tokens(text) > max_tokens:
+            recent.pop(0)
+            text = self._join(digest, recent)
+        if estimate_tokens(text) > max_tokens:
+            digest = truncate_to_tokens(digest, max_tokens - estimate_tokens(self._join("", recent)) - 16)
+            text = self._join(digest, recent)
+        return text if estimate_tokens(text) <= max_tokens else ""
+
+    def _join(self, digest: str, recent: list[str]) -> str:
+        parts = []
+        if digest:
+            parts.append(f"Digest of Earlier Segments:\n{digest}")
+        if recent:
+            parts.append(SUMMARY_SEPARATOR.join(recent))
+        return SUMMARY_SEPARATOR.join(parts)
+
+
+@dataclass
+class TokenUsage:
+    segment_index: int
+    agent_name: str
+    prompt_tokens: int
+    context_tokens: int
+
+
+class TokenUsageTracker:
+    """Records estimated prompt tokens per agent call, so per-segment cost can be monitored.
+    Calls that belong to no single segment (e.g. digest compression) use segment_index -1.
+    """
+
+    def __init__(self):
+        self.records: list[TokenUsage] = []
+
+    def record(self, segment_index: int, agent_name: str, prompt: str, context: str = ""):
+        self.records.append(TokenUsage(segment_index, agent_name, estimate_tokens(prompt), estimate_tokens(context)))
+
+    def per_segment(self) -> dict[int, int]:
+        totals: dict[int, int] = {}
+        for record in self.records:
+            totals[record.segment_index] = totals.get(record.segment_index, 0) + record.prompt_tokens
+        return totals
+
+    def total(self) -> int:
+        return sum(record.prompt_tokens for record in self.records)
+
+    def log_summary(self):
+        for segment_index, tokens in sorted(self.per_segment().items()):
+            label = f"Segment {segment_index+1}" if segment_index >= 0 else "Context digests"
+            logging.info(f"Token Usage: {label} used ~{tokens} prompt tokens.")
+        logging.info(f"Token Usage: ~{self.total()} prompt tokens in total.")
@@ -10,39 +10,24 @@ from copy import deepcopy
 from collections import Counter, defaultdict
 from scipy.stats import norm
 from pprint import pprint
+from handmade.linear_model import SGDRegressor
+from handmade.preprocessing import StandardScaler
+from handmade.pca import IncrementalPCA, demean
+from handmade.streaming import ChunkedDataset
 
 
-def vector_mean(vectors: list):
-	mean = [ sum([v[i] for v in vectors]) / len(vectors) for i in range(len(vectors[0])) ]
-	return mean
-
 def dataframe_demean(df):
-	for column in df:
-		mean = df[column].sum() / df[column].size
-		df[column] -= mean
+	values, _ = demean(np.array(df, dtype=float)) # One vectorised subtraction instead of a loop over columns
+	df[:] = values
 	return df
 
-def singlepoint_gradient_descent(intercept: float, slopes: list, INPUTS: list, OUTPUT: float) -> list:
-	guess = intercept + sum([slope * INPUT for slope, INPUT in zip(slopes, INPUTS)])
-	error = guess - OUTPUT
-	gradient = [2 * error] + [2 * error * INPUT for INPUT in INPUTS]
-	return gradient
-
-def minibatch_gradient_descent(df, batchsize: int):
-	intercept = -10
-	slopes = [-10] * (len(df.columns) - 1)
-	for epoch in range(50):
-		for batch in range(0, df.shape[0], batchsize):
-			gradient_list = [ singlepoint_gradient_descent(intercept, slopes, df.iloc[point, : -1], df.iloc[point, -1]) for point in range(batch, batch + batchsize) if point < df.shape[0] ]
-			gradient_mean = vector_mean(gradient_list)
-			intercept -= gradient_mean[0] * 0.1
-			slopes = [ slope - gradient_mean_component * 0.000001 for slope, gradient_mean_component in zip(slopes, gradient_mean[1:]) ]
-		if epoch % 10 == 0:
-			plt.plot(df.iloc[ : , 0], [intercept + slopes[0] * x for x in df.iloc[ : , 0]], label={epoch})
-	return [intercept] + slopes
-
-original = pd.read_csv('nndb_flat.csv')
-df = original.select_dtypes(include=['float64'])
+columns = list(pd.read_csv('nndb_flat.csv', nrows=1000).select_dtypes(include=['float64']).columns) # A sample of rows is enough to find the numeric columns
+nutrients = ChunkedDataset('nndb_flat.csv', columns, chunk_size=2048, cache='npy', dropna=True) # Streams the file instead of loading it whole
+nutrient_scaler = StandardScaler()
+for chunk in nutrients.chunks():
+	nutrient_scaler.partial_fit(chunk)
+pca = IncrementalPCA(n_components=2).fit_chunks(nutrient_scaler.transform(chunk, copy=True) for chunk in nutrients.chunks()) # Nutrients have different units, so compare them as z-scores
+print(f"Variance explained by the first two components: {pca.explained_variance_ratio_.round(3)}")
 
 X = [x + 10 for x in range(0,1000)]
 Y = [x - 10 + 1000 * math.sin(x) * random.random() for x in X]
@@ -51,9 +36,13 @@ df2 = DataFrame(D, columns=['Inputs', 'Outputs'])
 plt.scatter(X,Y, color='black')
 
 #df2 = dataframe_demean(df2)
-rv = minibatch_gradient_descent(df2, 10)
-intercept = rv[0]
-slopes = rv[1:]
-plt.plot(df.iloc[ : , 0], [intercept + slopes[0] * x for x in df.iloc[ : , 0]], label='Final')
+scaler = StandardScaler().fit(df2[['Inputs']]) # Scaled inputs let one learning rate suit intercept and slope
+inputs = scaler.transform(df2[['Inputs']].to_numpy(dtype=float))
+def plot_progress(epoch, model):
+	if epoch % 10 == 0:
+		plt.plot(X, model.predict(inputs), label={epoch})
+model = SGDRegressor(learning_rate=1.0, optimizer='adam', batch_size=10, max_epochs=50, early_stopping=True, patience=10, callback=plot_progress)
+model.fit(inputs, df2['Outputs'])
+plt.plot(X, model.predict(inputs), label='Final')
 plt.legend()
 plt.show()
\ No newline at end of file
@@ -6,54 +6,28 @@ import math
 import random
 from collections import Counter
 from scipy.stats import norm
-
-
-def polynomial(INPUT, parameters):
-	return sum( [ (parameters[index] * (INPUT**index)) for index in range(len(parameters)) ] )
-
-	
-def gradient_descent(INPUT, OUTPUT, parameters):
-	intercept_derivative = 2*( (slope * INPUT) - OUTPUT + intercept )
-	slope_derivative = 2*( (INPUT**2 * slope) + (intercept * INPUT) - (INPUT * OUTPUT) )
-	return intercept_derivative, slope_derivative
-
-
-def vector_sum(vector_list):
-	length = len(vector_list[0])
-	assert all([len(vector) == length for vector in vector_list]), "ERROR: Vectors ain't same-sized"
-	
-	result_vector = [0] * length
-	for vector in vector_list:
-		for index in range(length):
-			result_vector[index] += vector[index]
-	
-	return result_vector
-
-
-def vector_div(vector, denominator):
-	return [item / denominator for item in vector]
-
-
-def vector_mult(vector, scalar):
-	return [item * scalar for item in vector]
+from handmade.linear_model import PolynomialRegression, throttled
 
 
 xaxis = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
 yaxis = [2, 5, 4, 5, 3, 8, 4, 7, 5, 10, 9, 9, 11, 14, 11, 18, 17, 16, 17, 20, 19]
 
-intercept = -10
-slope = -10
-learning_rate = 0.001
+DEGREE = 1
+STEPS = 1001
+PLOT_EVERY = 100 # Draw the current fit every PLOT_EVERY steps; 0 turns plotting off
+
+def plot_step(step, model):
+	plt.plot(xaxis, model.predict(xaxis), color='red', alpha=(step / STEPS))
+
 plt.scatter(xaxis, yaxis, s=6, color='black')
 
-for step in range(1001):
-	data_size = len(xaxis)
-	gradient_list = [gradient_descent(x, y, [intercept, slope]) for x,y in zip(xaxis, yaxis)]
-	gradient_sum = vector_sum(gradient_list)
-	gradient_mean = vector_div(gradient_sum, data_size)
-	intercept -= gradient_mean[0] * 0.01
-	slope -= gradient_mean[1] * 0.001
-	print(slope, intercept, end='\n\n\n')
-	plt.plot(xaxis, [slope * x + intercept for x in xaxis], color='red', alpha=(step / 1000))
+# Full-batch gradient descent: every step is two matrix products over all points
+model = PolynomialRegression(DEGREE, solver='gd', optimizer='sgd', learning_rate=0.1, max_epochs=STEPS, callback=throttled(plot_step, PLOT_EVERY) if PLOT_EVERY else None)
+model.fit(xaxis, yaxis)
+exact = PolynomialRegression(DEGREE, solver='lstsq').fit(xaxis, yaxis)
+print('Gradient descent [intercept, slope, ...]:', model.coefficients_)
+print('Least squares    [intercept, slope, ...]:', exact.coefficients_)
+plt.plot(xaxis, exact.predict(xaxis), color='blue', label='Least squares')
 
-plt.show()
\ No newline at end of file
+plt.legend()
+plt.show()
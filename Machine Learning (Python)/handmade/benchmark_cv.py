@@ -0,0 +1,48 @@
+import argparse, os, time
+import numpy as np
+
+from handmade.knn import KNNClassifier
+from handmade.model_selection import cross_validate, fold_ids
+
+
+''' Cross-validation as it would be written with the classifier alone: one fit and one predict per fold and per k. '''
+def naive_cross_validate(X, y, ks, n_folds, seed):
+	folds = fold_ids(len(X), n_folds, seed)
+	return {k: np.array([KNNClassifier(k, 'brute').fit(X[folds != f], y[folds != f]).score(X[folds == f], y[folds == f]) for f in range(n_folds)]) for k in ks}
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Accuracy and throughput of parallel k-fold cross-validation over a sweep of k, per number of processes.")
+	parser.add_argument("--rows", type=int, default=50_000)
+	parser.add_argument("--features", type=int, default=4)
+	parser.add_argument("--folds", type=int, default=5)
+	parser.add_argument("--ks", type=int, nargs="+", default=list(range(1, 32, 2)))
+	parser.add_argument("--jobs", type=int, nargs="+", default=None, help="Process counts to time (default: 1, 2, 4, ... up to the number of cores).")
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	X = rng.normal(size=(args.rows, args.features))
+	y = (np.sin(2 * X[:, 0]) + X[:, 1] + 0.5 * rng.normal(size=args.rows) > 0).astype(int)
+	predictions = args.rows * len(args.ks)
+	jobs = args.jobs or sorted({1, *[2 ** p for p in range(1, 8) if 2 ** p <= os.cpu_count()], os.cpu_count()})
+
+	print(f"{args.rows:,} points x {args.features} features, {args.folds} folds, {len(args.ks)} values of k ({predictions:,} predictions); {os.cpu_count()} cores.")
+	print(f"{'processes':>10}{'seconds':>10}{'predictions/s':>16}{'speedup':>9}{'best k':>8}{'accuracy':>10}")
+	start = time.perf_counter()
+	naive = naive_cross_validate(X, y, args.ks, args.folds, seed=0)
+	naive_time = time.perf_counter() - start
+	best = max(naive, key=lambda k: naive[k].mean())
+	print(f"{'naive':>10}{naive_time:>10.2f}{predictions / naive_time:>16,.0f}{'':>9}{best:>8}{naive[best].mean():>10.4f}")
+	serial_time = None
+	for n_jobs in jobs:
+		start = time.perf_counter()
+		scores = cross_validate(X, y, args.ks, args.folds, n_jobs=n_jobs, seed=0)
+		elapsed = time.perf_counter() - start
+		serial_time = serial_time or elapsed
+		assert all(np.allclose(scores[k], naive[k]) for k in args.ks)
+		best = max(scores, key=lambda k: scores[k].mean())
+		print(f"{n_jobs:>10}{elapsed:>10.2f}{predictions / elapsed:>16,.0f}{serial_time / elapsed:>9.2f}{best:>8}{scores[best].mean():>10.4f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,61 @@
+import argparse, math, time
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+from handmade.knn import KNNClassifier
+
+
+''' The original Handmade KNN.py search, kept as the baseline: every prediction sorts all rows with a pure-Python distance. '''
+def legacy_distance(p1, p2):
+	return math.sqrt(sum([math.pow(p[0] - p[1], 2) for p in zip(p1, p2)]))
+
+def legacy_sort_df(df, new):
+	superlist = [list(series) for name, series in df.iterrows()]
+	superlist.sort(key=lambda sublist: legacy_distance(pd.Series(sublist).iloc[0:4], new))
+	return pd.DataFrame(superlist)
+
+def legacy_knn(k, df, new):
+	df = legacy_sort_df(df, new)
+	return Counter(df.iloc[:k, -1]).most_common(1)[0][0]
+
+
+''' Two overlapping gaussian classes in 4 dimensions, shaped like dataset.txt. '''
+def make_dataset(n, d=4, seed=0):
+	rng = np.random.default_rng(seed)
+	y = rng.integers(0, 2, n)
+	X = rng.normal(size=(n, d)) + y[:, None] * 1.5
+	return X, y
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark KNNClassifier against the original row-sorting knn.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000], help="Training set sizes.")
+	parser.add_argument("--queries", type=int, default=1000, help="Query points per size.")
+	parser.add_argument("--legacy-queries", type=int, default=5, help="Query points timed with the original knn (it is slow).")
+	parser.add_argument("--legacy-max-size", type=int, default=10000, help="Largest training set timed with the original knn.")
+	parser.add_argument("-k", type=int, default=5)
+	args = parser.parse_args()
+
+	print(f"{'n train':>10}{'legacy (ms/query)':>19}{'vectorised (ms/query)':>23}{'speedup':>10}{'agreement':>11}")
+	for n in args.sizes:
+		X, y = make_dataset(n + args.queries)
+		X_train, y_train, X_query = X[:n], y[:n], X[n:]
+
+		start = time.perf_counter()
+		model = KNNClassifier(args.k).fit(X_train, y_train)
+		predictions = model.predict(X_query)
+		fast = (time.perf_counter() - start) / args.queries
+
+		legacy, agreement = float('nan'), float('nan')
+		if n <= args.legacy_max_size:
+			df = pd.DataFrame(np.column_stack([X_train, y_train]))
+			start = time.perf_counter()
+			legacy_predictions = [legacy_knn(args.k, df, pd.Series(q)) for q in X_query[:args.legacy_queries]]
+			legacy = (time.perf_counter() - start) / args.legacy_queries
+			agreement = np.mean(np.array(legacy_predictions) == predictions[:args.legacy_queries])
+		print(f"{n:>10}{legacy * 1000:>19.2f}{fast * 1000:>23.4f}{legacy / fast:>10.0f}{agreement:>11.2f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,58 @@
+import argparse, os, tempfile, time, tracemalloc
+import numpy as np
+
+from handmade.pca import PCA, IncrementalPCA
+
+
+''' n rows in d columns around a rank-intrinsic_dim subspace with decaying variances, plus a little noise. '''
+def make_data(rng, n, d, intrinsic_dim):
+	latent = rng.normal(size=(n, intrinsic_dim)) * np.geomspace(10, 1, intrinsic_dim)
+	return latent @ rng.normal(size=(intrinsic_dim, d)) + 0.1 * rng.normal(size=(n, d))
+
+''' Seconds and peak traced memory (MB, numpy allocations included) of fit(). '''
+def measure(fit):
+	tracemalloc.start()
+	start = time.perf_counter()
+	model = fit()
+	elapsed = time.perf_counter() - start
+	peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+	tracemalloc.stop()
+	return model, elapsed, peak
+
+''' Largest angle (degrees) between a fitted component and the matching exact one. '''
+def max_angle(components, reference):
+	cosines = np.abs(np.einsum('ij,ij->i', components, reference))
+	return float(np.degrees(np.arccos(np.clip(cosines, 0, 1))).max())
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Runtime and memory of the full, randomized and incremental PCA solvers against data size.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Numbers of rows.")
+	parser.add_argument("--features", type=int, default=50)
+	parser.add_argument("--components", type=int, default=5)
+	parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per chunk read from disk by the incremental solver.")
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	print(f"{args.features} features, {args.components} components. Time in seconds / peak traced memory in MB; angle = worst component error against 'full'.")
+	print(f"{'rows':>9}{'data MB':>9}{'full':>16}{'randomized':>16}{'angle':>8}{'incremental':>16}{'angle':>8}")
+	with tempfile.TemporaryDirectory() as directory:
+		for n in args.sizes:
+			X = make_data(rng, n, args.features, 2 * args.components)
+			path = os.path.join(directory, f"X_{n}.npy")
+			np.save(path, X)
+			on_disk = np.load(path, mmap_mode='r') # The incremental solver reads it back one chunk at a time
+			full, full_time, full_peak = measure(lambda X=X: PCA(args.components, 'full').fit(X))
+			randomized, randomized_time, randomized_peak = measure(lambda X=X: PCA(args.components, 'randomized', seed=0).fit(X))
+			incremental, incremental_time, incremental_peak = measure(lambda on_disk=on_disk: IncrementalPCA(args.components).fit(on_disk, args.chunk_size))
+			print(
+				f"{n:>9}{X.nbytes / 2 ** 20:>9.0f}"
+				f"{f'{full_time:.2f} / {full_peak:.0f}':>16}"
+				f"{f'{randomized_time:.2f} / {randomized_peak:.0f}':>16}{max_angle(randomized.components_, full.components_):>8.3f}"
+				f"{f'{incremental_time:.2f} / {incremental_peak:.0f}':>16}{max_angle(incremental.components_, full.components_):>8.3f}"
+			)
+			del X, on_disk
+
+
+if __name__ == "__main__":
+	main()
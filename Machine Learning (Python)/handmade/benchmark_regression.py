@@ -0,0 +1,60 @@
+import argparse, time
+import numpy as np
+
+from handmade.linear_model import PolynomialRegression
+
+
+''' The original Handmade SGD.py step, kept as the baseline: a per-point gradient in a list comprehension, then hand-rolled vector sums. '''
+def legacy_gradient(INPUT, OUTPUT, intercept, slope):
+	intercept_derivative = 2*( (slope * INPUT) - OUTPUT + intercept )
+	slope_derivative = 2*( (INPUT**2 * slope) + (intercept * INPUT) - (INPUT * OUTPUT) )
+	return intercept_derivative, slope_derivative
+
+def legacy_step(xaxis, yaxis, intercept, slope):
+	gradient_list = [legacy_gradient(x, y, intercept, slope) for x, y in zip(xaxis, yaxis)]
+	result_vector = [0] * 2
+	for vector in gradient_list:
+		for index in range(2):
+			result_vector[index] += vector[index]
+	gradient_mean = [item / len(xaxis) for item in result_vector]
+	return intercept - gradient_mean[0] * 0.01, slope - gradient_mean[1] * 0.001
+
+''' Seconds to fit and mean squared error on the training data. '''
+def time_fit(model, x, y):
+	start = time.perf_counter()
+	model.fit(x, y)
+	elapsed = time.perf_counter() - start
+	return elapsed, float(np.mean((model.predict(x) - y) ** 2))
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Runtime of gradient descent and closed-form polynomial regression against data size.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** p for p in range(3, 8)], help="Numbers of points.")
+	parser.add_argument("--degree", type=int, default=3)
+	parser.add_argument("--steps", type=int, default=100, help="Gradient descent steps (full-batch epochs).")
+	parser.add_argument("--legacy-points", type=int, default=100_000, help="Points timed with the original loop; larger sizes are extrapolated.")
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	print(f"Degree {args.degree}, {args.steps} gradient descent steps. Seconds (training MSE); the legacy column is the original degree-1 loop.")
+	print(f"{'points':>10}{'legacy loop':>14}{'gd':>20}{'normal':>20}{'lstsq':>20}")
+	for n in args.sizes:
+		x = rng.uniform(-3, 3, n)
+		y = 2 - x + 0.5 * x ** 3 + rng.normal(size=n)
+
+		timed = min(n, args.legacy_points)
+		xaxis, yaxis = x[:timed].tolist(), y[:timed].tolist()
+		start = time.perf_counter()
+		legacy_step(xaxis, yaxis, -10, -10)
+		legacy_time = (time.perf_counter() - start) * args.steps * n / timed
+
+		cells = [f"{legacy_time:.2f}" + ("*" if timed < n else "")]
+		for solver, options in [('gd', {'optimizer': 'adam', 'learning_rate': 0.1, 'max_epochs': args.steps}), ('normal', {}), ('lstsq', {})]:
+			elapsed, loss = time_fit(PolynomialRegression(args.degree, solver, **options), x, y)
+			cells.append(f"{elapsed:.3f} ({loss:.3f})")
+		print(f"{n:>10}" + "".join(f"{cell:>{width}}" for cell, width in zip(cells, [14, 20, 20, 20])))
+	print("* extrapolated from the first", f"{args.legacy_points:,}", "points")
+
+
+if __name__ == "__main__":
+	main()
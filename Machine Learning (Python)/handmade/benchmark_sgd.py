@@ -0,0 +1,66 @@
+import argparse, time
+import numpy as np
+import pandas as pd
+
+from handmade.linear_model import SGDRegressor, mse, step_schedule
+from handmade.preprocessing import StandardScaler
+
+
+''' The original Handmade PCA.py trainer, kept as the baseline: one df.iloc lookup and Python-list gradient per row. Stops after max_batches to keep the benchmark short. '''
+def legacy_vector_mean(vectors: list):
+	return [sum([v[i] for v in vectors]) / len(vectors) for i in range(len(vectors[0]))]
+
+def legacy_singlepoint_gradient(intercept: float, slopes: list, INPUTS: list, OUTPUT: float) -> list:
+	guess = intercept + sum([slope * INPUT for slope, INPUT in zip(slopes, INPUTS)])
+	error = guess - OUTPUT
+	return [2 * error] + [2 * error * INPUT for INPUT in INPUTS]
+
+def legacy_minibatch_epoch(df, batchsize: int, max_batches: int):
+	intercept = -10
+	slopes = [-10] * (len(df.columns) - 1)
+	for batch in range(0, min(df.shape[0], batchsize * max_batches), batchsize):
+		gradient_list = [legacy_singlepoint_gradient(intercept, slopes, df.iloc[point, :-1], df.iloc[point, -1]) for point in range(batch, batch + batchsize) if point < df.shape[0]]
+		gradient_mean = legacy_vector_mean(gradient_list)
+		intercept -= gradient_mean[0] * 0.1
+		slopes = [slope - component * 0.000001 for slope, component in zip(slopes, gradient_mean[1:])]
+	return [intercept] + slopes
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark SGDRegressor against the original per-row mini-batch loop.")
+	parser.add_argument("--rows", type=int, default=1_000_000)
+	parser.add_argument("--features", type=int, default=4)
+	parser.add_argument("--batch-size", type=int, default=10)
+	parser.add_argument("--epochs", type=int, default=50)
+	parser.add_argument("--legacy-batches", type=int, default=200, help="Batches timed with the original loop; its epoch time is extrapolated.")
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	X = rng.uniform(10, 1010, size=(args.rows, args.features))
+	y = X @ rng.normal(size=args.features) - 10 + 50 * rng.normal(size=args.rows)
+	df = pd.DataFrame(np.column_stack([X, y]))
+
+	start = time.perf_counter()
+	legacy_minibatch_epoch(df, args.batch_size, args.legacy_batches)
+	legacy_epoch = (time.perf_counter() - start) / (args.legacy_batches * args.batch_size) * args.rows
+
+	scaler = StandardScaler()
+	X_scaled = scaler.fit_transform(X.copy())
+	results = []
+	for optimizer, lr in [('sgd', 0.001), ('momentum', 0.0001), ('adam', 0.01)]:
+		model = SGDRegressor(step_schedule(lr, 0.5, 5), optimizer, args.batch_size, args.epochs, early_stopping=True, patience=3, seed=0)
+		start = time.perf_counter()
+		model.fit(X_scaled, y)
+		elapsed = time.perf_counter() - start
+		results.append((optimizer, elapsed / model.epoch_, model.epoch_, elapsed, mse(model.params_, X_scaled, y)))
+
+	print(f"{args.rows:,} rows x {args.features} features, batches of {args.batch_size}")
+	print(f"{'trainer':<22}{'s/epoch':>10}{'epochs':>8}{'total (s)':>11}{'train MSE':>14}")
+	print(f"{'legacy loop (extrap.)':<22}{legacy_epoch:>10.1f}{args.epochs:>8}{legacy_epoch * args.epochs:>11.0f}{'-':>14}")
+	for optimizer, per_epoch, epochs, total, loss in results:
+		print(f"{'SGDRegressor ' + optimizer:<22}{per_epoch:>10.2f}{epochs:>8}{total:>11.1f}{loss:>14.1f}")
+	print(f"Noise floor (MSE of the true model): {50 ** 2}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,51 @@
+import argparse, time
+import numpy as np
+
+from handmade.knn import KNNClassifier
+from handmade.spatial import choose_algorithm
+
+
+''' n points in d dimensions: gaussian, or lying near a random intrinsic_dim-dimensional subspace if given. '''
+def make_points(rng, n, d, intrinsic_dim=None):
+	if intrinsic_dim is None:
+		return rng.normal(size=(n, d))
+	return rng.normal(size=(n, intrinsic_dim)) @ rng.normal(size=(intrinsic_dim, d)) + 0.01 * rng.normal(size=(n, d))
+
+''' Seconds to fit and to answer the queries for one search method. '''
+def time_method(algorithm, X, y, Q, k):
+	start = time.perf_counter()
+	model = KNNClassifier(k, algorithm).fit(X, y)
+	fitted = time.perf_counter()
+	distances, _ = model.kneighbors(Q)
+	return fitted - start, time.perf_counter() - fitted, distances
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Scaling benchmark of brute-force, KD-tree and ball-tree nearest-neighbor search.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Training set sizes.")
+	parser.add_argument("--dims", type=int, nargs="+", default=[2, 4, 8, 16], help="Dimensions.")
+	parser.add_argument("--queries", type=int, default=2000, help="Query points per run.")
+	parser.add_argument("-k", type=int, default=5)
+	parser.add_argument("--intrinsic-dim", type=int, default=None, help="Place the points near a subspace of this dimension, where trees beat the 'auto' rule.")
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	print(f"{args.queries} queries, k={args.k}. Times in seconds (fit / query).")
+	print(f"{'n':>9}{'d':>4}{'brute':>16}{'kd_tree':>16}{'ball_tree':>16}{'auto picks':>12}")
+	for d in args.dims:
+		for n in args.sizes:
+			points = make_points(rng, n + args.queries, d, args.intrinsic_dim)
+			X, Q = points[:n], points[n:]
+			y = (X[:, 0] > 0).astype(int)
+			cells, reference = [], None
+			for algorithm in ('brute', 'kd_tree', 'ball_tree'):
+				fit_time, query_time, distances = time_method(algorithm, X, y, Q, args.k)
+				if reference is None:
+					reference = distances
+				assert np.allclose(distances, reference, atol=1e-6), f"{algorithm} disagrees with brute force"
+				cells.append(f"{fit_time:.2f} / {query_time:.2f}")
+			print(f"{n:>9}{d:>4}" + "".join(f"{cell:>16}" for cell in cells) + f"{choose_algorithm(n, d):>12}")
+
+
+if __name__ == "__main__":
+	main()
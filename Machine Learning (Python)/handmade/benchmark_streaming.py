@@ -0,0 +1,62 @@
+import argparse, os, tempfile, time, tracemalloc
+import numpy as np
+import pandas as pd
+
+from handmade.linear_model import SGDRegressor
+from handmade.pca import IncrementalPCA
+from handmade.streaming import ChunkedDataset
+
+
+''' Seconds and peak traced memory (MB) of run(). '''
+def measure(run):
+	tracemalloc.start()
+	start = time.perf_counter()
+	run()
+	elapsed = time.perf_counter() - start
+	peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+	tracemalloc.stop()
+	return elapsed, peak
+
+''' Writes a CSV of n rows: features f0.. and a linear target y. '''
+def write_csv(path, rng, n, features, chunk_size=100_000):
+	weights = rng.normal(size=features)
+	for start in range(0, n, chunk_size):
+		X = rng.normal(size=(min(chunk_size, n - start), features))
+		frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(features)]).assign(y=X @ weights + rng.normal(size=len(X)))
+		frame.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Memory and time of training from a CSV loaded whole versus streamed in chunks.")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 4_000_000], help="Rows in the CSV.")
+	parser.add_argument("--features", type=int, default=10)
+	parser.add_argument("--chunk-size", type=int, default=65_536)
+	parser.add_argument("--shuffle-buffer", type=int, default=200_000)
+	args = parser.parse_args()
+
+	rng = np.random.default_rng(0)
+	columns = [f"f{i}" for i in range(args.features)] + ['y']
+	print(f"{args.features} features; one SGD epoch (batches of 256) plus one incremental PCA pass. Seconds / peak traced memory in MB.")
+	print(f"{'rows':>9}{'CSV MB':>8}{'read_csv whole':>18}{'stream CSV':>16}{'build npy':>12}{'stream npy':>16}")
+	with tempfile.TemporaryDirectory() as directory:
+		for n in args.sizes:
+			path = os.path.join(directory, f"data_{n}.csv")
+			write_csv(path, rng, n, args.features)
+
+			def whole():
+				values = pd.read_csv(path).to_numpy()
+				SGDRegressor(0.01, batch_size=256, max_epochs=1, seed=0).fit(values[:, :-1], values[:, -1])
+				IncrementalPCA(3).fit(values, args.chunk_size)
+
+			def streamed(data):
+				SGDRegressor(0.01, batch_size=256, seed=0).fit_stream(lambda epoch: data.xy_chunks('y', args.shuffle_buffer, epoch), epochs=1)
+				IncrementalPCA(3).fit_chunks(data.chunks())
+
+			csv_data = ChunkedDataset(path, columns, args.chunk_size)
+			npy_data = ChunkedDataset(path, columns, args.chunk_size, cache='npy')
+			cells = [measure(whole), measure(lambda: streamed(csv_data)), measure(npy_data.memmap), measure(lambda: streamed(npy_data))]
+			print(f"{n:>9}{os.path.getsize(path) / 2 ** 20:>8.0f}" + "".join(f"{f'{t:.1f} / {m:.0f}':>{w}}" for (t, m), w in zip(cells, [18, 16, 12, 16])))
+
+
+if __name__ == "__main__":
+	main()
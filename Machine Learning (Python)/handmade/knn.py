@@ -0,0 +1,78 @@
+import numpy as np
+
+from handmade.spatial import TREES, choose_algorithm, squared_distances
+
+
+''' Indices and distances of the k smallest entries of each row of d2, sorted by distance. argpartition finds them in O(n) per row; only those k get sorted. '''
+def k_smallest(d2, k):
+	idx = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < d2.shape[1] else np.tile(np.arange(d2.shape[1]), (d2.shape[0], 1))
+	part = np.take_along_axis(d2, idx, axis=1)
+	order = np.argsort(part, axis=1, kind='stable')
+	return np.sqrt(np.take_along_axis(part, order, axis=1)), np.take_along_axis(idx, order, axis=1)
+
+''' Most common class code in each row of neighbor_codes (neighbors sorted nearest first). Ties go to the class seen first, i.e. the nearest, like Counter.most_common on the sorted list. '''
+def majority_vote(neighbor_codes, n_classes):
+	rows = np.arange(neighbor_codes.shape[0])
+	k = neighbor_codes.shape[1]
+	counts = np.zeros((neighbor_codes.shape[0], n_classes), dtype=np.int64)
+	first_seen = np.full((neighbor_codes.shape[0], n_classes), k, dtype=np.int64)
+	for j in range(k - 1, -1, -1): # Backwards, so the nearest occurrence is written last
+		counts[rows, neighbor_codes[:, j]] += 1
+		first_seen[rows, neighbor_codes[:, j]] = j
+	return np.argmax(counts * (k + 1) - first_seen, axis=1)
+
+
+''' K-nearest-neighbors classifier. fit() stores the training matrix; predict() takes a batch of query points and processes it in chunks.
+algorithm is 'brute' (distance matrices of at most chunk_bytes), 'kd_tree', 'ball_tree' or 'auto', which picks one from the number and dimension of the training points. '''
+class KNNClassifier:
+
+	def __init__(self, k: int = 5, algorithm: str = 'auto', leaf_size: int = 32, chunk_bytes: int = 64 * 2**20):
+		if k < 1:
+			raise ValueError("k must be a positive integer.")
+		if algorithm not in ('auto', 'brute', 'kd_tree', 'ball_tree'):
+			raise ValueError(f"Unknown algorithm '{algorithm}'.")
+		self.k = k
+		self.algorithm = algorithm
+		self.leaf_size = leaf_size
+		self.chunk_bytes = chunk_bytes
+
+	''' X: (n, d) numeric array or DataFrame; y: n labels of any type. '''
+	def fit(self, X, y):
+		self.X_ = np.ascontiguousarray(X, dtype=np.float64)
+		y = np.asarray(y)
+		if self.X_.ndim != 2 or len(y) != len(self.X_):
+			raise ValueError("X must be 2-dimensional with one label in y per row.")
+		if self.k > len(self.X_):
+			raise ValueError(f"k={self.k} is larger than the {len(self.X_)} training points.")
+		self.classes_, self.y_codes_ = np.unique(y, return_inverse=True)
+		self.X_sq_norms_ = np.einsum('ij,ij->i', self.X_, self.X_)
+		self.algorithm_ = choose_algorithm(*self.X_.shape) if self.algorithm == 'auto' else self.algorithm
+		self.tree_ = TREES[self.algorithm_](self.X_, self.leaf_size) if self.algorithm_ in TREES else None
+		return self
+
+	''' Rows of queries per chunk, so that one chunk's distance matrix takes at most chunk_bytes. '''
+	def chunk_rows(self):
+		return max(1, self.chunk_bytes // (8 * len(self.X_)))
+
+	''' Returns (distances, indices) of the k nearest training points of each query, nearest first. '''
+	def kneighbors(self, Q, k=None):
+		k = k or self.k
+		Q = np.atleast_2d(np.asarray(Q, dtype=np.float64))
+		if self.tree_ is not None:
+			return self.tree_.query(Q, k)
+		distances = np.empty((len(Q), k))
+		indices = np.empty((len(Q), k), dtype=np.int64)
+		step = self.chunk_rows()
+		for start in range(0, len(Q), step):
+			d2 = squared_distances(Q[start:start + step], self.X_, self.X_sq_norms_)
+			distances[start:start + step], indices[start:start + step] = k_smallest(d2, k)
+		return distances, indices
+
+	''' Predicted label of each query point. '''
+	def predict(self, Q):
+		_, indices = self.kneighbors(Q)
+		return self.classes_[majority_vote(self.y_codes_[indices], len(self.classes_))]
+
+	''' Fraction of correctly predicted labels. '''
+	def score(self, Q, y):
+		return float(np.mean(self.predict(Q) == np.asarray(y)))
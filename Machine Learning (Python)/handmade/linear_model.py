@@ -0,0 +1,279 @@
+import math
+from typing import Callable, Iterable, Optional, Union
+import numpy as np
+
+from handmade.preprocessing import StandardScaler
+
+
+''' Learning-rate schedules: each returns a function of the epoch number (from 0). '''
+def constant_schedule(lr):
+	return lambda epoch: lr
+
+def inverse_time_schedule(lr, decay=0.1):
+	return lambda epoch: lr / (1 + decay * epoch)
+
+def step_schedule(lr, drop=0.5, every=10):
+	return lambda epoch: lr * drop ** (epoch // every)
+
+def cosine_schedule(lr, total_epochs, min_lr=0.0):
+	return lambda epoch: min_lr + (lr - min_lr) * (1 + math.cos(math.pi * min(epoch, total_epochs) / total_epochs)) / 2
+
+
+''' Parameter update rules. step() moves params (a float vector) in place against grad. '''
+class SGD:
+	def step(self, params, grad, lr):
+		params -= lr * grad
+
+''' Heavy-ball momentum: a decaying running sum of past gradients smooths noisy mini-batch steps. '''
+class Momentum:
+	def __init__(self, beta=0.9):
+		self.beta = beta
+		self.velocity = None
+
+	def step(self, params, grad, lr):
+		if self.velocity is None:
+			self.velocity = np.zeros_like(params)
+		self.velocity *= self.beta
+		self.velocity += grad
+		params -= lr * self.velocity
+
+''' Adam: per-parameter step sizes from running moments of the gradient, so badly scaled features do not need separate learning rates. '''
+class Adam:
+	def __init__(self, beta1=0.9, beta2=0.999, eps=1e-8):
+		self.beta1, self.beta2, self.eps = beta1, beta2, eps
+		self.m = self.v = None
+		self.t = 0
+
+	def step(self, params, grad, lr):
+		if self.m is None:
+			self.m, self.v = np.zeros_like(params), np.zeros_like(params)
+		self.t += 1
+		self.m = self.beta1 * self.m + (1 - self.beta1) * grad
+		self.v = self.beta2 * self.v + (1 - self.beta2) * grad * grad
+		m_hat = self.m / (1 - self.beta1 ** self.t)
+		v_hat = self.v / (1 - self.beta2 ** self.t)
+		params -= lr * m_hat / (np.sqrt(v_hat) + self.eps)
+
+OPTIMIZERS = {'sgd': SGD, 'momentum': Momentum, 'adam': Adam}
+
+
+''' Mean squared error of the linear model params = [intercept, *slopes] on (X, y). '''
+def mse(params, X, y):
+	residual = X @ params[1:] + params[0] - y
+	return float(residual @ residual) / len(y)
+
+''' Gradient of the mean squared error, for a whole batch at once. '''
+def mse_gradient(params, X, y):
+	residual = X @ params[1:] + params[0] - y
+	grad = np.empty_like(params)
+	grad[0] = 2 * residual.mean()
+	grad[1:] = (2 / len(y)) * (X.T @ residual)
+	return grad
+
+''' Wraps an epoch callback so that it only runs every `every` epochs (and on the first), e.g. to keep plotting from dominating training time. '''
+def throttled(callback, every):
+	return lambda epoch, model: callback(epoch, model) if epoch % every == 0 else None
+
+''' Columns x, x², ..., x^degree of every input column (no interaction terms), so the linear models can fit polynomials. Each power is one multiply of the previous. '''
+def polynomial_features(X, degree):
+	X = np.asarray(X, dtype=np.float64)
+	if X.ndim == 1:
+		X = X[:, None]
+	d = X.shape[1]
+	powers = np.empty((len(X), d * degree))
+	powers[:, :d] = X
+	for p in range(1, degree):
+		np.multiply(powers[:, (p - 1) * d:p * d], X, out=powers[:, p * d:(p + 1) * d])
+	return powers
+
+
+''' A fitted linear model params_ = [intercept, *slopes]. '''
+class LinearModel:
+
+	@property
+	def intercept_(self):
+		return self.params_[0]
+
+	@property
+	def coef_(self):
+		return self.params_[1:]
+
+	def predict(self, X):
+		return np.asarray(X, dtype=np.float64) @ self.params_[1:] + self.params_[0]
+
+
+''' Least-squares linear regression in closed form. solver='lstsq' is an SVD-based solve that copes with nearly collinear columns;
+'normal' solves the normal equations XᵀX·w = Xᵀy, cheaper for many rows and few columns but squaring the condition number. '''
+class LinearRegression(LinearModel):
+
+	def __init__(self, solver: str = 'lstsq'):
+		if solver not in ('lstsq', 'normal'):
+			raise ValueError(f"Unknown solver '{solver}'.")
+		self.solver = solver
+		self.params_ = None
+
+	def fit(self, X, y):
+		X = np.asarray(X, dtype=np.float64)
+		y = np.asarray(y, dtype=np.float64).ravel()
+		A = np.empty((len(X), X.shape[1] + 1))
+		A[:, 0] = 1
+		A[:, 1:] = X
+		if self.solver == 'lstsq':
+			self.params_ = np.linalg.lstsq(A, y, rcond=None)[0]
+		else:
+			self.params_ = np.linalg.solve(A.T @ A, A.T @ y)
+		return self
+
+
+''' Linear regression trained by mini-batch gradient descent on the mean squared error.
+Each epoch shuffles the rows once and walks through contiguous batches; gradients are matrix products over the batch.
+learning_rate is a number or a schedule (function of the epoch). With early_stopping, validation_fraction of the rows (or the given validation set) is held out,
+training stops after patience epochs without an improvement larger than tol, and the best parameters are kept. callback(epoch, model), if given, runs after every epoch. '''
+class SGDRegressor(LinearModel):
+
+	def __init__(
+		self,
+		learning_rate: Union[float, Callable[[int], float]] = 0.01,
+		optimizer: str = 'adam',
+		batch_size: Optional[int] = 32,
+		max_epochs: int = 50,
+		shuffle: bool = True,
+		early_stopping: bool = False,
+		validation_fraction: float = 0.1,
+		patience: int = 5,
+		tol: float = 1e-6,
+		initial_params: Optional[np.ndarray] = None,
+		seed: Optional[int] = None,
+		callback: Optional[Callable[[int, "SGDRegressor"], None]] = None,
+	):
+		if optimizer not in OPTIMIZERS:
+			raise ValueError(f"Unknown optimizer '{optimizer}', expected one of {list(OPTIMIZERS)}.")
+		self.schedule = learning_rate if callable(learning_rate) else constant_schedule(learning_rate)
+		self.optimizer = optimizer
+		self.batch_size = batch_size # None: full batch
+		self.max_epochs = max_epochs
+		self.shuffle = shuffle
+		self.early_stopping = early_stopping
+		self.validation_fraction = validation_fraction
+		self.patience = patience
+		self.tol = tol
+		self.initial_params = initial_params
+		self.rng = np.random.default_rng(seed)
+		self.callback = callback
+		self.params_ = None
+		self.epoch_ = 0
+
+	def _start(self, n_features):
+		if self.params_ is None:
+			self.params_ = np.zeros(n_features + 1) if self.initial_params is None else np.array(self.initial_params, dtype=np.float64)
+			self.optimizer_ = OPTIMIZERS[self.optimizer]()
+			self.history_ = {'train_loss': [], 'val_loss': []}
+
+	''' One pass of mini-batch updates over (X, y), at the learning rate of the current epoch. Usable on its own to train on a stream of chunks. '''
+	def partial_fit(self, X, y):
+		X = np.asarray(X, dtype=np.float64)
+		y = np.asarray(y, dtype=np.float64).ravel()
+		self._start(X.shape[1])
+		if self.shuffle and self.batch_size: # A full batch is the same in any order
+			order = self.rng.permutation(len(y))
+			X, y = X[order], y[order] # One copy per pass; batches below are then views
+		lr = self.schedule(self.epoch_)
+		batch_size = self.batch_size or len(y)
+		for start in range(0, len(y), batch_size):
+			grad = mse_gradient(self.params_, X[start:start + batch_size], y[start:start + batch_size])
+			self.optimizer_.step(self.params_, grad, lr)
+		return self
+
+	def fit(self, X, y, X_val=None, y_val=None):
+		X = np.asarray(X, dtype=np.float64)
+		y = np.asarray(y, dtype=np.float64).ravel()
+		self.params_ = None
+		self.epoch_ = 0
+		if self.early_stopping and X_val is None:
+			order = self.rng.permutation(len(y))
+			n_val = max(1, int(len(y) * self.validation_fraction))
+			X_val, y_val, X, y = X[order[:n_val]], y[order[:n_val]], X[order[n_val:]], y[order[n_val:]]
+		if X_val is not None:
+			X_val = np.asarray(X_val, dtype=np.float64)
+			y_val = np.asarray(y_val, dtype=np.float64).ravel()
+		self._start(X.shape[1])
+		best_loss, best_params, stale_epochs = np.inf, self.params_.copy(), 0
+		for epoch in range(self.max_epochs):
+			self.partial_fit(X, y)
+			self.history_['train_loss'].append(mse(self.params_, X, y))
+			if X_val is not None:
+				val_loss = mse(self.params_, X_val, y_val)
+				self.history_['val_loss'].append(val_loss)
+				if val_loss < best_loss - self.tol:
+					best_loss, best_params, stale_epochs = val_loss, self.params_.copy(), 0
+				else:
+					stale_epochs += 1
+			self.epoch_ += 1
+			if self.callback is not None:
+				self.callback(epoch, self)
+			if self.early_stopping and stale_epochs >= self.patience:
+				break
+		if self.early_stopping:
+			self.params_ = best_params
+		return self
+
+	''' Trains on data streamed from disk: stream(epoch) returns that epoch's iterable of (X, y) chunks, e.g. ChunkedDataset.xy_chunks() from handmade.streaming,
+	and each chunk goes through partial_fit(). Runs epochs passes (default max_epochs); early stopping does not apply. '''
+	def fit_stream(self, stream: Callable[[int], Iterable], epochs: Optional[int] = None):
+		self.params_ = None
+		self.epoch_ = 0
+		for epoch in range(self.max_epochs if epochs is None else epochs):
+			for X, y in stream(epoch):
+				self.partial_fit(X, y)
+			self.epoch_ += 1
+			if self.callback is not None:
+				self.callback(epoch, self)
+		return self
+
+
+''' Fits a polynomial of the given degree in each input column. The powers are standardised before fitting, which keeps them comparable for gradient descent.
+solver is 'lstsq' or 'normal' (closed form, see LinearRegression) or 'gd' (full-batch gradient descent with SGDRegressor; sgd_options go to it).
+callback(epoch, model), for 'gd', receives this model, so it can call predict() on raw inputs. '''
+class PolynomialRegression:
+
+	def __init__(self, degree: int = 1, solver: str = 'lstsq', callback: Optional[Callable[[int, "PolynomialRegression"], None]] = None, **sgd_options):
+		if solver not in ('lstsq', 'normal', 'gd'):
+			raise ValueError(f"Unknown solver '{solver}'.")
+		self.degree = degree
+		self.solver = solver
+		self.callback = callback
+		self.sgd_options = {'batch_size': None, **sgd_options}
+
+	def _features(self, x):
+		return self.scaler_.transform(polynomial_features(x, self.degree))
+
+	def fit(self, x, y):
+		self.scaler_ = StandardScaler()
+		features = self.scaler_.fit_transform(polynomial_features(x, self.degree))
+		if self.solver == 'gd':
+			callback = None if self.callback is None else lambda epoch, _: self.callback(epoch, self)
+			self.model_ = SGDRegressor(callback=callback, **self.sgd_options)
+		else:
+			self.model_ = LinearRegression(self.solver)
+		self.model_.fit(features, y)
+		return self
+
+	def predict(self, x):
+		return self.model_.predict(self._features(x))
+
+	''' [intercept, c1, c2, ...] of the fitted polynomial in the original units of a single input column: y = intercept + c1·x + c2·x² + ... '''
+	@property
+	def coefficients_(self):
+		weights = self.model_.coef_ / self.scaler_.scale_
+		return np.concatenate([[self.model_.intercept_ - weights @ self.scaler_.mean_], weights])
+
+
+''' Gradient descent and both closed-form solvers recover the same cubic. '''
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	x = rng.uniform(-3, 3, 20_000)
+	y = 2 - x + 0.5 * x ** 3 + 0.1 * rng.normal(size=len(x))
+	for solver, options in [('lstsq', {}), ('normal', {}), ('gd', {'optimizer': 'adam', 'learning_rate': 0.05, 'max_epochs': 2000})]:
+		model = PolynomialRegression(3, solver, **options).fit(x, y)
+		assert np.allclose(model.coefficients_, [2, -1, 0, 0.5], atol=0.02), (solver, model.coefficients_)
+	print("Regression solver checks passed.")
@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+from handmade.knn import KNNClassifier, k_smallest, majority_vote
+from handmade.spatial import choose_algorithm, squared_distances
+
+
+''' Assigns each of n rows to one of n_folds folds of (nearly) equal size, in random order. '''
+def fold_ids(n, n_folds, seed=None):
+	ids = np.arange(n) % n_folds
+	np.random.default_rng(seed).shuffle(ids)
+	return ids
+
+''' Copies array into a new shared memory block. Returns the block (the caller closes and unlinks it) and the spec other processes attach with. '''
+def share(array):
+	block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+	np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+	return block, (block.name, array.shape, array.dtype.str)
+
+''' Maps a shared block into this process without copying. Keep the returned block referenced for as long as the array is used. '''
+def attach(spec):
+	name, shape, dtype = spec
+	block = shared_memory.SharedMemory(name=name)
+	return block, np.ndarray(shape, dtype, buffer=block.buf)
+
+
+''' State of the process computing neighbors: the shared arrays, the settings, and the fold being worked on (tasks arrive fold by fold). '''
+_state = {}
+
+def _init_state(arrays, settings, blocks=()):
+	_state.clear()
+	_state.update(arrays, blocks=list(blocks), fold=None, **settings)
+
+''' Pool initializer: attaches the shared arrays by name. '''
+def _attach_worker(specs, settings):
+	attached = {name: attach(spec) for name, spec in specs.items()}
+	_init_state({name: array for name, (_, array) in attached.items()}, settings, [block for block, _ in attached.values()])
+
+def _load_fold(fold):
+	if _state['fold'] == fold:
+		return
+	in_fold = _state['folds'] == fold
+	train = np.flatnonzero(~in_fold)
+	algorithm = choose_algorithm(len(train), _state['X'].shape[1]) if _state['algorithm'] == 'auto' else _state['algorithm']
+	model = None
+	if algorithm != 'brute': # Trees need the training rows of their own; brute force masks the fold on the shared matrix instead
+		model = KNNClassifier(_state['k'], algorithm, _state['leaf_size']).fit(_state['X'][train], _state['codes'][train])
+	_state.update(fold=fold, in_fold=in_fold, test=np.flatnonzero(in_fold), train=train, model=model)
+
+''' Label codes of the k nearest neighbors, outside fold, of the fold's test rows start:stop. '''
+def _fold_neighbors(fold, start, stop):
+	_load_fold(fold)
+	X, k = _state['X'], _state['k']
+	test = _state['test'][start:stop]
+	if _state['model'] is not None:
+		neighbors = _state['train'][_state['model'].kneighbors(X[test], k)[1]]
+	else:
+		neighbors = np.empty((len(test), k), dtype=np.int64)
+		step = max(1, _state['chunk_bytes'] // (8 * len(X)))
+		for s in range(0, len(test), step):
+			d2 = squared_distances(X[test[s:s + step]], X, _state['sq_norms'])
+			d2[:, _state['in_fold']] = np.inf
+			neighbors[s:s + step] = k_smallest(d2, k)[1]
+	return _state['codes'][neighbors].astype(np.int32)
+
+
+''' k-fold cross-validation of KNNClassifier, for every k in ks at once: each point's k_max nearest neighbors outside its fold are found once, and every k votes
+among the first k of them. The folds are split into tasks of task_rows test points and run on n_jobs processes (default: all cores). The training matrix goes
+into shared memory once, and workers read it in place instead of receiving a pickled copy per task. Returns {k: accuracy of each fold}. '''
+def cross_validate(X, y, ks: Iterable[int] = (5,), n_folds: int = 5, n_jobs: Optional[int] = None, algorithm: str = 'auto', leaf_size: int = 32,
+		chunk_bytes: int = 64 * 2**20, task_rows: int = 1024, seed=None) -> Dict[int, np.ndarray]:
+	X = np.ascontiguousarray(X, dtype=np.float64)
+	classes, codes = np.unique(np.asarray(y), return_inverse=True)
+	ks = sorted(set(ks))
+	folds = fold_ids(len(X), n_folds, seed)
+	fold_sizes = np.bincount(folds, minlength=n_folds)
+	if ks[0] < 1 or ks[-1] > len(X) - fold_sizes.max():
+		raise ValueError(f"ks must be between 1 and {len(X) - fold_sizes.max()}, the smallest training fold.")
+	arrays = {'X': X, 'sq_norms': np.einsum('ij,ij->i', X, X), 'codes': codes.astype(np.int64), 'folds': folds}
+	settings = {'k': ks[-1], 'algorithm': algorithm, 'leaf_size': leaf_size, 'chunk_bytes': chunk_bytes}
+	tasks = [(fold, start, start + task_rows) for fold in range(n_folds) for start in range(0, fold_sizes[fold], task_rows)]
+	n_jobs = n_jobs or os.cpu_count()
+	if n_jobs == 1:
+		_init_state(arrays, settings)
+		results = [_fold_neighbors(*task) for task in tasks]
+		_state.clear()
+	else:
+		shared = {name: share(array) for name, array in arrays.items()}
+		try:
+			with ProcessPoolExecutor(n_jobs, initializer=_attach_worker, initargs=({name: spec for name, (_, spec) in shared.items()}, settings)) as pool:
+				results = list(pool.map(_fold_neighbors, *zip(*tasks)))
+		finally:
+			for block, _ in shared.values():
+				block.close()
+				block.unlink()
+	neighbor_codes = np.empty((len(X), ks[-1]), dtype=np.int32)
+	fold_rows = [np.flatnonzero(folds == fold) for fold in range(n_folds)]
+	for (fold, start, stop), result in zip(tasks, results):
+		neighbor_codes[fold_rows[fold][start:stop]] = result
+	scores = {}
+	for k in ks:
+		correct = majority_vote(neighbor_codes[:, :k], len(classes)) == codes
+		scores[k] = np.bincount(folds, weights=correct, minlength=n_folds) / fold_sizes
+	return scores
+
+
+''' Parallel and serial runs agree, for brute force and trees, and match fitting one KNNClassifier per fold. '''
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	X = rng.normal(size=(3000, 3))
+	y = np.where(X[:, 0] + 0.5 * rng.normal(size=len(X)) > 0, 'a', 'b')
+	ks = [1, 3, 5, 9]
+	serial = cross_validate(X, y, ks, n_folds=4, n_jobs=1, algorithm='brute', seed=1)
+	folds = fold_ids(len(X), 4, seed=1)
+	for k in ks:
+		expected = [KNNClassifier(k, 'brute').fit(X[folds != f], y[folds != f]).score(X[folds == f], y[folds == f]) for f in range(4)]
+		assert np.allclose(serial[k], expected), (k, serial[k], expected)
+	for algorithm in ('brute', 'kd_tree'):
+		parallel = cross_validate(X, y, ks, n_folds=4, n_jobs=2, algorithm=algorithm, task_rows=200, seed=1)
+		assert all(np.allclose(parallel[k], serial[k]) for k in ks), algorithm
+	print("Cross-validation checks passed.")
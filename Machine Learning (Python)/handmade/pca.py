@@ -0,0 +1,167 @@
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+from handmade.preprocessing import StandardScaler
+
+
+''' Subtracts each column's mean from X in place and returns (X, mean). The vectorised form of Handmade PCA.py's dataframe_demean. '''
+def demean(X, mean=None):
+	if mean is None:
+		mean = X.mean(axis=0)
+	X -= mean
+	return X, mean
+
+''' Flips the sign of each component so that its largest-magnitude entry is positive. SVD signs are arbitrary; this makes results reproducible across solvers. '''
+def flip_signs(U, Vt):
+	signs = np.sign(Vt[np.arange(len(Vt)), np.argmax(np.abs(Vt), axis=1)])
+	signs[signs == 0] = 1
+	return (U * signs if U is not None else None), Vt * signs[:, None]
+
+''' Truncated SVD by random projection (Halko, Martinsson & Tropp): the range of X is sampled with n_components + n_oversamples random vectors,
+sharpened by n_iter power iterations, and the small projected matrix gets an exact SVD. Costs O(n·d·k) instead of O(n·d·min(n, d)). '''
+def randomized_svd(X, n_components, n_oversamples=10, n_iter=4, rng=None):
+	rng = np.random.default_rng(rng)
+	k = min(n_components + n_oversamples, *X.shape)
+	Y = X @ rng.normal(size=(X.shape[1], k))
+	for _ in range(n_iter):
+		Y, _ = np.linalg.qr(Y) # Re-orthonormalising keeps small singular directions from vanishing in rounding
+		Y, _ = np.linalg.qr(X.T @ Y)
+		Y = X @ Y
+	Q, _ = np.linalg.qr(Y)
+	U_small, S, Vt = np.linalg.svd(Q.T @ X, full_matrices=False)
+	return (Q @ U_small)[:, :n_components], S[:n_components], Vt[:n_components]
+
+
+''' Principal component analysis. solver is 'full' (exact SVD), 'randomized' (truncated randomized SVD, for many columns and few components) or 'auto'.
+With copy=False, fit() demeans a float input array in place instead of copying it. '''
+class PCA:
+
+	def __init__(self, n_components: Optional[int] = None, solver: str = 'auto', n_oversamples: int = 10, n_iter: int = 4, seed=None, copy: bool = True):
+		if solver not in ('auto', 'full', 'randomized'):
+			raise ValueError(f"Unknown solver '{solver}'.")
+		self.n_components = n_components
+		self.solver = solver
+		self.n_oversamples = n_oversamples
+		self.n_iter = n_iter
+		self.seed = seed
+		self.copy = copy
+
+	def _choose_solver(self, n, d, k):
+		if self.solver != 'auto':
+			return self.solver
+		return 'randomized' if max(n, d) > 500 and k < 0.8 * min(n, d) else 'full'
+
+	def fit(self, X):
+		self._fit(X)
+		return self
+
+	''' Fits and returns the projected data, reusing the SVD instead of projecting again. '''
+	def fit_transform(self, X):
+		U, S = self._fit(X)
+		return U * S
+
+	def _fit(self, X):
+		X = np.array(X, dtype=np.float64, copy=self.copy or None)
+		if not X.flags.writeable: # e.g. a read-only view of a DataFrame or memory map
+			X = X.copy()
+		n, d = X.shape
+		k = self.n_components or min(n, d)
+		if not 1 <= k <= min(n, d):
+			raise ValueError(f"n_components must be between 1 and {min(n, d)}.")
+		X, self.mean_ = demean(X)
+		total_variance = np.einsum('ij,ij->', X, X) / (n - 1)
+		self.solver_ = self._choose_solver(n, d, k)
+		if self.solver_ == 'full':
+			U, S, Vt = np.linalg.svd(X, full_matrices=False)
+			U, S, Vt = U[:, :k], S[:k], Vt[:k]
+		else:
+			U, S, Vt = randomized_svd(X, k, self.n_oversamples, self.n_iter, self.seed)
+		U, self.components_ = flip_signs(U, Vt)
+		self.singular_values_ = S
+		self.explained_variance_ = S ** 2 / (n - 1)
+		self.explained_variance_ratio_ = self.explained_variance_ / total_variance
+		return U, S
+
+	''' Coordinates of X on the principal components. '''
+	def transform(self, X):
+		return (np.asarray(X, dtype=np.float64) - self.mean_) @ self.components_.T
+
+	''' Maps component coordinates back to the original space (exact when all components are kept). '''
+	def inverse_transform(self, Z):
+		return np.asarray(Z, dtype=np.float64) @ self.components_ + self.mean_
+
+
+''' PCA fitted one chunk at a time (Ross et al.'s incremental SVD), so the data can stream from disk: memory depends on the chunk size and the number of
+columns, not the number of rows. Each partial_fit() takes an SVD of the previous components stacked on the new demeaned chunk and a mean-shift correction row. '''
+class IncrementalPCA(PCA):
+
+	def __init__(self, n_components: Optional[int] = None):
+		super().__init__(n_components, solver='full')
+		self.reset()
+
+	def reset(self):
+		self.moments_ = StandardScaler() # Running count, mean and variance of every column
+		self.components_ = None
+		self.singular_values_ = None
+		return self
+
+	@property
+	def n_samples_seen_(self):
+		return self.moments_.n_samples_seen_
+
+	def partial_fit(self, X):
+		X = np.asarray(X.to_numpy() if isinstance(X, pd.DataFrame) else X, dtype=np.float64)
+		if len(X) == 0: # e.g. a chunk whose rows were all dropped as NaN
+			return self
+		n_b, d = X.shape
+		k = self.n_components or d
+		if self.components_ is None and n_b < k:
+			raise ValueError(f"The first chunk needs at least n_components={k} rows.")
+		n_a = self.n_samples_seen_
+		previous_mean = self.moments_.mean_
+		self.moments_.partial_fit(X)
+		chunk_mean = X.mean(axis=0)
+		if self.components_ is None:
+			stacked = X - chunk_mean
+		else:
+			correction = np.sqrt(n_a * n_b / (n_a + n_b)) * (previous_mean - chunk_mean)
+			stacked = np.vstack([self.singular_values_[:, None] * self.components_, X - chunk_mean, correction])
+		_, S, Vt = np.linalg.svd(stacked, full_matrices=False)
+		_, Vt = flip_signs(None, Vt[:k])
+		n = self.n_samples_seen_
+		self.mean_ = self.moments_.mean_
+		self.components_ = Vt
+		self.singular_values_ = S[:k]
+		self.explained_variance_ = self.singular_values_ ** 2 / (n - 1)
+		self.explained_variance_ratio_ = self.explained_variance_ / (self.moments_.var_.sum() * n / (n - 1))
+		return self
+
+	''' Fits an in-memory array chunk_size rows at a time. '''
+	def fit(self, X, chunk_size: int = 10_000):
+		return self.fit_chunks(X[start:start + chunk_size] for start in range(0, len(X), chunk_size))
+
+	''' Fits a stream of chunks (arrays or DataFrames), e.g. pd.read_csv(path, chunksize=...) or slices of a memory-mapped .npy file. '''
+	def fit_chunks(self, chunks: Iterable):
+		self.reset()
+		for chunk in chunks:
+			self.partial_fit(chunk)
+		return self
+
+	def fit_transform(self, X, chunk_size: int = 10_000):
+		return self.fit(X, chunk_size).transform(X)
+
+
+''' The three solvers agree on data with a clear low-rank structure, and inverse_transform undoes transform when all components are kept. '''
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	X = (rng.normal(size=(5000, 4)) * [10, 5, 2, 1]) @ rng.normal(size=(4, 60)) + 0.01 * rng.normal(size=(5000, 60)) + 3
+	full = PCA(4, 'full').fit(X)
+	for model in [PCA(4, 'randomized', seed=0).fit(X), IncrementalPCA(4).fit(X, chunk_size=700)]:
+		assert np.allclose(model.components_, full.components_, atol=1e-6), type(model).__name__
+		assert np.allclose(model.explained_variance_ratio_, full.explained_variance_ratio_, rtol=1e-6), type(model).__name__
+		assert np.allclose(model.mean_, full.mean_)
+	assert np.allclose(full.fit_transform(X), full.transform(X))
+	every = PCA().fit(X[:200])
+	assert np.allclose(every.inverse_transform(every.transform(X[:200])), X[:200])
+	print("PCA solver checks passed.")
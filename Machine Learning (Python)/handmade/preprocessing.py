@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+
+''' Converts values into z-scores, column by column, with statistics kept from fitting. Fitting is a single pass over the data: chunks are merged with
+Welford/Chan updates of (count, mean, sum of squared deviations), which stay numerically stable where sum-of-squares formulas cancel out.
+DataFrames are handled by column name, so only the fitted numeric columns are touched and the others (e.g. labels) keep their dtype. '''
+class StandardScaler:
+
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self.n_samples_seen_ = 0
+		self.mean_ = None
+		self.m2_ = None
+		self.columns_ = None
+		return self
+
+	''' Returns the numeric values of X as a 2-dimensional float array, remembering the column names of a DataFrame. '''
+	def _values(self, X):
+		if isinstance(X, pd.DataFrame):
+			numeric = X.select_dtypes(include='number').columns
+			if self.columns_ is None:
+				self.columns_ = list(numeric)
+			elif list(numeric) != self.columns_:
+				raise ValueError(f"Expected columns {self.columns_}, got {list(numeric)}.")
+			X = X[self.columns_].to_numpy(dtype=np.float64)
+		return np.atleast_2d(np.asarray(X, dtype=np.float64))
+
+	''' Folds one chunk of rows into the running statistics. Call repeatedly to fit data that does not fit in memory. '''
+	def partial_fit(self, X):
+		X = self._values(X)
+		n_b = X.shape[0]
+		if n_b == 0:
+			return self
+		mean_b = X.mean(axis=0)
+		m2_b = np.einsum('ij,ij->j', X - mean_b, X - mean_b)
+		if self.mean_ is None:
+			self.n_samples_seen_, self.mean_, self.m2_ = n_b, mean_b, m2_b
+			return self
+		if len(mean_b) != len(self.mean_):
+			raise ValueError(f"Expected {len(self.mean_)} columns, got {len(mean_b)}.")
+		n_a = self.n_samples_seen_
+		n = n_a + n_b
+		delta = mean_b - self.mean_
+		self.mean_ = self.mean_ + delta * (n_b / n)
+		self.m2_ = self.m2_ + m2_b + delta ** 2 * (n_a * n_b / n)
+		self.n_samples_seen_ = n
+		return self
+
+	def fit(self, X):
+		return self.reset().partial_fit(X)
+
+	''' Population variance (ddof=0) of each fitted column. '''
+	@property
+	def var_(self):
+		return self.m2_ / self.n_samples_seen_
+
+	''' Standard deviation of each fitted column; constant columns get 1, so they map to 0 instead of dividing by zero. '''
+	@property
+	def scale_(self):
+		std = np.sqrt(self.var_)
+		return np.where(std > 0, std, 1.0)
+
+	''' Scales X with the fitted statistics. Float arrays are modified in place (unless copy=True); DataFrames get their fitted columns replaced one at a time. '''
+	def transform(self, X, copy: bool = False):
+		return self._apply(X, copy, inverse=False)
+
+	def inverse_transform(self, X, copy: bool = False):
+		return self._apply(X, copy, inverse=True)
+
+	def fit_transform(self, X, copy: bool = False):
+		return self.fit(X).transform(X, copy)
+
+	def _apply(self, X, copy, inverse):
+		if self.mean_ is None:
+			raise ValueError("StandardScaler is not fitted yet.")
+		mean, scale = self.mean_, self.scale_
+		if isinstance(X, pd.DataFrame):
+			if self.columns_ is None:
+				raise ValueError("StandardScaler was fitted on an array, not a DataFrame.")
+			if copy:
+				X = X.copy()
+			for column, m, s in zip(self.columns_, mean, scale):
+				values = X[column].to_numpy(dtype=np.float64)
+				X[column] = values * s + m if inverse else (values - m) / s
+			return X
+		if copy or not (isinstance(X, np.ndarray) and X.dtype.kind == 'f' and X.flags.writeable):
+			X = np.array(X, dtype=np.float64)
+		if inverse:
+			X *= scale
+			X += mean
+		else:
+			X -= mean
+			X /= scale
+		return X
+
+
+''' Streaming fit matches the in-memory fit and numpy's statistics, even for data with a large offset. '''
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	X = rng.normal(loc=1e8, scale=[1.0, 3.0, 0.5], size=(100_003, 3))
+	X[:, 2] = 7.0 # A constant column
+	streamed = StandardScaler()
+	for start in range(0, len(X), 4096):
+		streamed.partial_fit(X[start:start + 4096])
+	full = StandardScaler().fit(X)
+	assert np.allclose(streamed.mean_, X.mean(axis=0), rtol=0, atol=1e-6) and np.allclose(streamed.var_, X.var(axis=0), rtol=1e-9)
+	assert np.allclose(streamed.mean_, full.mean_, rtol=0, atol=1e-6) and np.allclose(streamed.var_, full.var_, rtol=1e-9)
+	Z = full.transform(X.copy())
+	assert np.allclose(Z[:, :2].mean(axis=0), 0, atol=1e-6) and np.allclose(Z[:, :2].std(axis=0), 1) and np.all(Z[:, 2] == 0)
+	assert np.allclose(full.inverse_transform(Z), X)
+
+	df = pd.DataFrame({'x1': [1.0, 2.0, 3.0], 'x2': [10, 20, 30], 'y': ['a', 'b', 'a']})
+	scaler = StandardScaler().fit(df)
+	scaler.transform(df)
+	assert scaler.columns_ == ['x1', 'x2'] and df['y'].tolist() == ['a', 'b', 'a'] and np.allclose(df['x2'], [-1.2247449, 0, 1.2247449])
+	print("StandardScaler checks passed.")
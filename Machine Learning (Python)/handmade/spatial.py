@@ -0,0 +1,205 @@
+import numpy as np
+
+
+''' Squared euclidean distances between every row of Q and every row of X, as a (len(Q), len(X)) matrix. Uses |q|² - 2q·x + |x|², so the work is one matrix product. '''
+def squared_distances(Q, X, X_sq_norms=None):
+	if X_sq_norms is None:
+		X_sq_norms = np.einsum('ij,ij->i', X, X)
+	d2 = Q @ X.T
+	d2 *= -2
+	d2 += np.einsum('ij,ij->i', Q, Q)[:, None]
+	d2 += X_sq_norms[None, :]
+	return np.maximum(d2, 0, out=d2) # Rounding can leave tiny negatives
+
+
+''' Space-partitioning tree stored in flat arrays. Node i covers the points X_sorted_[start[i]:end[i]]; internal nodes have two children, leaves have left[i] == -1.
+Subclasses define the node bounds (a box or a ball), the minimum distance from a query to them, and the direction each node is split along. '''
+class SpatialTree:
+
+	def __init__(self, X, leaf_size: int = 32):
+		if leaf_size < 1:
+			raise ValueError("leaf_size must be a positive integer.")
+		X = np.ascontiguousarray(X, dtype=np.float64)
+		self.leaf_size = leaf_size
+		self.n, self.d = X.shape
+		self.build(X)
+
+	''' Bulk construction: splits each node at the median of its widest dimension, so the tree is balanced. Points are reordered once so every node is a contiguous slice. '''
+	def build(self, X):
+		order = np.arange(self.n)
+		start, end, left, right, split_rule, split_val = [], [], [], [], [], []
+		bounds = []
+		stack = [(0, self.n, -1, False)] # (start, end, parent, is_right_child)
+		while stack:
+			lo, hi, parent, is_right = stack.pop()
+			node = len(start)
+			if parent >= 0:
+				(right if is_right else left)[parent] = node
+			points = X[order[lo:hi]]
+			bounds.append(self.node_bounds(points))
+			start.append(lo)
+			end.append(hi)
+			left.append(-1)
+			right.append(-1)
+			rule, values = self.split_direction(points)
+			if hi - lo <= self.leaf_size or values.min() == values.max():
+				split_rule.append(self.no_split)
+				split_val.append(0.0)
+				continue
+			mid = (lo + hi) // 2
+			part = np.argpartition(values, mid - lo)
+			order[lo:hi] = order[lo:hi][part]
+			split_rule.append(rule)
+			split_val.append(values[part[mid - lo]])
+			stack.append((mid, hi, node, True))
+			stack.append((lo, mid, node, False))
+		self.order_ = order
+		self.X_sorted_ = X[order]
+		self.sq_norms_ = np.einsum('ij,ij->i', self.X_sorted_, self.X_sorted_)
+		self.start_, self.end_ = np.array(start), np.array(end)
+		self.left_, self.right_ = np.array(left), np.array(right)
+		self.split_rule_, self.split_val_ = np.array(split_rule), np.array(split_val)
+		self.store_bounds(bounds)
+
+	@property
+	def n_nodes(self):
+		return len(self.start_)
+
+	''' Leaf reached by each query when descending by the split values, all queries at once. '''
+	def descend(self, Q):
+		nodes = np.zeros(len(Q), dtype=np.int64)
+		internal = self.left_[nodes] >= 0
+		while internal.any():
+			active = nodes[internal]
+			go_right = self.project(Q[internal], active) >= self.split_val_[active]
+			nodes[internal] = np.where(go_right, self.right_[active], self.left_[active])
+			internal = self.left_[nodes] >= 0
+		return nodes
+
+	''' Merges the points of one leaf into the running k-best of the queries qids. '''
+	def merge_leaf(self, node, Q, qids, best_d, best_i):
+		lo, hi = self.start_[node], self.end_[node]
+		d2 = squared_distances(Q[qids], self.X_sorted_[lo:hi], self.sq_norms_[lo:hi])
+		cand_d = np.concatenate([best_d[qids], d2], axis=1)
+		cand_i = np.concatenate([best_i[qids], np.broadcast_to(np.arange(lo, hi), d2.shape)], axis=1)
+		k = best_d.shape[1]
+		keep = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+		best_d[qids] = np.take_along_axis(cand_d, keep, axis=1)
+		best_i[qids] = np.take_along_axis(cand_i, keep, axis=1)
+
+	''' Batched k-nearest-neighbor search. Returns (distances, indices into X) sorted nearest first.
+	Each query first scans its own leaf, which gives a tight bound; then one traversal serves all queries, dropping at each node the queries that node cannot improve. '''
+	def query(self, Q, k: int = 1):
+		Q = np.atleast_2d(np.asarray(Q, dtype=np.float64))
+		if not 1 <= k <= self.n:
+			raise ValueError(f"k must be between 1 and the {self.n} indexed points.")
+		best_d = np.full((len(Q), k), np.inf)
+		best_i = np.full((len(Q), k), -1, dtype=np.int64)
+		home = self.descend(Q)
+		by_leaf = np.argsort(home, kind='stable')
+		leaves, first = np.unique(home[by_leaf], return_index=True)
+		for leaf, qids in zip(leaves, np.split(by_leaf, first[1:])):
+			self.merge_leaf(leaf, Q, qids, best_d, best_i)
+
+		stack = [(0, np.arange(len(Q)))]
+		while stack:
+			node, qids = stack.pop()
+			kth = best_d[qids].max(axis=1)
+			qids = qids[self.min_sq_distance(node, Q[qids]) < kth]
+			if self.left_[node] < 0:
+				qids = qids[home[qids] != node] # Already scanned
+				if len(qids):
+					self.merge_leaf(node, Q, qids, best_d, best_i)
+			elif len(qids):
+				stack.append((self.right_[node], qids))
+				stack.append((self.left_[node], qids))
+
+		order = np.argsort(best_d, axis=1, kind='stable')
+		distances = np.sqrt(np.take_along_axis(best_d, order, axis=1))
+		return distances, self.order_[np.take_along_axis(best_i, order, axis=1)]
+
+
+''' KD-tree: nodes are bounded by axis-aligned boxes and split along their widest coordinate. Best in low dimensions. '''
+class KDTree(SpatialTree):
+	no_split = 0
+
+	def split_direction(self, points):
+		dim = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+		return dim, points[:, dim]
+
+	def project(self, Q, nodes):
+		return Q[np.arange(len(Q)), self.split_rule_[nodes]]
+
+	def node_bounds(self, points):
+		return points.min(axis=0), points.max(axis=0)
+
+	def store_bounds(self, bounds):
+		self.lower_ = np.array([lower for lower, _ in bounds])
+		self.upper_ = np.array([upper for _, upper in bounds])
+
+	def min_sq_distance(self, node, Q):
+		gap = np.maximum(self.lower_[node] - Q, 0) + np.maximum(Q - self.upper_[node], 0)
+		return np.einsum('ij,ij->i', gap, gap)
+
+
+''' Ball tree: nodes are bounded by a centroid and a radius, and split along the line through two far-apart points, which follows the data rather than the axes.
+Prunes better than boxes when high-dimensional data lies near a low-dimensional structure. '''
+class BallTree(SpatialTree):
+
+	@property
+	def no_split(self):
+		return np.zeros(self.d)
+
+	def split_direction(self, points):
+		a = points[np.argmax(np.einsum('ij,ij->i', points - points[0], points - points[0]))]
+		b = points[np.argmax(np.einsum('ij,ij->i', points - a, points - a))]
+		norm = np.linalg.norm(b - a)
+		direction = (b - a) / norm if norm > 0 else self.no_split
+		return direction, points @ direction
+
+	def project(self, Q, nodes):
+		return np.einsum('ij,ij->i', Q, self.split_rule_[nodes])
+
+	def node_bounds(self, points):
+		center = points.mean(axis=0)
+		offsets = points - center
+		return center, np.sqrt(np.einsum('ij,ij->i', offsets, offsets).max())
+
+	def store_bounds(self, bounds):
+		self.centers_ = np.array([center for center, _ in bounds])
+		self.radii_ = np.array([radius for _, radius in bounds])
+
+	def min_sq_distance(self, node, Q):
+		offsets = Q - self.centers_[node]
+		gap = np.maximum(np.sqrt(np.einsum('ij,ij->i', offsets, offsets)) - self.radii_[node], 0)
+		return gap * gap
+
+
+TREES = {'kd_tree': KDTree, 'ball_tree': BallTree}
+
+''' Picks the search method for n points in d dimensions. A tree pays off once there are many points per "cell" of the space (about 100 * 2^d here): pruning fades as d grows,
+and below a few thousand points one vectorised brute-force pass beats any traversal in Python. Data that lies near a low-dimensional structure favours trees far
+beyond this rule, which can only see n and d; pass algorithm='kd_tree' or 'ball_tree' explicitly for it. '''
+def choose_algorithm(n, d):
+	if n < max(5000, 100 * 2 ** min(d, 30)):
+		return 'brute'
+	return 'kd_tree' if d <= 12 else 'ball_tree'
+
+
+''' Correctness checks against brute force: same neighbor distances for every query, including duplicate points and k larger than a leaf. '''
+if __name__ == '__main__':
+	rng = np.random.default_rng(0)
+	cases = [(2000, 2, 1, 16), (3000, 4, 5, 32), (3000, 4, 50, 8), (2000, 12, 7, 32), (1000, 3, 3, 1)]
+	for n, d, k, leaf_size in cases:
+		X = rng.normal(size=(n, d))
+		X[n // 2:n // 2 + 50] = X[0] # Duplicates
+		X[:100, 0] = 0.5 # A constant coordinate
+		Q = np.vstack([rng.normal(size=(300, d)), X[:20]])
+		d2 = squared_distances(Q, X)
+		expected = np.sqrt(np.sort(d2, axis=1)[:, :k])
+		for name, Tree in TREES.items():
+			distances, indices = Tree(X, leaf_size).query(Q, k)
+			assert np.allclose(distances, expected, atol=1e-6), (name, n, d, k)
+			assert np.allclose(np.sqrt(np.take_along_axis(d2, indices, axis=1)), distances, atol=1e-6), (name, n, d, k)
+			assert all(len(set(row)) == k for row in indices), (name, n, d, k)
+	print(f"KDTree and BallTree match brute force on {len(cases)} cases.")
@@ -0,0 +1,141 @@
+import os
+from typing import Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+
+''' Yields float arrays of up to chunk_size rows of the given columns (in that order) of a CSV file, without reading the whole file.
+Extra keyword arguments go to pd.read_csv (e.g. header=None, names=[...]). Rows with missing values are dropped when dropna is set. '''
+def iter_csv(path, columns: List[str], chunk_size: int = 65_536, dropna: bool = False, **read_csv_options) -> Iterator[np.ndarray]:
+	for frame in pd.read_csv(path, usecols=columns, chunksize=chunk_size, **read_csv_options):
+		frame = frame[columns] # usecols keeps the file's column order
+		if dropna:
+			frame = frame.dropna()
+		yield frame.to_numpy(dtype=np.float64)
+
+''' Writes the given columns of a CSV file to a .npy file, streaming: one pass counts the rows, a second fills a memory-mapped output chunk by chunk. '''
+def csv_to_npy(path, npy_path, columns: List[str], chunk_size: int = 65_536, dropna: bool = False, **read_csv_options):
+	n = sum(len(chunk) for chunk in iter_csv(path, columns, chunk_size, dropna, **read_csv_options))
+	output = np.lib.format.open_memmap(npy_path, mode='w+', dtype=np.float64, shape=(n, len(columns)))
+	start = 0
+	for chunk in iter_csv(path, columns, chunk_size, dropna, **read_csv_options):
+		output[start:start + len(chunk)] = chunk
+		start += len(chunk)
+	output.flush()
+	del output
+
+''' Writes the given columns of a CSV file to a Parquet file, one row group per chunk. Needs pyarrow. '''
+def csv_to_parquet(path, parquet_path, columns: List[str], chunk_size: int = 65_536, dropna: bool = False, **read_csv_options):
+	import pyarrow as pa
+	import pyarrow.parquet as pq
+	schema = pa.schema([(column, pa.float64()) for column in columns])
+	with pq.ParquetWriter(parquet_path, schema) as writer:
+		for chunk in iter_csv(path, columns, chunk_size, dropna, **read_csv_options):
+			writer.write_table(pa.Table.from_arrays(list(chunk.T), schema=schema))
+
+''' Re-slices a stream of chunks into shuffled chunks: rows go through a buffer of buffer_size rows, which is permuted before each chunk leaves it.
+Rows can move up to buffer_size positions, so with a buffer as large as the data this is a full shuffle. Memory stays at buffer_size plus one chunk. '''
+def shuffle_buffer(chunks: Iterable[np.ndarray], buffer_size: int, rng=None) -> Iterator[np.ndarray]:
+	rng = np.random.default_rng(rng)
+	buffer = None
+	for chunk in chunks:
+		buffer = chunk if buffer is None else np.concatenate([buffer, chunk])
+		if len(buffer) > buffer_size:
+			buffer = buffer[rng.permutation(len(buffer))]
+			yield buffer[:len(buffer) - buffer_size]
+			buffer = buffer[len(buffer) - buffer_size:]
+	if buffer is not None and len(buffer):
+		yield buffer[rng.permutation(len(buffer))]
+
+
+''' A CSV file read chunk by chunk, so models can train on files larger than memory. With cache='npy' (or 'parquet', which needs pyarrow) the selected columns
+are converted once to a binary cache next to the file, rebuilt when the CSV is newer, and later passes read it without parsing: the .npy cache is memory-mapped
+and sliced, the Parquet cache is read by row groups. Every call to chunks() is a new pass, so a dataset can be iterated once per epoch. '''
+class ChunkedDataset:
+
+	def __init__(self, path, columns: List[str], chunk_size: int = 65_536, cache: Optional[str] = None, cache_path=None, dropna: bool = False, **read_csv_options):
+		if cache not in (None, 'npy', 'parquet'):
+			raise ValueError(f"Unknown cache '{cache}', expected 'npy', 'parquet' or None.")
+		self.path = path
+		self.columns = list(columns)
+		self.chunk_size = chunk_size
+		self.cache = cache
+		self.cache_path = cache_path or (None if cache is None else f"{os.path.splitext(path)[0]}.{cache}")
+		self.dropna = dropna
+		self.read_csv_options = read_csv_options
+
+	def _build_cache(self):
+		if os.path.exists(self.cache_path) and os.path.getmtime(self.cache_path) >= os.path.getmtime(self.path):
+			return
+		convert = csv_to_npy if self.cache == 'npy' else csv_to_parquet
+		convert(self.path, self.cache_path, self.columns, self.chunk_size, self.dropna, **self.read_csv_options)
+
+	''' The whole dataset as a read-only memory-mapped array (npy cache only); pages are read from disk as they are touched. '''
+	def memmap(self) -> np.ndarray:
+		if self.cache != 'npy':
+			raise ValueError("memmap() needs cache='npy'.")
+		self._build_cache()
+		array = np.load(self.cache_path, mmap_mode='r')
+		if array.shape[1:] != (len(self.columns),):
+			raise ValueError(f"Cache {self.cache_path} has {array.shape[1]} columns, expected {len(self.columns)}; delete it to rebuild.")
+		return array
+
+	def _read(self) -> Iterator[np.ndarray]:
+		if self.cache is None:
+			yield from iter_csv(self.path, self.columns, self.chunk_size, self.dropna, **self.read_csv_options)
+		elif self.cache == 'npy':
+			array = self.memmap()
+			for start in range(0, len(array), self.chunk_size):
+				yield array[start:start + self.chunk_size]
+		else:
+			import pyarrow.parquet as pq
+			self._build_cache()
+			for batch in pq.ParquetFile(self.cache_path, memory_map=True).iter_batches(self.chunk_size, columns=self.columns):
+				yield np.column_stack([column.to_numpy(zero_copy_only=False) for column in batch.columns]).astype(np.float64, copy=False)
+
+	''' One pass over the rows, in chunks of up to chunk_size rows (read-only views when they come from the npy cache). shuffle_buffer_size > 0 shuffles them on the way. '''
+	def chunks(self, shuffle_buffer_size: int = 0, seed=None) -> Iterator[np.ndarray]:
+		if shuffle_buffer_size:
+			return shuffle_buffer(self._read(), shuffle_buffer_size, seed)
+		return self._read()
+
+	''' Like chunks(), split into (inputs, target) with target the name of one of the columns. '''
+	def xy_chunks(self, target: str, shuffle_buffer_size: int = 0, seed=None) -> Iterator[tuple]:
+		t = self.columns.index(target)
+		inputs = [i for i in range(len(self.columns)) if i != t]
+		for chunk in self.chunks(shuffle_buffer_size, seed):
+			yield chunk[:, inputs], chunk[:, t]
+
+
+''' Every reading path returns the same rows, the shuffle buffer permutes without losing rows, and streamed training matches in-memory statistics. '''
+if __name__ == '__main__':
+	import tempfile
+	from handmade.linear_model import SGDRegressor
+	from handmade.pca import IncrementalPCA, PCA
+	from handmade.preprocessing import StandardScaler
+
+	rng = np.random.default_rng(0)
+	X = rng.normal(size=(50_000, 3)) * [1, 2, 3]
+	y = X @ [1.0, -2.0, 0.5] + 4 + 0.1 * rng.normal(size=len(X))
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, 'data.csv')
+		frame = pd.DataFrame(np.column_stack([X, y]), columns=['a', 'b', 'c', 'y'])
+		frame.insert(0, 'label', 'text') # A column that is never read
+		frame.to_csv(path, index=False)
+		reference = frame[['a', 'b', 'c', 'y']].to_numpy()
+		for cache in (None, 'npy'):
+			data = ChunkedDataset(path, ['a', 'b', 'c', 'y'], chunk_size=4096, cache=cache)
+			assert np.allclose(np.concatenate(list(data.chunks())), reference)
+			shuffled = np.concatenate(list(data.chunks(shuffle_buffer_size=10_000, seed=0)))
+			assert not np.allclose(shuffled, reference) and np.allclose(np.sort(shuffled, axis=0), np.sort(reference, axis=0))
+		assert os.path.exists(os.path.join(directory, 'data.npy'))
+
+		scaler = StandardScaler()
+		for inputs, _ in data.xy_chunks('y'):
+			scaler.partial_fit(inputs)
+		model = SGDRegressor(0.01, 'adam', batch_size=256, seed=0)
+		model.fit_stream(lambda epoch: ((scaler.transform(inputs), target) for inputs, target in data.xy_chunks('y', 20_000, epoch)), epochs=20)
+		assert np.allclose(model.coef_ / scaler.scale_, [1.0, -2.0, 0.5], atol=0.01), model.coef_ / scaler.scale_
+		streamed = IncrementalPCA().fit_chunks(data.chunks()) # All components, so chunking loses nothing
+		assert np.allclose(np.abs(streamed.components_), np.abs(PCA(solver='full').fit(reference).components_), atol=1e-6)
+	print("Streaming checks passed.")
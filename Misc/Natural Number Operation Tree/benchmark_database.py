@@ -0,0 +1,76 @@
+''' Mede o tempo para abrir o banco de dados e responder uma placa: o pickle da árvore inteira, como antes, contra o formato binário de database.py;
+e o tempo para responder todas as 10.000 placas com o índice de solver.py. '''
+
+import os, pickle, random, tempfile, time
+from tree_ADT import Tree
+from create_database import generate_full_tree, generate_endnodes_lists
+from operation_graph import OperationGraph
+from reachability import Reachability
+from database import Database, write_database
+from solver import SolutionIndex, build_index, plate_pairs
+
+
+# The original user_interface query: unpickle the whole tree, then intersect the two kernel nodes' endnodes.
+def pickle_query(path, left, right):
+	with open(path, 'rb') as file:
+		tree = pickle.load(file)
+	leftnode = tree.get_node(left)
+	rightnode = tree.get_node(right)
+	solutions = set(leftnode.link.keys()).intersection(set(rightnode.link.keys()))
+	return {solution.items[0]: (leftnode.link[solution], rightnode.link[solution]) for solution in solutions if len(solution.items) == 1}
+
+
+def binary_query(path, left, right):
+	database = Database(path)
+	return {solution: (left_path, right_path) for solution, left_path, right_path in database.solutions(left, right)}
+
+
+def best_time(function, *args, repeats=5):
+	best = float('inf')
+	for _ in range(repeats):
+		start = time.perf_counter()
+		result = function(*args)
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+if __name__ == '__main__':
+	with tempfile.TemporaryDirectory() as directory:
+		pickle_path = os.path.join(directory, 'database.pickle')
+		binary_path = os.path.join(directory, 'database')
+		tree = Tree()
+		generate_full_tree(tree)
+		generate_endnodes_lists(tree)
+		with open(pickle_path, 'wb') as file:
+			pickle.dump(tree, file)
+		graph = OperationGraph.generate()
+		write_database(binary_path, graph, Reachability(graph))
+
+		plates = [((a, b), (c, d)) for a, b, c, d in [divmod(divmod(plate, 100)[0], 10) + divmod(plate % 100, 10) for plate in random.Random(0).sample(range(10000), 20)]]
+		pickle_times, binary_times = list(), list()
+		for left, right in plates:
+			pickle_time, expected = best_time(pickle_query, pickle_path, left, right, repeats=2)
+			binary_time, found = best_time(binary_query, binary_path, left, right)
+			assert expected.keys() == found.keys(), (left, right)
+			assert all(len(expected[value][side]) == len(found[value][side]) for value in found for side in (0, 1)), (left, right)
+			pickle_times.append(pickle_time)
+			binary_times.append(binary_time)
+
+		print(f"Open the database and answer one plate (median of {len(plates)} plates):")
+		print(f"\tpickled tree:  {sorted(pickle_times)[len(plates) // 2] * 1000:8.2f} ms   ({os.path.getsize(pickle_path) / 2**20:.2f} MB file)")
+		print(f"\tbinary format: {sorted(binary_times)[len(plates) // 2] * 1000:8.2f} ms   ({os.path.getsize(binary_path) / 2**20:.2f} MB file)")
+
+		index_path = os.path.join(directory, 'solutions')
+		start = time.perf_counter()
+		build_index(Database(binary_path), index_path)
+		build_time = time.perf_counter() - start
+		database, index = Database(binary_path), SolutionIndex(index_path, binary_path)
+		timings = dict()
+		for name, query in [('Database.solutions()', lambda plate: database.solutions(*plate_pairs(plate))), ('SolutionIndex.solutions()', index.solutions), ('SolutionIndex.values()', index.values)]:
+			start = time.perf_counter()
+			answers = [query(plate) for plate in range(10000)]
+			timings[name] = (time.perf_counter() - start) / 10000
+		assert [[value for value, _, _ in solutions] for solutions in [database.solutions(*plate_pairs(plate)) for plate in range(0, 10000, 37)]] == [index.values(plate) for plate in range(0, 10000, 37)]
+		print(f"All 10,000 plates: index built in {build_time:.2f} s ({os.path.getsize(index_path) / 2**20:.1f} MB, {len(index.arrays['nodes'])} solutions)")
+		for name, seconds in timings.items():
+			print(f"\t{name:<27}{seconds * 1e6:8.1f} µs per plate")
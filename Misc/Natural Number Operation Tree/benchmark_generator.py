@@ -0,0 +1,56 @@
+''' Mede o tempo de generate_full_tree() com a comparação antiga de cópias do conjunto de nódulos e com a expansão apenas da fronteira,
+e o tempo de generator.generate() por tamanho do problema, com um e com vários processos. '''
+
+import os, time
+from tree_ADT import Tree
+from create_database import generate_full_tree
+from operation_graph import OperationGraph
+from generator import Problem, generate
+
+
+# The original generate_full_tree(): Tree.expand() checks every Node each round, and each round copies and compares the whole node set.
+def copying_full_tree(tree):
+	tree.set_kernel()
+	previous_nodelist = list()
+	while (previous_nodelist != tree.nodes):
+		previous_nodelist = tree.nodes.copy()
+		tree.expand()
+
+
+def best_time(function, *args, repeats=3, **kwargs):
+	best = float('inf')
+	for _ in range(repeats):
+		start = time.perf_counter()
+		result = function(*args, **kwargs)
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+if __name__ == '__main__':
+	copying_time, copying_tree = best_time(lambda: copying_full_tree(Tree()) or None)
+	frontier_time, _ = best_time(lambda: generate_full_tree(Tree()))
+	print("generate_full_tree():")
+	print(f"\tcopy and compare node sets: {copying_time * 1000:8.2f} ms")
+	print(f"\tfrontier only:              {frontier_time * 1000:8.2f} ms")
+
+	expected, found = OperationGraph.generate(), generate()
+	assert expected.items == found.items and expected.op_names == found.op_names
+	assert (expected.offsets == found.offsets).all() and (expected.targets == found.targets).all() and (expected.op_codes == found.op_codes).all()
+
+	jobs = max(2, os.cpu_count())
+	problems = [
+		Problem(4, range(0, 6)),
+		Problem(4, range(0, 10)),
+		Problem(4, range(0, 10), operand_bound=5),
+		Problem(6, range(0, 4)),
+		Problem(6, range(0, 10), value_bound=10**5),
+		Problem(6, range(0, 10)),
+		Problem(8, range(0, 3), value_bound=10**5),
+	]
+	print(f"generator.generate() ({os.cpu_count()} CPUs):")
+	print(f"\t{'problem':<75}{'nodes':>9}{'operations':>12}{'1 process':>12}{f'{jobs} processes':>14}")
+	for problem in problems:
+		serial_time, graph = best_time(generate, problem, n_jobs=1, repeats=1)
+		parallel_time, parallel_graph = best_time(generate, problem, n_jobs=jobs, repeats=1)
+		assert graph.items == parallel_graph.items and (graph.targets == parallel_graph.targets).all()
+		print(f"\t{str(problem):<75}{len(graph):>9}{len(graph.targets):>12}{serial_time:>11.2f}s{parallel_time:>13.2f}s")
@@ -0,0 +1,106 @@
+''' Mede o tempo de aplicar as operações a todos os nódulos com as comparações de nomes e as funções de math antigas e com o registro de operations.py,
+e o tamanho, o tempo e as contagens de operações da geração com vários limites de valores. '''
+
+import time
+from math import factorial as fact
+from math import sqrt, floor, ceil
+from tree_ADT import Node
+from operations import Registry
+from generator import Problem, generate
+
+
+old_unary_ops = {
+	'unary √floor': lambda x: (floor(sqrt(x)),),
+	'unary √ceil': lambda x: (ceil(sqrt(x)),),
+	'unary !': lambda x: (fact(x),),
+	'abs': lambda x: (abs(x),),
+}
+old_binary_ops = {
+	'+': lambda x,y: (x+y,),
+	'-': lambda x,y: (x-y,),
+	'*': lambda x,y: (x*y,),
+	'/floor': lambda x,y: (x//y,),
+	'/ceil': lambda x,y: (ceil(x/y),),
+	'^': lambda x,y: (x**y,),
+	'binary ! (left)': lambda x,y: (fact(x), y),
+	'binary ! (right)': lambda x,y: (x, fact(y)),
+	'binary √floor (left)': lambda x, y: (floor(sqrt(x)), y),
+	'binary √ceil (left)': lambda x, y: (ceil(sqrt(x)), y),
+	'binary √floor (right)': lambda x, y: (x, floor(sqrt(y))),
+	'binary √ceil (right)': lambda x, y: (x, ceil(sqrt(y))),
+}
+
+
+# The previous Node.operations(): string comparisons on the op names for every operation of every tuple.
+def string_check_operations(items, operand_bound=9):
+	results = list()
+	if len(items) == 1:
+		x = items[0]
+		for op, function in old_unary_ops.items():
+			invalid_op = False
+			too_big = False
+			if (op == 'unary √floor' or op == 'unary √ceil') and x < 0:
+				invalid_op = True
+			if op == 'unary !' and x < 0:
+				invalid_op = True
+			if op == 'unary !' and x > operand_bound:
+				too_big = True
+			if not invalid_op and not too_big:
+				results.append((op, function(x)))
+	elif len(items) >= 2:
+		for i in range(len(items) - 1):
+			x = items[i]
+			y = items[i + 1]
+			for op, function in old_binary_ops.items():
+				invalid_op = False
+				too_big = False
+				if (op == '/floor' or op == '/ceil') and y == 0:
+					invalid_op = True
+				if (op == 'binary √floor (left)' or op == 'binary √ceil (left)') and x < 0:
+					invalid_op = True
+				if (op == 'binary √floor (right)' or op == 'binary √ceil (right)') and y < 0:
+					invalid_op = True
+				if (op == '^' and y < 0) or (op == 'binary ! (left)' and x < 0) or (op == 'binary ! (right)' and y < 0):
+					invalid_op = True
+				if op == '^' and (x > operand_bound or y > operand_bound):
+					too_big = True
+				if op == 'binary ! (left)' and x > operand_bound:
+					too_big = True
+				if op == 'binary ! (right)' and y > operand_bound:
+					too_big = True
+				if not invalid_op and not too_big:
+					results.append((Node.position_name(op, i, len(items)), items[:i] + function(x,y) + items[i+2:]))
+	return results
+
+
+def best_time(function, nodes, repeats=10):
+	best = float('inf')
+	for _ in range(repeats):
+		start = time.perf_counter()
+		for items in nodes:
+			function(items)
+		best = min(best, time.perf_counter() - start)
+	return best
+
+
+if __name__ == '__main__':
+	for problem in [Problem(), Problem(6, range(0, 4))]:
+		nodes = generate(problem).items
+		registry = Registry()
+		for items in nodes:
+			assert string_check_operations(items) == registry.apply(items), items
+		old_time = best_time(string_check_operations, nodes)
+		new_time = best_time(registry.apply, nodes)
+		print(f"Operations on the {len(nodes)} nodes of {problem}:")
+		print(f"\tname comparisons:   {old_time * 1000:8.1f} ms")
+		print(f"\toperation registry: {new_time * 1000:8.1f} ms  ({old_time / new_time:.1f}x faster)")
+
+	print("Generation with bounds on the values:")
+	print(f"\t{'problem':<80}{'nodes':>9}{'time':>8}{'evaluated':>12}{'invalid':>10}{'pruned':>10}")
+	for value_bound in (None, 10**6, 10**4, 10**3):
+		problem = Problem(6, range(0, 10), value_bound=value_bound)
+		start = time.perf_counter()
+		graph = generate(problem)
+		seconds = time.perf_counter() - start
+		counts = problem.registry.summary()
+		print(f"\t{str(problem):<80}{len(graph):>9}{seconds:>7.2f}s{counts['evaluated']:>12}{counts['invalid']:>10}{counts['pruned']:>10}")
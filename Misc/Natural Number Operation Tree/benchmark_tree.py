@@ -0,0 +1,118 @@
+''' Mede o tempo de generate_full_tree() com as buscas lineares antigas de Tree.has_node()/Tree.get_node() e com o índice por dicionário,
+o de generate_endnodes_lists() com a busca recursiva antiga e com a busca em largura de reachability.py,
+e a memória e o pickle da árvore de Nodes comparados aos da representação compacta de operation_graph.py. '''
+
+import sys, time, pickle, tracemalloc
+from tree_ADT import Tree, Node
+from create_database import generate_full_tree, generate_endnodes_lists
+from operation_graph import OperationGraph
+
+
+# Tree with the original lookups, which scan every node on each call.
+class LinearScanTree(Tree):
+	def has_node(self, items=tuple()):
+		for node in self.nodes:
+			if node.items == items:
+				return True
+		return False
+
+	def get_node(self, items=tuple()):
+		for node in self.nodes:
+			if node.items == items:
+				return node
+		return Node(tree=Tree())
+
+
+# The original recursive Node.get_endnodes(), with its shared default argument.
+def recursive_get_endnodes(self, prev_no_search=set()):
+	prev_no_search.add(self)
+	link_copy = self.link.copy()
+	for curr_node in link_copy:
+		if curr_node not in prev_no_search:
+			linked_nodes = set(self.link.keys())
+			linked_nodes.remove(self)
+			linked_nodes.remove(curr_node)
+			no_search_recursive_iteration = prev_no_search.copy()
+			no_search_recursive_iteration.update(linked_nodes)
+			node_return = recursive_get_endnodes(curr_node, no_search_recursive_iteration).copy()
+			node_return.update(self.link)
+			for received_node in node_return:
+				if received_node not in self.link:
+					previous_path = self.link[curr_node].copy()
+					previous_path += node_return[received_node]
+					node_return[received_node] = previous_path
+			self.link.update(node_return)
+	return self.link
+
+
+# Applies a list of operations to a node's items, to check that a path really leads where it claims.
+def replay(items, oplist):
+	for op in oplist:
+		function = Node.unary_ops[op] if len(items) == 1 else Node.binary_ops[op]
+		items = function(*items)
+	return items
+
+
+# Memory held by the result of build() (MB, as traced by tracemalloc), pickle size (MB) and pickling time (s).
+def footprint(build):
+	tracemalloc.start()
+	result = build()
+	memory = tracemalloc.get_traced_memory()[0] / 2**20
+	tracemalloc.stop()
+	start = time.perf_counter()
+	data = pickle.dumps(result)
+	return result, memory, len(data) / 2**20, time.perf_counter() - start
+
+
+def time_generation(tree_class, repeats=3):
+	best = float('inf')
+	for _ in range(repeats):
+		tree = tree_class()
+		start = time.perf_counter()
+		generate_full_tree(tree)
+		best = min(best, time.perf_counter() - start)
+	return best, tree
+
+
+if __name__ == '__main__':
+	scan_time, scan_tree = time_generation(LinearScanTree, repeats=1)
+	index_time, index_tree = time_generation(Tree)
+	assert {node.items for node in scan_tree.nodes} == {node.items for node in index_tree.nodes}
+	print(f"generate_full_tree(): {len(index_tree.nodes)} nodes")
+	print(f"\tlinear scans:  {scan_time:8.3f} s")
+	print(f"\tdict index:    {index_time:8.3f} s  ({scan_time / index_time:.0f}x faster)")
+
+	sys.setrecursionlimit(10000)
+	kernel = [(i, j) for i in range(0, 10) for j in range(0, 10)]
+	start = time.perf_counter()
+	for items in kernel:
+		recursive_get_endnodes(scan_tree.get_node(items))
+	recursive_time = time.perf_counter() - start
+	start = time.perf_counter()
+	generate_endnodes_lists(index_tree)
+	bfs_time = time.perf_counter() - start
+
+	recursive_steps = bfs_steps = 0
+	for items in kernel:
+		recursive_links = scan_tree.get_node(items).link
+		bfs_links = index_tree.get_node(items).link
+		assert {node.items for node in recursive_links} <= {node.items for node in bfs_links}
+		for node, oplist in bfs_links.items():
+			assert replay(items, oplist) == node.items, (items, node.items, oplist)
+		recursive_steps += sum(len(oplist) for oplist in recursive_links.values())
+		bfs_steps += sum(len(oplist) for oplist in bfs_links.values())
+	print(f"generate_endnodes_lists(): 100 kernel nodes, {sum(len(index_tree.get_node(items).link) for items in kernel)} paths")
+	print(f"\trecursive search:      {recursive_time:8.3f} s, {recursive_steps} operations in all paths")
+	print(f"\tmulti-source BFS:      {bfs_time:8.3f} s, {bfs_steps} operations in all paths ({recursive_time / bfs_time:.0f}x faster)")
+
+	def node_tree():
+		tree = Tree()
+		generate_full_tree(tree)
+		return tree
+	tree, tree_memory, tree_pickle, tree_pickle_time = footprint(node_tree)
+	graph, graph_memory, graph_pickle, graph_pickle_time = footprint(OperationGraph.generate)
+	edges = lambda graph: {graph.items[i]: set((graph.items[w], graph.op_names[c]) for w, c in adjacency) for i, adjacency in enumerate(graph.adjacency())}
+	assert edges(graph) == edges(OperationGraph.from_tree(tree))
+	print(f"Representation of the {len(graph)} nodes and {len(graph.targets)} operations:")
+	print(f"\tNode objects:     {tree_memory:6.2f} MB in memory, pickle {tree_pickle:6.2f} MB in {tree_pickle_time:.4f} s")
+	print(f"\tOperationGraph:   {graph_memory:6.2f} MB in memory, pickle {graph_pickle:6.2f} MB in {graph_pickle_time:.4f} s")
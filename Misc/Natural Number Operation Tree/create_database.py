@@ -1,33 +1,32 @@
-import sys, pickle
-from emplaka import Tree, Node
-from copy import deepcopy
-from math import factorial as fact
-from math import sqrt, floor, ceil
+from reachability import Reachability
+from operation_graph import OperationGraph
+from database import Database, write_database
+from solver import build_index
 
 
-# Permite que a função recursiva Node.get_endnodes() faça o seu trabalho até o fim.
-sys.setrecursionlimit(10000)
-
-
-# Loops until expanding the tree has no effect (i.e. generates no additional Nodes).
+# Fills Nodes until no additional Nodes appear. Only the Nodes created by the previous round are filled: tree.index keeps Nodes in creation order,
+# so they are the ones past the count of Nodes the round started with.
 def generate_full_tree(tree):
 	tree.set_kernel()
-	previous_nodelist = list()
-	while (previous_nodelist != tree.nodes):
-		previous_nodelist = tree.nodes.copy()
-		tree.expand()
+	start = 0
+	while start < len(tree.index):
+		frontier = list(tree.index.values())[start:]
+		start = len(tree.index)
+		for node in frontier:
+			node.fill(tree)
 
 
-# Generates the list of reachable nodes for all 100 Nodes from (0,0) to (9,9).
+# Generates the list of reachable nodes for all 100 Nodes from (0,0) to (9,9), with one breadth-first search shared by all of them.
 def generate_endnodes_lists(tree):
-	for i in range(0, 10):
-		for j in range(0, 10):
-			node = tree.get_node((i,j))
-			node.get_endnodes()
-
-
-tree = Tree()
-generate_full_tree(tree)
-generate_endnodes_lists(tree)
-with open('database', 'wb') as file:
-	pickle.dump(tree, file)
\ No newline at end of file
+	reachability = Reachability(tree)
+	for source in reachability.sources:
+		node = reachability.node(source)
+		node.link = reachability.endnodes(node)
+
+
+# Writes the binary database read by user_interface.py (see database.py), built from the compact graph without creating Nodes,
+# and the index of the solutions of every plate read by solver.py.
+if __name__ == '__main__':
+	graph = OperationGraph.generate()
+	write_database('database', graph, Reachability(graph))
+	build_index(Database('database'), 'solutions')
@@ -0,0 +1,117 @@
+''' Este arquivo define o formato binário do banco de dados do Emplaka e a sua leitura preguiçosa: só as linhas usadas por uma consulta são lidas do disco.'''
+
+import json, struct
+import numpy as np
+
+MAGIC = b'EMPLAKA\0'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<8sII') # Magic bytes, format version, length of the JSON header.
+
+
+def align(offset):
+	return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+# Writes arrays to one file: the preamble, a JSON header (the given fields plus the kind of file and the dtype, shape and offset of every array),
+# then the raw bytes of each array at an aligned offset, so that each one can be memory-mapped in place.
+def write_arrays(path, kind, header, arrays):
+	header = dict(header, kind=kind, arrays=dict())
+	offset = 0
+	for name, array in arrays.items():
+		header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset} # Offsets count from the start of the data.
+		offset = align(offset + array.nbytes)
+	header_bytes = json.dumps(header).encode()
+	data_start = align(PREAMBLE.size + len(header_bytes))
+
+	with open(path, 'wb') as file:
+		file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+		file.write(header_bytes)
+		for name, array in arrays.items():
+			file.seek(data_start + header['arrays'][name]['offset'])
+			file.write(np.ascontiguousarray(array).tobytes())
+
+
+# Reads the header of a file written by write_arrays() and memory-maps its arrays. Returns (header, arrays).
+def read_arrays(path, kind):
+	with open(path, 'rb') as file:
+		magic, version, header_length = PREAMBLE.unpack(file.read(PREAMBLE.size))
+		if magic != MAGIC:
+			raise ValueError(f"{path} is not an Emplaka {kind} in the binary format; run create_database.py to build it.")
+		if version != FORMAT_VERSION:
+			raise ValueError(f"{path} has format version {version}, but this program reads version {FORMAT_VERSION}; run create_database.py again.")
+		header = json.loads(file.read(header_length))
+	if header.get('kind') != kind:
+		raise ValueError(f"{path} holds a {header.get('kind')}, not a {kind}.")
+	data_start = align(PREAMBLE.size + header_length)
+	arrays = {
+		name: np.memmap(path, dtype=np.dtype(spec['dtype']), mode='r', offset=data_start + spec['offset'], shape=tuple(spec['shape']))
+		for name, spec in header['arrays'].items()
+	}
+	return header, arrays
+
+
+# Writes the graph's node values and the shortest-path search from every kernel node:
+#   values (nodes x 2, int64) and arity (nodes, uint8): the tuple of every node, padded with 0;
+#   predecessor, predecessor_op, distance (kernel x nodes): see reachability.multi_source_bfs().
+def write_database(path, graph, reachability):
+	arity = np.array([len(items) for items in graph.items], dtype=np.uint8)
+	values = np.zeros((len(graph), 2), dtype=np.int64)
+	for i, items in enumerate(graph.items):
+		values[i, :len(items)] = items # Raises OverflowError rather than storing a value that does not fit.
+	arrays = {
+		'values': values,
+		'arity': arity,
+		'predecessor': reachability.predecessor,
+		'predecessor_op': reachability.predecessor_op,
+		'distance': reachability.distance,
+	}
+	header = {'op_names': graph.op_names, 'kernel': [list(graph.items[source]) for source in reachability.sources]}
+	write_arrays(path, 'database', header, arrays)
+
+
+
+class Database:
+	''' Opens a database file by reading only its header; the arrays are memory-mapped, and a query reads the rows of its two kernel nodes.'''
+	def __init__(self, path='database'):
+		header, self.arrays = read_arrays(path, 'database')
+		self.op_names = header['op_names']
+		self.kernel_row = {tuple(items): row for row, items in enumerate(header['kernel'])}
+
+
+	# Tuple of values of a node id.
+	def items(self, node):
+		return tuple(int(value) for value in self.arrays['values'][node, :self.arrays['arity'][node]])
+
+
+	# Search results of a kernel pair: predecessor and op code lists (copied out of the file, which makes walking them fast) and the distance array.
+	def row(self, pair):
+		row = self.kernel_row[pair]
+		return self.arrays['predecessor'][row].tolist(), self.arrays['predecessor_op'][row].tolist(), self.arrays['distance'][row]
+
+
+	# List of operations of a shortest path from a kernel pair to a node id, or None if it cannot be reached.
+	def path(self, pair, node, row=None):
+		predecessor, predecessor_op, distance = row or self.row(pair)
+		if distance[node] < 0:
+			return None
+		oplist = list()
+		while predecessor[node] >= 0:
+			oplist.append(self.op_names[predecessor_op[node]])
+			node = predecessor[node]
+		oplist.reverse()
+		return oplist
+
+
+	# Ids of the nodes reachable from a kernel pair.
+	def endnodes(self, pair):
+		return np.flatnonzero(self.arrays['distance'][self.kernel_row[pair]] >= 0)
+
+
+	# Single numbers reachable from both pairs, smallest first, each with the operations that reach it from the left and from the right.
+	def solutions(self, left, right):
+		left_row, right_row = self.row(left), self.row(right)
+		common = np.flatnonzero((left_row[2] >= 0) & (right_row[2] >= 0) & (self.arrays['arity'] == 1))
+		values = self.arrays['values'][common, 0].tolist()
+		found = [(value, self.path(left, node, left_row), self.path(right, node, right_row)) for value, node in zip(values, common.tolist())]
+		return sorted(found, key=lambda solution: solution[0])
@@ -0,0 +1,134 @@
+''' Este arquivo gera o grafo de operações do Emplaka para outras regras do jogo (tamanho da placa, dígitos, operações e limites dos valores),
+expandindo apenas os nódulos novos de cada nível, em vários processos.
+
+Uso:
+	python generator.py --plate-length 6 --digits 0-5 --jobs 4'''
+
+import argparse, itertools, os, time
+from concurrent.futures import ProcessPoolExecutor
+from operations import Registry, position_name
+from operation_graph import OperationGraph
+
+
+
+class Problem:
+	''' Rules of an Emplaka game: plates of plate_length digits taken from digits, split into a left and a right half; the operations allowed
+	(names of Node.unary_ops and Node.binary_ops, all of them by default); and the bounds of operations.Registry. The defaults are the original game.
+	registry counts the operations evaluated and pruned by the last generate().'''
+	def __init__(self, plate_length=4, digits=range(0, 10), unary_ops=None, binary_ops=None, operand_bound=9, value_bound=None):
+		if plate_length < 2 or plate_length % 2 != 0:
+			raise ValueError(f"Plates must have an even number of digits, not {plate_length}.")
+		self.plate_length = plate_length
+		self.digits = list(digits)
+		self.registry = Registry(unary_ops, binary_ops, operand_bound, value_bound)
+		self.unary_ops = self.registry.unary_ops
+		self.binary_ops = self.registry.binary_ops
+		self.operand_bound = operand_bound
+		self.value_bound = value_bound
+
+		# Every name Registry.apply() can give an operation on tuples of up to plate_length // 2 items, in a fixed order; for 4-digit plates
+		# these are the op names of OperationGraph.generate().
+		half = plate_length // 2
+		self.op_names = self.unary_ops + self.binary_ops
+		if half > 2:
+			self.op_names += [position_name(op, i, half) for i in range(half - 1) for op in self.binary_ops]
+		if len(self.op_names) > 127:
+			raise ValueError(f"{len(self.op_names)} operations do not fit the int8 op codes of OperationGraph.")
+		self.op_code = {op: code for code, op in enumerate(self.op_names)}
+
+
+	def __str__(self):
+		return f"{self.plate_length} digits from {self.digits[0]}-{self.digits[-1]}, {len(self.unary_ops)}+{len(self.binary_ops)} operations, operands <= {self.operand_bound}" \
+			+ (f", values <= {self.value_bound}" if self.value_bound is not None else "")
+
+
+	# Tuples of the digits of half a plate, in the order of their ids (for 4-digit plates, (0,0) to (9,9)).
+	def kernel(self):
+		return list(itertools.product(self.digits, repeat=self.plate_length // 2))
+
+
+	# (op code, result) pairs of the operations that apply to a tuple of items.
+	def operations(self, items):
+		return [(self.op_code[op], result) for op, result in self.registry.apply(items)]
+
+
+
+# Each worker process keeps the Problem it was started with, so that tasks only carry the tuples to expand. Workers send back, with each chunk, the
+# operation counts of their registry, which generate() adds to the Problem's.
+_problem = None
+
+
+def _start_worker(problem):
+	global _problem
+	_problem = problem
+
+
+def _expand(chunk):
+	return [_problem.operations(items) for items in chunk], _problem.registry.take_counts()
+
+
+# Generates the OperationGraph of a Problem (the original game by default) one level at a time. Each level's frontier is the nodes found by the previous
+# level, so filled nodes are never visited again; it is cut into chunks of chunk_size tuples that n_jobs processes expand (n_jobs=None uses every CPU,
+# n_jobs=1 runs in this process). Only the expansion is parallel: this process assigns ids and edges as the chunks come back, in order, so nodes get the
+# same ids as OperationGraph.generate() gives them.
+def generate(problem=None, n_jobs=1, chunk_size=2000):
+	problem = problem if problem is not None else Problem()
+	n_jobs = n_jobs or os.cpu_count()
+	items = problem.kernel()
+	ids = {values: i for i, values in enumerate(items)}
+	offsets, targets, op_codes = [0], list(), list()
+	problem.registry.reset_counts()
+
+	executor = ProcessPoolExecutor(n_jobs, initializer=_start_worker, initargs=(problem,)) if n_jobs > 1 else None
+	if executor is None:
+		_start_worker(problem)
+	try:
+		start = 0
+		while start < len(items):
+			end = len(items)
+			chunks = [items[i:min(i + chunk_size, end)] for i in range(start, end, chunk_size)]
+			expanded = executor.map(_expand, chunks) if executor is not None else map(_expand, chunks)
+			v = start
+			for chunk, counts in expanded:
+				problem.registry.add_counts(counts)
+				for results in chunk:
+					link = dict() # Like Node.link: one operation per target, the last one found
+					for code, result in results:
+						w = ids.get(result)
+						if w is None:
+							w = ids[result] = len(items)
+							items.append(result)
+						if w != v:
+							link[w] = code
+					targets.extend(link.keys())
+					op_codes.extend(link.values())
+					offsets.append(len(targets))
+					v += 1
+			start = end
+	finally:
+		if executor is not None:
+			executor.shutdown()
+	return OperationGraph(items, offsets, targets, op_codes, problem.op_names)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Gera o grafo de operações do Emplaka para outras regras do jogo.")
+	parser.add_argument('--plate-length', type=int, default=4)
+	parser.add_argument('--digits', default='0-9', help="Intervalo de dígitos, como 0-9.")
+	parser.add_argument('--unary-ops', nargs='*', help="Operações unárias permitidas (todas, se omitido).")
+	parser.add_argument('--binary-ops', nargs='*', help="Operações binárias permitidas (todas, se omitido).")
+	parser.add_argument('--operand-bound', type=int, default=9)
+	parser.add_argument('--value-bound', type=int)
+	parser.add_argument('--jobs', type=int, default=1, help="Processos (0 para todos os processadores).")
+	args = parser.parse_args()
+
+	low, high = (int(digit) for digit in args.digits.split('-'))
+	problem = Problem(args.plate_length, range(low, high + 1), args.unary_ops, args.binary_ops, args.operand_bound, args.value_bound)
+	start = time.perf_counter()
+	graph = generate(problem, n_jobs=args.jobs or None)
+	print(f"{problem}: {len(problem.kernel())} kernel nodes, {len(graph)} nodes, {len(graph.targets)} operations, {time.perf_counter() - start:.2f} s")
+	print(", ".join(f"{count} {name}" for name, count in problem.registry.summary().items()) + " operations")
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,155 @@
+''' Este arquivo define uma representação compacta da árvore do Emplaka: cada n-ordenada recebe um id inteiro e as operações ficam em arrays CSR.'''
+
+import numpy as np
+from tree_ADT import Node
+
+
+class OperationGraph:
+	''' The operation tree as arrays. items[i] is the tuple of node i; the edges leaving node i are targets[offsets[i]:offsets[i+1]], reached through the
+	operations op_names[op_codes[...]]. Node i's edges are what Node.fill() would put in its link, without the link to itself. '''
+	def __init__(self, items, offsets, targets, op_codes, op_names):
+		self.items = list(items)
+		self.id = {values: i for i, values in enumerate(self.items)}
+		self.offsets = np.asarray(offsets, dtype=np.int64)
+		self.targets = np.asarray(targets, dtype=np.int32)
+		self.op_codes = np.asarray(op_codes, dtype=np.int8)
+		self.op_names = list(op_names)
+
+
+	# Generates the whole graph from the kernel (by default (0,0) to (9,9), which get ids 0 to 99) without creating Nodes.
+	# Nodes are expanded once each, in id order, so each node's edges are appended right after the previous node's.
+	@classmethod
+	def generate(cls, kernel=None):
+		op_names = list(Node.unary_ops) + list(Node.binary_ops)
+		op_code = {op: code for code, op in enumerate(op_names)}
+		items = list(kernel) if kernel is not None else [(i, j) for i in range(0, 10) for j in range(0, 10)]
+		ids = {values: i for i, values in enumerate(items)}
+		offsets, targets, op_codes = [0], list(), list()
+		v = 0
+		while v < len(items):
+			link = dict() # Like Node.link: one operation per target, the last one found
+			for op, result in Node.operations(items[v]):
+				w = ids.get(result)
+				if w is None:
+					w = ids[result] = len(items)
+					items.append(result)
+				if w != v:
+					link[w] = op_code[op]
+			targets.extend(link.keys())
+			op_codes.extend(link.values())
+			offsets.append(len(targets))
+			v += 1
+		return cls(items, offsets, targets, op_codes, op_names)
+
+
+	# Converts a tree of Nodes (filled with Tree.expand()) into the compact form, keeping the single-operation links as edges.
+	@classmethod
+	def from_tree(cls, tree):
+		nodes = sorted(tree.nodes, key=lambda node: (len(node.items), node.items)) # A fixed order makes ids and tie-breaks reproducible.
+		ids = {node: i for i, node in enumerate(nodes)}
+		op_names, op_code = list(), dict()
+		offsets, targets, op_codes = [0], list(), list()
+		for node in nodes:
+			for target, oplist in node.link.items():
+				if len(oplist) == 1 and target is not node: # Longer lists are paths stored by an earlier search, not edges.
+					if oplist[0] not in op_code:
+						op_code[oplist[0]] = len(op_names)
+						op_names.append(oplist[0])
+					targets.append(ids[target])
+					op_codes.append(op_code[oplist[0]])
+			offsets.append(len(targets))
+		return cls([node.items for node in nodes], offsets, targets, op_codes, op_names)
+
+
+	def __len__(self):
+		return len(self.items)
+
+
+	# Edges as Python lists of (target, op code) per node, the fastest form to walk in a Python loop.
+	def adjacency(self):
+		targets, op_codes, offsets = self.targets.tolist(), self.op_codes.tolist(), self.offsets.tolist()
+		return [list(zip(targets[offsets[i]:offsets[i + 1]], op_codes[offsets[i]:offsets[i + 1]])) for i in range(len(self.items))]
+
+
+	# Read-only view with the Tree API.
+	def tree(self):
+		return GraphTree(self)
+
+
+
+class GraphNode:
+	''' Read-only view of one node of an OperationGraph with the attributes of tree_ADT.Node, computed from the arrays when asked for.'''
+	__slots__ = ('graph', 'id')
+	filled = True
+
+	def __init__(self, graph, id):
+		self.graph = graph
+		self.id = id
+
+
+	@property
+	def items(self):
+		return self.graph.items[self.id]
+
+
+	@property
+	def tree(self):
+		return GraphTree(self.graph)
+
+
+	@property
+	def link(self):
+		graph = self.graph
+		start, end = graph.offsets[self.id], graph.offsets[self.id + 1]
+		link = {self: list()}
+		for target, code in zip(graph.targets[start:end].tolist(), graph.op_codes[start:end].tolist()):
+			link[GraphNode(graph, target)] = [graph.op_names[code]]
+		return link
+
+
+	def __eq__(self, other):
+		return isinstance(other, GraphNode) and other.graph is self.graph and other.id == self.id
+
+
+	def __hash__(self):
+		return hash(self.id)
+
+
+	def __str__(self):
+		return str(self.items)
+
+
+	# Every reachable node with the fewest operations that reach it; the view is read-only, so unlike Node.get_endnodes() nothing is stored.
+	def get_endnodes(self):
+		from reachability import Reachability
+		return Reachability(self.graph, [self.id]).endnodes(self)
+
+
+	paths = Node.paths
+
+
+
+class GraphTree:
+	''' Read-only view of an OperationGraph with the lookups of tree_ADT.Tree.'''
+	__slots__ = ('graph',)
+
+	def __init__(self, graph):
+		self.graph = graph
+
+
+	@property
+	def nodes(self):
+		return {GraphNode(self.graph, i) for i in range(len(self.graph))}
+
+
+	def __contains__(self, items):
+		return items in self.graph.id
+
+
+	def has_node(self, items=tuple()):
+		return items in self.graph.id
+
+
+	# Unlike Tree.get_node(), unknown items raise KeyError: a read-only view has nowhere to put a new empty Node.
+	def get_node(self, items=tuple()):
+		return GraphNode(self.graph, self.graph.id[items])
@@ -0,0 +1,241 @@
+''' Este arquivo define o registro das operações do Emplaka: cada operação declara seu domínio e quais operandos são limitados, e um Registry monta
+essas condições uma única vez para os limites escolhidos, aplica as operações (com tabelas para entradas pequenas) e conta as avaliadas e as podadas.'''
+
+from functools import lru_cache
+from math import factorial, isqrt
+
+
+# Lookup tables for small inputs, built once. Results match math.isqrt() and math.factorial() exactly; larger inputs are computed.
+TABLE_SIZE = 4096
+ISQRT_FLOOR = [isqrt(x) for x in range(TABLE_SIZE)]
+ISQRT_CEIL = [r + (r * r != x) for x, r in enumerate(ISQRT_FLOOR)]
+SMALL_OPERANDS = 21
+FACTORIALS = [factorial(n) for n in range(SMALL_OPERANDS)]
+POWERS = [[x ** y for y in range(SMALL_OPERANDS)] for x in range(SMALL_OPERANDS)]
+
+
+def sqrt_floor(x):
+	return ISQRT_FLOOR[x] if x < TABLE_SIZE else isqrt(x)
+
+
+def sqrt_ceil(x):
+	if x < TABLE_SIZE:
+		return ISQRT_CEIL[x]
+	r = isqrt(x)
+	return r + (r * r != x)
+
+
+def fact(x):
+	return FACTORIALS[x] if x < SMALL_OPERANDS else factorial(x)
+
+
+def power(x, y):
+	return POWERS[x][y] if 0 <= x < SMALL_OPERANDS and y < SMALL_OPERANDS else x ** y
+
+
+def div_ceil(x, y):
+	return -(-x // y) # Exact, unlike ceil(x / y), which goes through a float.
+
+
+
+class Operation:
+	''' One operation of the game: its name, its arity (1 for numbers, 2 for pairs) and its function, which returns the resulting tuple.
+	nonnegative and nonzero list the operands (0 for x, 1 for y) outside of whose domain it is invalid; bounded lists those that may not exceed the
+	operand bound, because the result would grow too fast.'''
+	__slots__ = ('name', 'arity', 'function', 'nonnegative', 'nonzero', 'bounded')
+
+	def __init__(self, name, arity, function, nonnegative=(), nonzero=(), bounded=()):
+		self.name = name
+		self.arity = arity
+		self.function = function
+		self.nonnegative = nonnegative
+		self.nonzero = nonzero
+		self.bounded = bounded
+
+
+	# Predicate on the operands, built once from closures: the domain conditions, plus the bound conditions unless operand_bound is None.
+	def predicate(self, operand_bound=None):
+		checks = [operand_check(0 if i in self.nonnegative else None, operand_bound if i in self.bounded else None, i in self.nonzero)
+			for i in range(self.arity)]
+		if self.arity == 1:
+			check = checks[0]
+			return check if check is not None else lambda x: True
+		check_x, check_y = checks
+		if check_x is None and check_y is None:
+			return lambda x, y: True
+		if check_x is None:
+			return lambda x, y: check_y(y)
+		if check_y is None:
+			return lambda x, y: check_x(x)
+		return lambda x, y: check_x(x) and check_y(y)
+
+
+
+# Check of one operand: low <= v <= high (None for no limit on that side) and v != 0 if nonzero; None when there is nothing to check.
+def operand_check(low, high, nonzero):
+	if nonzero:
+		check = operand_check(low, high, False)
+		return (lambda v: v != 0) if check is None else (lambda v: v != 0 and check(v))
+	if low is None and high is None:
+		return None
+	if high is None:
+		return lambda v: v >= low
+	if low is None:
+		return lambda v: v <= high
+	return lambda v: low <= v <= high
+
+
+# Every operation, in the order of Node.unary_ops and Node.binary_ops.
+OPERATIONS = [
+	Operation('unary √floor', 1, lambda x: (sqrt_floor(x),), nonnegative=(0,)),
+	Operation('unary √ceil', 1, lambda x: (sqrt_ceil(x),), nonnegative=(0,)),
+	Operation('unary !', 1, lambda x: (fact(x),), nonnegative=(0,), bounded=(0,)),
+	Operation('abs', 1, lambda x: (abs(x),)),
+	Operation('+', 2, lambda x, y: (x + y,)),
+	Operation('-', 2, lambda x, y: (x - y,)),
+	Operation('*', 2, lambda x, y: (x * y,)),
+	Operation('/floor', 2, lambda x, y: (x // y,), nonzero=(1,)),
+	Operation('/ceil', 2, lambda x, y: (div_ceil(x, y),), nonzero=(1,)),
+	Operation('^', 2, lambda x, y: (power(x, y),), nonnegative=(1,), bounded=(0, 1)), # Negative exponents would give fractions.
+	Operation('binary ! (left)', 2, lambda x, y: (fact(x), y), nonnegative=(0,), bounded=(0,)),
+	Operation('binary ! (right)', 2, lambda x, y: (x, fact(y)), nonnegative=(1,), bounded=(1,)),
+	Operation('binary √floor (left)', 2, lambda x, y: (sqrt_floor(x), y), nonnegative=(0,)),
+	Operation('binary √ceil (left)', 2, lambda x, y: (sqrt_ceil(x), y), nonnegative=(0,)),
+	Operation('binary √floor (right)', 2, lambda x, y: (x, sqrt_floor(y)), nonnegative=(1,)),
+	Operation('binary √ceil (right)', 2, lambda x, y: (x, sqrt_ceil(y)), nonnegative=(1,)),
+]
+BY_NAME = {op.name: op for op in OPERATIONS}
+
+
+# Name of a binary operation applied to items i and i+1 of a tuple of the given length: its plain name for pairs, with the positions otherwise.
+def position_name(op, i, length):
+	if length == 2:
+		return op
+	return f"{op} (items {i + 1} and {i + 2})"
+
+
+
+class Registry:
+	''' The operations of one version of the game (names of OPERATIONS; all of them by default), with their predicates built for its bounds:
+	operands of '^' and '!' may not exceed operand_bound (None for no limit), and results holding a number whose absolute value exceeds value_bound
+	(if given) are pruned. counts() tells, per operation name, how many were evaluated, rejected by their domain (invalid) and rejected by a bound
+	(pruned).'''
+	def __init__(self, unary_ops=None, binary_ops=None, operand_bound=9, value_bound=None):
+		self.settings = (unary_ops, binary_ops, operand_bound, value_bound)
+		unary_ops = [op.name for op in OPERATIONS if op.arity == 1] if unary_ops is None else list(unary_ops)
+		binary_ops = [op.name for op in OPERATIONS if op.arity == 2] if binary_ops is None else list(binary_ops)
+		unknown = [name for name in unary_ops if name not in BY_NAME or BY_NAME[name].arity != 1]
+		unknown += [name for name in binary_ops if name not in BY_NAME or BY_NAME[name].arity != 2]
+		if unknown:
+			raise ValueError(f"Unknown operations: {unknown}")
+		self.unary_ops, self.binary_ops = unary_ops, binary_ops
+		self.operand_bound, self.value_bound = operand_bound, value_bound
+		self.unary = [self.compile(BY_NAME[name]) for name in unary_ops]
+		self.binary = [self.compile(BY_NAME[name]) for name in binary_ops]
+		self.names = dict() # Names of the binary operations at each position, per tuple length.
+		self.reset_counts()
+
+
+	# (name, function, allowed, domain): allowed checks the domain and the operand bound, domain only the domain, to tell why an operation was skipped.
+	# Operations that are always valid get None instead of predicates, which saves a call.
+	def compile(self, op):
+		if not (op.nonnegative or op.nonzero or op.bounded):
+			return op.name, op.function, None, None
+		return op.name, op.function, op.predicate(self.operand_bound), op.predicate()
+
+
+	# Rebuilt from its settings when sent to another process, since the predicate closures cannot be pickled.
+	def __reduce__(self):
+		return Registry, self.settings
+
+
+	# Only skipped operations are counted one by one: every operation is tried once per number (unary) or per pair of neighbours (binary), so the
+	# evaluated ones follow from the number of tries.
+	def reset_counts(self):
+		self.tried = [0, 0] # Numbers tried with the unary operations, pairs of neighbouring items tried with the binary ones.
+		self.invalid = dict.fromkeys(self.unary_ops + self.binary_ops, 0)
+		self.too_big = dict.fromkeys(self.unary_ops + self.binary_ops, 0) # Operand over operand_bound; not evaluated.
+		self.out_of_bounds = dict.fromkeys(self.unary_ops + self.binary_ops, 0) # Result over value_bound; evaluated, then dropped.
+
+
+	# Returns the raw counts and starts new ones; add_counts() merges raw counts taken in another process.
+	def take_counts(self):
+		counts = (self.tried, self.invalid, self.too_big, self.out_of_bounds)
+		self.reset_counts()
+		return counts
+
+
+	def add_counts(self, counts):
+		tried, *parts = counts
+		self.tried = [total + part for total, part in zip(self.tried, tried)]
+		for total, part in zip((self.invalid, self.too_big, self.out_of_bounds), parts):
+			for name, count in part.items():
+				total[name] += count
+
+
+	# {'evaluated': {name: count}, 'invalid': {...}, 'pruned': {...}} since the last reset_counts().
+	def counts(self):
+		tries = {name: self.tried[0] for name in self.unary_ops} | {name: self.tried[1] for name in self.binary_ops}
+		return {
+			'evaluated': {name: tries[name] - self.invalid[name] - self.too_big[name] for name in tries},
+			'invalid': dict(self.invalid),
+			'pruned': {name: self.too_big[name] + self.out_of_bounds[name] for name in tries},
+		}
+
+
+	# Totals of counts() over all operations.
+	def summary(self):
+		return {kind: sum(counts.values()) for kind, counts in self.counts().items()}
+
+
+	# (operation, result) pairs of the operations that apply to a tuple of items. Tuples longer than 2 take the binary operations on every pair of
+	# neighbouring items.
+	def apply(self, items):
+		results = list()
+		bound = self.value_bound
+
+		if len(items) == 1:
+			self.tried[0] += 1
+			x = items[0]
+			for name, function, allowed, domain in self.unary:
+				if allowed is None or allowed(x):
+					result = function(x)
+					if bound is None or -bound <= result[0] <= bound:
+						results.append((name, result))
+					else:
+						self.out_of_bounds[name] += 1
+				elif domain(x):
+					self.too_big[name] += 1
+				else:
+					self.invalid[name] += 1
+
+		elif len(items) >= 2:
+			length = len(items)
+			self.tried[1] += length - 1
+			if length not in self.names:
+				self.names[length] = [[position_name(name, i, length) for name in self.binary_ops] for i in range(length - 1)]
+			for i, names in enumerate(self.names[length]):
+				x = items[i]
+				y = items[i + 1]
+				for (name, function, allowed, domain), full_name in zip(self.binary, names):
+					if allowed is None or allowed(x, y):
+						result = function(x, y)
+						if bound is not None and not (-bound <= min(result) and max(result) <= bound):
+							self.out_of_bounds[name] += 1
+						elif length == 2:
+							results.append((full_name, result))
+						else:
+							results.append((full_name, items[:i] + result + items[i+2:]))
+					elif domain(x, y):
+						self.too_big[name] += 1
+					else:
+						self.invalid[name] += 1
+
+		return results
+
+
+
+# Registries shared by the calls of Node.operations() with the same operations and bounds; op lists must be given as tuples.
+@lru_cache(maxsize=None)
+def registry(unary_ops=None, binary_ops=None, operand_bound=9, value_bound=None):
+	return Registry(unary_ops, binary_ops, operand_bound, value_bound)
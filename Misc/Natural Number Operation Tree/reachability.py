@@ -0,0 +1,85 @@
+''' Este arquivo calcula, por busca em largura, os caminhos mais curtos de operações entre os nódulos de uma árvore do Emplaka.'''
+
+import numpy as np
+from operation_graph import OperationGraph, GraphNode
+
+
+# Breadth-first search from many sources at once. Every node keeps a bitmask of the sources that have already reached it, so one pass over a node's edges
+# advances all the sources in its frontier together instead of once per source. Returns three (sources x nodes) arrays: the predecessor id and the op code
+# of the last step of a shortest path, and the number of operations on it (-1 where the node is unreachable).
+def multi_source_bfs(adjacency, sources):
+	n = len(adjacency)
+	predecessor = np.full((len(sources), n), -1, dtype=np.int32)
+	predecessor_op = np.full((len(sources), n), -1, dtype=np.int16)
+	distance = np.full((len(sources), n), -1, dtype=np.int16)
+	seen = [0] * n
+	frontier = dict()
+	for s, v in enumerate(sources):
+		seen[v] |= 1 << s
+		frontier[v] = frontier.get(v, 0) | 1 << s
+		distance[s, v] = 0
+
+	level = 0
+	while frontier:
+		level += 1
+		next_frontier = dict()
+		for v, mask in frontier.items():
+			for w, op in adjacency[v]:
+				new = mask & ~seen[w] # Sources that reach w for the first time, through v
+				if new:
+					seen[w] |= new
+					next_frontier[w] = next_frontier.get(w, 0) | new
+					while new:
+						lowest = new & -new
+						s = lowest.bit_length() - 1
+						predecessor[s, w], predecessor_op[s, w], distance[s, w] = v, op, level
+						new ^= lowest
+		frontier = next_frontier
+	return predecessor, predecessor_op, distance
+
+
+class Reachability:
+	''' Shortest operation sequences from a set of source nodes (by default the kernel, (0,0) to (9,9)) to every node they can reach.
+	Works on an operation_graph.OperationGraph, or on a Tree of Nodes, which is converted first; sources and results are nodes of the same kind.'''
+	def __init__(self, graph, sources=None):
+		if isinstance(graph, OperationGraph):
+			self.node = lambda i: GraphNode(graph, i)
+		else:
+			tree = graph
+			graph = OperationGraph.from_tree(tree)
+			self.node = lambda i: tree.index[graph.items[i]]
+		self.graph = graph
+		if sources is None:
+			sources = [graph.id[(i, j)] for i in range(0, 10) for j in range(0, 10)]
+		self.sources = [source if isinstance(source, int) else graph.id[source.items] for source in sources]
+		self.source_row = {source: s for s, source in enumerate(self.sources)}
+		self.predecessor, self.predecessor_op, self.distance = multi_source_bfs(graph.adjacency(), self.sources)
+
+
+	# Row of the search arrays that belongs to a source node.
+	def row(self, source):
+		return self.source_row[self.graph.id[source.items]]
+
+
+	# Nodes reachable from source (including itself).
+	def reachable(self, source):
+		return [self.node(i) for i in np.flatnonzero(self.distance[self.row(source)] >= 0)]
+
+
+	# List of operations of a shortest path from source to target, or None if target cannot be reached.
+	def path(self, source, target):
+		s = self.row(source)
+		v = self.graph.id[target.items]
+		if self.distance[s, v] < 0:
+			return None
+		oplist = list()
+		while self.predecessor[s, v] >= 0:
+			oplist.append(self.graph.op_names[self.predecessor_op[s, v]])
+			v = self.predecessor[s, v]
+		oplist.reverse()
+		return oplist
+
+
+	# Same format as Node.link after Node.get_endnodes(): every reachable Node mapped to the operations that reach it.
+	def endnodes(self, source):
+		return {node: self.path(source, node) for node in self.reachable(source)}
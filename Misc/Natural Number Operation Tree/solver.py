@@ -0,0 +1,123 @@
+''' Este arquivo pré-calcula as soluções de todas as 10.000 placas do Emplaka e as responde sem interação, por linha de comando ou como biblioteca.
+
+Uso:
+	python solver.py --build              (cria o índice "solutions" a partir de "database")
+	python solver.py 3478 1234 --paths    (responde placas)'''
+
+import argparse
+import numpy as np
+from database import Database, read_arrays, write_arrays
+
+
+# Bitsets of the single numbers each kernel pair reaches. Bit b stands for the number with the b-th smallest value; returns the packed (kernel x bytes) array
+# and the node id behind each bit.
+def reachable_bitsets(database):
+	unary = np.flatnonzero(np.asarray(database.arrays['arity']) == 1)
+	unary = unary[np.argsort(np.asarray(database.arrays['values'])[unary, 0], kind='stable')]
+	reached = np.asarray(database.arrays['distance'])[:, unary] >= 0
+	return np.packbits(reached, axis=1), unary
+
+
+# The two kernel pairs of a plate number (0 to 9999).
+def plate_pairs(plate):
+	digits = f"{plate:04d}"
+	return (int(digits[0]), int(digits[1])), (int(digits[2]), int(digits[3]))
+
+
+# Solves all 10,000 plates at once: the bitsets of the left and right pairs of every plate are intersected in one vectorised AND, and the surviving bits,
+# already grouped by plate, become a CSR index (offsets per plate, then node ids). For each solution it also keeps the number of operations of the shortest
+# path from each side; the paths themselves stay in the database, where their predecessor arrays already hold them.
+def build_index(database, path='solutions'):
+	bitsets, unary = reachable_bitsets(database)
+	plates = np.arange(10000)
+	left_rows = np.array([database.kernel_row[plate_pairs(plate)[0]] for plate in plates])
+	right_rows = np.array([database.kernel_row[plate_pairs(plate)[1]] for plate in plates])
+	common = np.unpackbits(bitsets[left_rows] & bitsets[right_rows], axis=1, count=len(unary)).astype(bool)
+	plate_of, bit = np.nonzero(common) # Row-major, so grouped by plate and sorted by value within each plate.
+	nodes = unary[bit]
+	distance = np.asarray(database.arrays['distance'])
+	arrays = {
+		'offsets': np.concatenate([[0], np.cumsum(np.bincount(plate_of, minlength=10000))]).astype(np.int64),
+		'nodes': nodes.astype(np.int32),
+		'values': np.asarray(database.arrays['values'])[nodes, 0],
+		'left_operations': distance[left_rows[plate_of], nodes],
+		'right_operations': distance[right_rows[plate_of], nodes],
+	}
+	write_arrays(path, 'solution index', {}, arrays)
+
+
+
+class SolutionIndex:
+	''' Answers plates from the index written by build_index(). values() only slices the index; solutions() also rebuilds the operation lists from the database.'''
+	def __init__(self, path='solutions', database='database'):
+		_, self.arrays = read_arrays(path, 'solution index')
+		self.offsets = self.arrays['offsets'].tolist() # 80 kB; every query needs two of them.
+		self.database_path = database
+		self.database = None
+		self.rows = dict() # Search rows of the kernel pairs already asked for; there are at most 100.
+
+
+	def span(self, plate):
+		plate = int(plate)
+		if not 0 <= plate <= 9999:
+			raise ValueError(f"Plate {plate} does not have 4 digits.")
+		return self.offsets[plate], self.offsets[plate + 1]
+
+
+	# Solutions of a plate, smallest first.
+	def values(self, plate):
+		start, end = self.span(plate)
+		return self.arrays['values'][start:end].tolist()
+
+
+	def row(self, pair):
+		if self.database is None:
+			self.database = Database(self.database_path)
+		if pair not in self.rows:
+			self.rows[pair] = self.database.row(pair)
+		return self.rows[pair]
+
+
+	# Solutions of a plate, smallest first, as (value, operations from the left, operations from the right), each side as short as possible.
+	def solutions(self, plate):
+		left, right = plate_pairs(int(plate))
+		left_row, right_row = self.row(left), self.row(right)
+		start, end = self.span(plate)
+		values, nodes = self.arrays['values'][start:end].tolist(), self.arrays['nodes'][start:end].tolist()
+		return [(value, self.database.path(left, node, left_row), self.database.path(right, node, right_row)) for value, node in zip(values, nodes)]
+
+
+	# Solutions of a plate with the fewest operations in all (left plus right).
+	def shortest(self, plate):
+		start, end = self.span(plate)
+		total = self.arrays['left_operations'][start:end].astype(np.int32) + self.arrays['right_operations'][start:end]
+		if len(total) == 0:
+			return list()
+		return self.arrays['values'][start:end][total == total.min()].tolist()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Soluções das placas do Emplaka, sem interação.")
+	parser.add_argument('plates', nargs='*', help="Placas de 4 dígitos.")
+	parser.add_argument('--build', action='store_true', help="Cria o índice de soluções a partir do banco de dados.")
+	parser.add_argument('--paths', action='store_true', help="Mostra as operações de cada solução.")
+	parser.add_argument('--index', default='solutions')
+	parser.add_argument('--database', default='database')
+	args = parser.parse_args()
+
+	if args.build:
+		build_index(Database(args.database), args.index)
+	index = SolutionIndex(args.index, args.database)
+	for placa in args.plates:
+		if len(placa) != 4 or not placa.isdigit():
+			parser.error(f"Placa inválida: {placa}")
+		if args.paths:
+			print(f"{placa}:")
+			for value, left_path, right_path in index.solutions(placa):
+				print(f"\t{value}: {', '.join(left_path)}  |  {', '.join(right_path)}")
+		else:
+			print(f"{placa}: {' '.join(str(value) for value in index.values(placa))}")
+
+
+if __name__ == '__main__':
+	main()
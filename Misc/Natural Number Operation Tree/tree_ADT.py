@@ -1,19 +1,20 @@
 ''' Este arquivo define as duas classes usadas no programa Emplaka: "Tree" e "Node".'''
 
-import sys, pickle
+import pickle
 from copy import deepcopy
-from math import factorial as fact
-from math import sqrt, floor, ceil
-
-# Permite que a função recursiva Node.get_endnodes() faça o seu trabalho até o fim.
-sys.setrecursionlimit(10000)
+from operations import OPERATIONS, registry, position_name
 
 
 class Tree:
 	''' Armazena os nódulos.'''
-	def __init__(self, nodes=set()):
+	__slots__ = ('kernel', 'nodes', 'index')
+
+	def __init__(self, nodes=None):
 		self.kernel = set()  # The kernel comprises only the nodes from (0,0) to (9,9).
-		self.nodes = nodes
+		self.nodes = set()
+		self.index = dict()  # Maps each Node.items to its Node, so that has_node() and get_node() take constant time instead of scanning self.nodes.
+		for node in (nodes or set()):
+			self.add(node)
 
 
 	# Cria os 100 nódulos básicos, de (0,0) a (9,9).
@@ -31,28 +32,38 @@ class Tree:
 				node.fill(self)
 
 
+	# Registers a Node in the tree and in its index; called by Node.__init__().
+	def add(self, node):
+		self.nodes.add(node)
+		self.index[node.items] = node
+
+
+	def __contains__(self, items):
+		return items in self.index
+
+
 	def has_node(self, items=tuple()):
-		for node in self.nodes:
-			if node.items == items:
-				return True
-		return False
+		return items in self.index
 
 
 	# Nódulos são individuado por sua n-ordenada no atributo Node.items.
+	# Unknown items give an empty Node that belongs to a tree of its own, as before, without adding it to this tree.
 	def get_node(self, items=tuple()):
-		for node in self.nodes:
-			if node.items == items:
-				return node
-		return Node()
+		node = self.index.get(items)
+		if node is None:
+			return Node(tree=Tree())
+		return node
 
 
 
 class Node:
+	__slots__ = ('items', 'tree', 'filled', 'link')  # No per-instance __dict__: each Node costs only these four references.
+
 	# Nodes are attached to trees (self.tree) and are automatically added to them upon creation (tree.nodes).
-	def __init__(self, items=tuple(), tree=Tree(), filled=False):
+	def __init__(self, items=tuple(), tree=None, filled=False):
 		self.items = items  # Nodes are individuated by their tuple self.items; see the Tree methods has_node() and get_node().
-		self.tree = tree  # Nodes are attached to a tree.
-		tree.nodes.add(self)  # Nodes are automatically added to their tree's node set upon creation.
+		self.tree = tree if tree is not None else Tree()  # Nodes are attached to a tree.
+		self.tree.add(self)  # Nodes are automatically added to their tree's node set and index upon creation.
 		self.filled = filled  # This informs whether the Node.fill() method has been applied to this node.
 		self.link = dict()  # This informs the shortest route to every reachable Node. The dictionary's keys are Nodes, their corresponding items are lists of operations needed to reach that key Node. This is determined by the Node.fill() method.
 
@@ -61,118 +72,50 @@ class Node:
 		return str(self.items)
 
 
-	unary_ops = {
-					'unary √floor': lambda x: (floor(sqrt(x)),),
-					'unary √ceil': lambda x: (ceil(sqrt(x)),),
-					'unary !': lambda x: (fact(x),),
-					'abs': lambda x: (abs(x),),
-				}
+	# Names and functions of the operations on numbers and on pairs; see operations.py, which also holds their validity conditions.
+	unary_ops = {op.name: op.function for op in OPERATIONS if op.arity == 1}
+	binary_ops = {op.name: op.function for op in OPERATIONS if op.arity == 2}
+
 
+	# Lists the (operation, result) pairs that can be applied to a tuple of items, skipping invalid operations and those whose result would be too big.
+	# Node.fill() links a Node to the results; operation_graph.py and generator.py use it directly on tuples, without creating Nodes.
+	# unary_ops and binary_ops choose the operations (names of Node.unary_ops and Node.binary_ops; all of them by default). '^' and '!' are skipped when an
+	# operand exceeds operand_bound, and results holding a number whose absolute value exceeds value_bound (if given) are dropped.
+	# Tuples longer than 2 (plates of more than 4 digits) take the binary operations on every pair of neighbouring items, named after their positions.
+	# The work is done by an operations.Registry shared by all calls with the same arguments, which also counts the operations evaluated and pruned.
+	@staticmethod
+	def operations(items, unary_ops=None, binary_ops=None, operand_bound=9, value_bound=None):
+		unary_ops = tuple(unary_ops) if unary_ops is not None else None
+		binary_ops = tuple(binary_ops) if binary_ops is not None else None
+		return registry(unary_ops, binary_ops, operand_bound, value_bound).apply(items)
 
-	binary_ops = {
-					'+': lambda x,y: (x+y,),
-					'-': lambda x,y: (x-y,),
-					'*': lambda x,y: (x*y,),
-					'/floor': lambda x,y: (x//y,),
-					'/ceil': lambda x,y: (ceil(x/y),),
-					'^': lambda x,y: (x**y,),
-					'binary ! (left)': lambda x,y: (fact(x), y),
-					'binary ! (right)': lambda x,y: (x, fact(y)),
-					'binary √floor (left)': lambda x, y: (floor(sqrt(x)), y),
-					'binary √ceil (left)': lambda x, y: (ceil(sqrt(x)), y),
-					'binary √floor (right)': lambda x, y: (x, floor(sqrt(y))),
-					'binary √ceil (right)': lambda x, y: (x, ceil(sqrt(y)))
-				}
+
+	position_name = staticmethod(position_name)
 
 
 	# Fills the node's Node.items attribute by performing arithmetic operations.
-	def fill(self, tree=Tree()):
+	def fill(self, tree=None):
 		if self.filled == True:
 			return
+		if tree is None:
+			tree = self.tree
 		self.filled = True
 		self.link[self] = list() # No operations are needed to reach oneself.
 
-		# If the Node is unary...
-		if len(self.items) == 1:
-			x = self.items[0]
-
-			for op, function in Node.unary_ops.items(): # Loops through operation/lambda-function pairs in Node.unary_ops (defined above).
-				invalid_op = False
-				too_big = False
-				if (op == 'unary √floor' or op == 'unary √ceil') and x < 0:
-					invalid_op = True
-				if op == 'unary !' and x < 0:
-					invalid_op = True
-				if op == 'unary !' and x > 9:
-					too_big = True
-
-				# If the operation is valid and the number is not too big for the operation...
-				if not invalid_op and not too_big:
-					result = function(x) # function() as defined in the for-loop heading.
-					if tree.has_node(result):
-						node = tree.get_node(result) # Avoids duplication, i.e., Nodes with the same Node.items attribute.
-					else:
-						node = Node(result) # If the Node was not already in the tree, a new Node is created.
-					self.link[node] = [op] # Adds the one operation needed to reach the newfound Node.
-
-		# If the Node is binary...
-		elif len(self.items) == 2:
-			x = self.items[0]
-			y = self.items[1]
-
-			for op, function in Node.binary_ops.items(): # Loops through operation/lambda-function pairs in Node.binary_ops (defined above).
-				invalid_op = False
-				too_big = False
-				if (op == '/floor' or op == '/ceil') and y == 0:
-					invalid_op = True
-				if (op == 'binary √floor (left)' or op == 'binary √ceil (left)') and x < 0:
-					invalid_op = True
-				if (op == 'binary √floor (right)' or op == 'binary √ceil (right)') and y < 0:
-					invalid_op = True
-				if op == '^' and (x > 9 or y > 9):
-					too_big = True
-				if op == 'binary ! (left)' and x > 9:
-					too_big = True
-				if op == 'binary ! (right)' and y > 9:
-					too_big = True
-
-				# If the operation is valid and the number is not too big for the operation...
-				if not invalid_op and not too_big:
-					result = function(x,y) # function() as defined in the for-loop heading.
-					if tree.has_node(result): # Avoids duplication, i.e., Nodes with the same Node.items attribute.
-						node = tree.get_node(result)
-					else:
-						node = Node(result) # If the Node was not already in the tree, a new Node is created.
-					self.link[node] = [op] # Adds the one operation needed to reach the newfound Node.
+		for op, result in Node.operations(self.items):
+			if tree.has_node(result):
+				node = tree.get_node(result) # Avoids duplication, i.e., Nodes with the same Node.items attribute.
+			else:
+				node = Node(result, tree) # If the Node was not already in the tree, a new Node is created.
+			self.link[node] = [op] # Adds the one operation needed to reach the newfound Node.
 
 	
-	# Recursive function that determines every Node which can be reached by the main Node (self).
-	# Returns dictionary with node/list pairs, whose keys are Nodes and whose corresponding items are lists specifying the operations needed to reach that Node.
-	def get_endnodes(self, prev_no_search=set()):
-		prev_no_search.add(self) # The Nodes in prev_no_search will not be searched in the current recursive iteration. It has been sent from earlier iterations.
-		link_copy = self.link.copy() # A static copy is needed, since the for-loop would otherwise alter the very sequence it is iterating over.
-
-		for curr_node in link_copy:
-			if curr_node not in prev_no_search:
-				# no_search_recursive_iteration determines what is not to be searched in the next recursive iteration.
-				linked_nodes = set(self.link.keys()) # All nodes already in the main Node's (self) link attribute.
-				linked_nodes.remove(self)
-				linked_nodes.remove(curr_node)
-				no_search_recursive_iteration = prev_no_search.copy() # It expands over the Nodes received in prev_no_search.
-				no_search_recursive_iteration.update(linked_nodes) # It expands over Nodes already linked in the main Node's (self) link attribute.
-				
-				# Retrieves and updates links
-				node_return = (curr_node.get_endnodes(no_search_recursive_iteration)).copy() # Recursive call; node_return is a dictionary.
-				node_return.update(self.link)  # Eliminates operation-list differences with self.link, favoring self.link's versions.
-				for received_node in node_return:
-					if received_node not in self.link:  # In case a new node has been found...
-						previous_path = self.link[curr_node].copy()  # Gets the main Node's (self) path to the node currently under investigation (curr_node) in the for-loop.
-						previous_path += node_return[received_node]  # node_return[received_node] lists the operations needed to go from the investigated node (curr_node) to the received node.
-						node_return[received_node] = previous_path # Updates node_return to contain the full path from the main Node (self) to the received node.
-
-				# Finally alters the main Node (self).
-				self.link.update(node_return)
-
+	# Determines every Node which can be reached by the main Node (self), through an iterative breadth-first search over the tree (see reachability.py).
+	# Returns dictionary with node/list pairs, whose keys are Nodes and whose corresponding items are lists specifying the fewest operations needed to reach that Node.
+	# To search from many Nodes, build one reachability.Reachability for all of them instead: it shares the search work between them.
+	def get_endnodes(self):
+		from reachability import Reachability
+		self.link.update(Reachability(self.tree, [self]).endnodes(self))
 		return self.link
 
 
@@ -1,4 +1,5 @@
-import pickle, time
+import time
+from database import Database
 
 # Define como serão impressas as listas de operações.
 def printlist(L):
@@ -11,8 +12,7 @@ def printlist(L):
 
 # Executa a interface 
 def main():
-	with open('database', 'rb') as file:
-		tree = pickle.load(file)
+	database = Database('database') # Reads only the header; the two pairs' rows are read from disk when queried.
 
 	print("Bem-vindo à Interface de Soluções do jogo Emplaka.")
 	placa = input("Insira um número de placa (4 dígitos): ")
@@ -24,21 +24,15 @@ def main():
 	time.sleep(1)
 	print(f"\nQuais as soluções para {left[0]} ___ {left[1]} = {right[0]} ___ {right[1]}?")
 	time.sleep(2)
-	leftnode = tree.get_node(left)
-	rightnode = tree.get_node(right)
-	leftnode_endnodes = set(leftnode.link.keys())
-	rightnode_endnodes = set(rightnode.link.keys())
-	solutions = leftnode_endnodes.intersection(rightnode_endnodes)
 	i = 1
-	for solution in solutions:
-		if len(solution.items) == 1:
-			print(f"Solution #{i}: {solution.items[0]}.")
-			print(f"\tReached from the left through:  ", end='')
-			printlist(leftnode.link[solution])
-			print(f"\tReached from the right through: ", end='')
-			printlist(rightnode.link[solution])
-			print()
-			i += 1
-			time.sleep(1)
+	for solution, left_path, right_path in database.solutions(left, right):
+		print(f"Solution #{i}: {solution}.")
+		print(f"\tReached from the left through:  ", end='')
+		printlist(left_path)
+		print(f"\tReached from the right through: ", end='')
+		printlist(right_path)
+		print()
+		i += 1
+		time.sleep(1)
 
 main()
\ No newline at end of file